@@ -11,6 +11,35 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 # 数据库配置
 DATABASE_PATH = os.path.join(BASE_DIR, 'database', 'python_learning.db')
 
+# 数据库连接池配置
+DATABASE_CONFIG = {
+    'pool_prune_threshold': 8,  # 线程连接数达到该值时回收已结束线程的连接
+    'cached_statements': 256,   # 每条连接缓存的预编译语句数量
+    'storage_profile': 'wal'    # 使用的存储配置（见 STORAGE_PROFILES）
+}
+
+# SQLite存储配置（每条连接建立时应用）
+STORAGE_PROFILES = {
+    # WAL日志：读写互不阻塞，适合界面读 + 后台写的场景
+    'wal': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 64 * 1024 * 1024,   # 内存映射读取（字节）
+        'cache_size': -16000,            # 页缓存（负数表示KB）
+        'busy_timeout': 5000,            # 锁等待时间（毫秒）
+        'temp_store': 'MEMORY'
+    },
+    # 传统回滚日志（SQLite默认行为），用于对比或兼容
+    'legacy': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'mmap_size': 0,
+        'cache_size': -2000,
+        'busy_timeout': 5000,
+        'temp_store': 'DEFAULT'
+    }
+}
+
 # 默认用户配置
 DEFAULT_USER = {
     'username': '1',
@@ -24,7 +53,17 @@ WINDOW_CONFIG = {
     'width': 1200,
     'height': 800,
     'min_width': 1000,
-    'min_height': 600
+    'min_height': 600,
+    'lazy_pages': True,        # 导航页面在第一次打开时才创建
+    'startup_report': False    # 首个页面可用后在控制台输出启动耗时报告
+}
+
+# 启动耗时预算（毫秒，距进程启动，不含登录界面），scripts/bench_startup.py --check 超出时失败
+# 按实测中位值（offscreen，首次绘制约210~245、首个页面可用约220~255）留出约六成余量；
+# 启动时创建全部页面（约1220）或提前导入 matplotlib（约260）都会超出
+STARTUP_BUDGET = {
+    '主窗口首次绘制': 400,
+    '首个页面可用': 420,
 }
 
 # 代码编辑器配置
@@ -32,7 +71,42 @@ EDITOR_CONFIG = {
     'font_family': 'Consolas',
     'font_size': 12,
     'tab_size': 4,
-    'timeout': 5  # 代码执行超时时间（秒）
+    'timeout': 5,                  # 代码执行超时时间（秒）
+    'memory_limit': 256,           # 代码执行内存上限（MB，仅Linux/macOS生效）
+    'max_output': 1024 * 1024,     # 输出内容上限（字节）
+    'pool_size': 2,                # 预热解释器数量（0表示每次运行都启动新进程）
+    'worker_max_jobs': 50,         # 每个预热解释器执行多少次后回收
+    'pool_wait': 0.2               # 预热解释器全忙时最多等待多久（秒），超时改为启动新进程
+}
+
+# 判题配置
+JUDGE_CONFIG = {
+    'workers': min(4, os.cpu_count() or 1),   # 并行运行测试点的解释器数量
+    'time_grace': 0.5                         # 超出测试点时限后再等待多久强制结束（秒）
+}
+
+# 考试配置
+EXAM_CONFIG = {
+    'autosave_delay': 1000,     # 答题后多久写入草稿（毫秒），期间的修改合并为一次写入
+    'autosave_interval': 30     # 作答期间至少每隔多久保存一次已用时间（秒）
+}
+
+# 练习配置
+PRACTICE_CONFIG = {
+    'page_size': 10,       # 每次从数据库加载的题目数
+    'prefetch_pages': 1,   # 后台预取的后续页数
+    'cache_pages': 4,      # 内存中最多保留的页数
+    'flush_interval': 2,   # 练习提交写入数据库的间隔（秒）
+    'flush_batch': 200,    # 每个写事务最多包含的提交数
+    'retry_max_interval': 30  # 写入失败后重试间隔的上限（秒，从 flush_interval 起逐次翻倍）
+}
+
+# 错题复习调度配置（SM-2）
+REVIEW_CONFIG = {
+    'initial_ease': 2.5,       # 新错题的难度系数
+    'min_ease': 1.3,           # 难度系数下限
+    'lapse_penalty': 0.2,      # 再次答错时难度系数的降幅
+    'mastered_interval': 21    # 复习间隔达到多少天视为已掌握
 }
 
 # 资源路径配置
@@ -5,56 +5,224 @@
 """
 import sqlite3
 import os
+import atexit
 import hashlib
+import threading
+from contextlib import contextmanager
 from datetime import datetime
-from config import DATABASE_PATH, DEFAULT_USER
+from config import DATABASE_PATH, DATABASE_CONFIG, STORAGE_PROFILES, DEFAULT_USER
+from database import migrations
+
+
+class ConnectionPool:
+    """
+    SQLite连接池
+    每个线程持有一条长连接，连接在多次查询之间复用，
+    从而保留SQLite的模式缓存和预编译语句缓存。
+    读写模型：读操作各自使用本线程连接并发执行（WAL模式下不被写阻塞），
+    写事务通过 write() 在进程内串行化
+    """
+
+    def __init__(self, db_path, prune_threshold=8, cached_statements=256, pragmas=None):
+        """
+        初始化连接池
+        :param db_path: 数据库文件路径
+        :param prune_threshold: 连接数达到该值时，新建连接前先回收已结束线程的连接
+            （每个存活线程始终有自己的连接，因此这不是硬上限）
+        :param cached_statements: 每条连接缓存的预编译语句数量
+        :param pragmas: 连接建立时应用的PRAGMA字典（见 config.STORAGE_PROFILES）
+        """
+        self.db_path = db_path
+        self.prune_threshold = prune_threshold
+        self.cached_statements = cached_statements
+        self.pragmas = pragmas or {}
+        self._lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self._connections = {}  # 线程ID -> 连接
+        self._local = threading.local()
+
+    def _open(self):
+        """打开一条新连接"""
+        # 连接只会被所属线程使用，关闭时可能在其他线程进行，因此关闭同线程检查
+        connection = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        # 设置返回字典格式的行
+        connection.row_factory = sqlite3.Row
+        # 应用存储配置（busy_timeout 需最先设置，切换日志模式时可能需要等锁）
+        pragmas = dict(self.pragmas)
+        if 'busy_timeout' in pragmas:
+            connection.execute(f"PRAGMA busy_timeout = {int(pragmas.pop('busy_timeout'))}")
+        for name, value in pragmas.items():
+            connection.execute(f"PRAGMA {name} = {value}")
+        return connection
+
+    def _prune(self):
+        """关闭已结束线程遗留的连接（调用方需持有锁）"""
+        alive = {t.ident for t in threading.enumerate()}
+        for ident in [i for i in self._connections if i not in alive]:
+            try:
+                self._connections.pop(ident).close()
+            except sqlite3.Error:
+                pass
+
+    def acquire(self):
+        """
+        获取当前线程的连接（不存在时创建）
+        :return: sqlite3连接
+        """
+        ident = threading.get_ident()
+        with self._lock:
+            connection = self._connections.get(ident)
+            if connection is None:
+                if len(self._connections) >= self.prune_threshold:
+                    self._prune()
+                connection = self._open()
+                self._connections[ident] = connection
+        return connection
+
+    def release(self, connection):
+        """
+        归还连接（连接保持打开，未提交的事务会被回滚，与关闭连接的语义一致）
+        :param connection: sqlite3连接
+        """
+        if not self.in_checkout() and connection.in_transaction:
+            connection.rollback()
+
+    def in_checkout(self):
+        """当前线程是否处于 checkout()/write() 中（事务由最外层负责提交）"""
+        return getattr(self._local, 'depth', 0) > 0
+
+    @contextmanager
+    def checkout(self):
+        """
+        以上下文管理器方式借出当前线程的连接
+        最外层退出时提交事务，出现异常时回滚；可安全嵌套
+        """
+        connection = self.acquire()
+        self._local.depth = getattr(self._local, 'depth', 0) + 1
+        try:
+            yield connection
+        except BaseException:
+            self._local.depth -= 1
+            if self._local.depth == 0 and connection.in_transaction:
+                connection.rollback()
+            raise
+        else:
+            self._local.depth -= 1
+            if self._local.depth == 0 and connection.in_transaction:
+                connection.commit()
+
+    @contextmanager
+    def write(self):
+        """
+        写事务：进程内写者串行执行，并以 BEGIN IMMEDIATE 提前获取数据库写锁，
+        避免多个写者在提交时才发现冲突；读者不受此锁影响
+        """
+        with self._write_lock:
+            with self.checkout() as connection:
+                if not connection.in_transaction:
+                    connection.execute('BEGIN IMMEDIATE')
+                yield connection
+
+    def close_all(self):
+        """关闭所有连接"""
+        with self._lock:
+            for connection in self._connections.values():
+                try:
+                    connection.close()
+                except sqlite3.Error:
+                    pass
+            self._connections.clear()
 
 
 class DatabaseManager:
     """数据库管理器类"""
 
-    def __init__(self, db_path=DATABASE_PATH):
+    def __init__(self, db_path=DATABASE_PATH, storage_profile=None):
         """
         初始化数据库管理器
         :param db_path: 数据库文件路径
+        :param storage_profile: 存储配置名称，默认取 DATABASE_CONFIG['storage_profile']
         """
         self.db_path = db_path
-        self.connection = None
-        self.cursor = None
+        self.storage_profile = storage_profile or DATABASE_CONFIG['storage_profile']
+        self.pool = ConnectionPool(
+            db_path,
+            prune_threshold=DATABASE_CONFIG['pool_prune_threshold'],
+            cached_statements=DATABASE_CONFIG['cached_statements'],
+            pragmas=STORAGE_PROFILES[self.storage_profile]
+        )
+        # connect()/disconnect() 绑定的连接按线程隔离
+        self._local = threading.local()
 
         # 如果数据库不存在，创建数据库和表
         if not os.path.exists(db_path):
             os.makedirs(os.path.dirname(db_path), exist_ok=True)
             self.create_database()
 
+        # 执行未完成的结构迁移
+        self.migrate()
+
+    @property
+    def connection(self):
+        """当前线程通过 connect() 绑定的连接"""
+        return getattr(self._local, 'connection', None)
+
+    @property
+    def cursor(self):
+        """当前线程通过 connect() 绑定的游标"""
+        return getattr(self._local, 'cursor', None)
+
     def connect(self):
-        """连接数据库"""
+        """连接数据库（从连接池借用当前线程的长连接）"""
         try:
-            self.connection = sqlite3.connect(self.db_path)
-            self.cursor = self.connection.cursor()
-            # 设置返回字典格式的行
-            self.connection.row_factory = sqlite3.Row
-            self.cursor = self.connection.cursor()
+            connection = self.pool.acquire()
+            self._local.connection = connection
+            self._local.cursor = connection.cursor()
             return True
         except sqlite3.Error as e:
             print(f"数据库连接失败: {e}")
             return False
 
     def disconnect(self):
-        """断开数据库连接"""
+        """断开数据库连接（连接归还连接池，不真正关闭）"""
         if self.connection:
-            self.connection.close()
-            self.connection = None
-            self.cursor = None
+            self.pool.release(self.connection)
+            self._local.connection = None
+            self._local.cursor = None
+
+    def checkout(self):
+        """
+        借出当前线程的连接
+        用法: with db_manager.checkout() as conn: conn.execute(...)
+        :return: 上下文管理器
+        """
+        return self.pool.checkout()
+
+    def transaction(self):
+        """
+        开启写事务（写者串行，读者不受影响）
+        用法: with db_manager.transaction() as conn: conn.execute(...)
+        :return: 上下文管理器
+        """
+        return self.pool.write()
+
+    def close(self):
+        """关闭连接池中的所有连接"""
+        self._local = threading.local()
+        self.pool.close_all()
 
     def commit(self):
-        """提交事务"""
-        if self.connection:
+        """提交事务（处于 checkout()/transaction() 中时由其负责提交，此处不提交）"""
+        if self.connection and not self.pool.in_checkout():
             self.connection.commit()
 
     def rollback(self):
-        """回滚事务"""
-        if self.connection:
+        """回滚事务（处于 checkout()/transaction() 中时不回滚外层事务，失败的语句已由SQLite撤销）"""
+        if self.connection and not self.pool.in_checkout():
             self.connection.rollback()
 
     def create_database(self):
@@ -72,15 +240,6 @@ class DatabaseManager:
                 last_login TIMESTAMP
             )
         ''')
-        # 为用户表增加头像和背景字段（向后兼容）
-        try:
-            self.cursor.execute("ALTER TABLE users ADD COLUMN avatar_path TEXT")
-        except Exception:
-            pass
-        try:
-            self.cursor.execute("ALTER TABLE users ADD COLUMN bg_path TEXT")
-        except Exception:
-            pass
 
         # 创建知识点表
         self.cursor.execute('''
@@ -178,6 +337,21 @@ class DatabaseManager:
 
         self.disconnect()
 
+    def migrate(self):
+        """
+        执行未完成的结构迁移（见 database/migrations.py）
+        :return: 本次执行的版本号列表
+        """
+        try:
+            with self.checkout() as conn:
+                applied = migrations.migrate(conn)
+            if applied:
+                print(f"数据库结构已升级至版本 {applied[-1]}")
+            return applied
+        except sqlite3.Error as e:
+            print(f"数据库迁移失败: {e}")
+            return []
+
     def initialize_default_data(self):
         """初始化默认数据（默认用户）"""
         # 添加默认用户
@@ -298,3 +472,4 @@ class DatabaseManager:
 
 # 全局数据库管理器实例
 db_manager = DatabaseManager()
+atexit.register(db_manager.close)
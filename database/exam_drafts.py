@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+考试答题草稿模块
+每场进行中的考试在 exam_drafts 表中保存一行草稿（全部答案序列化为一个JSON），
+答题时防抖写入，程序意外退出后可据此恢复考试；交卷或放弃时删除
+恢复时只需按索引读取一行，耗时与试卷长度无关
+"""
+import json
+
+# 草稿表结构（由迁移 v7 创建）
+CREATE_TABLE = '''
+    CREATE TABLE IF NOT EXISTS exam_drafts (
+        exam_record_id INTEGER PRIMARY KEY,
+        answers TEXT NOT NULL DEFAULT '{}',
+        current_index INTEGER DEFAULT 0,
+        elapsed_seconds INTEGER DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (exam_record_id) REFERENCES exam_records(id)
+    )
+'''
+
+
+def save(conn, exam_record_id, answers, current_index=0, elapsed_seconds=0):
+    """
+    写入（覆盖）考试草稿（调用方负责事务）
+    :param conn: 数据库连接
+    :param exam_record_id: 考试记录ID
+    :param answers: {题目ID: 用户答案}
+    :param current_index: 当前题号（从0开始）
+    :param elapsed_seconds: 已用时间（秒）
+    """
+    conn.execute('''
+        INSERT INTO exam_drafts (exam_record_id, answers, current_index, elapsed_seconds, updated_at)
+        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT (exam_record_id) DO UPDATE SET
+            answers = excluded.answers,
+            current_index = excluded.current_index,
+            elapsed_seconds = excluded.elapsed_seconds,
+            updated_at = excluded.updated_at
+    ''', (exam_record_id, json.dumps(answers, ensure_ascii=False), int(current_index),
+          int(elapsed_seconds)))
+
+
+def load_resumable(conn, user_id):
+    """
+    获取用户最近一场可恢复的考试
+    :param conn: 数据库连接
+    :param user_id: 用户ID
+    :return: 字典（exam_record_id、exam、answers、current_index、elapsed_seconds），没有时返回None
+    """
+    row = conn.execute('''
+        SELECT er.id, er.exam_id, d.answers, d.current_index, d.elapsed_seconds
+        FROM exam_records er
+        JOIN exam_drafts d ON d.exam_record_id = er.id
+        WHERE er.user_id = ? AND er.status = 'in_progress'
+        ORDER BY er.start_time DESC
+        LIMIT 1
+    ''', (user_id,)).fetchone()
+    if row is None:
+        return None
+
+    exam = conn.execute('SELECT * FROM exams WHERE id = ?', (row[1],)).fetchone()
+    if exam is None:
+        return None
+    try:
+        answers = {int(k): v for k, v in json.loads(row[2]).items()}
+    except (ValueError, AttributeError):
+        answers = {}
+    return {
+        'exam_record_id': row[0],
+        'exam': dict(exam),
+        'answers': answers,
+        'current_index': row[3] or 0,
+        'elapsed_seconds': row[4] or 0,
+    }
+
+
+def discard(conn, exam_record_id):
+    """
+    删除考试草稿（调用方负责事务）
+    :param conn: 数据库连接
+    :param exam_record_id: 考试记录ID
+    """
+    conn.execute('DELETE FROM exam_drafts WHERE exam_record_id = ?', (exam_record_id,))
+
+
+def abandon(conn, exam_record_id):
+    """
+    放弃未完成的考试：删除草稿并把考试记录标记为已放弃（调用方负责事务）
+    :param conn: 数据库连接
+    :param exam_record_id: 考试记录ID
+    """
+    discard(conn, exam_record_id)
+    conn.execute('''
+        UPDATE exam_records SET status = 'abandoned', end_time = CURRENT_TIMESTAMP
+        WHERE id = ? AND status = 'in_progress'
+    ''', (exam_record_id,))
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+试卷快照模块
+把一场考试的题目、选项、分值和编程题测试点“编译”成一个JSON快照存入 exam_papers 表，
+开考时按主键读取一行即可，无需再联表查询和逐行构造字典
+
+快照记录编译时题库的数据版本（questions、exam_questions、test_cases 三张表的 content_version 之和），
+任一表变化后版本号增大，快照自动视为过期并重新编译；
+快照内容的哈希值用于判断进程内缓存的副本是否仍然有效
+"""
+import json
+import hashlib
+import threading
+
+# 快照依赖的数据表（由触发器维护 content_version）
+SOURCE_TABLES = ('questions', 'exam_questions', 'test_cases')
+
+# 快照表结构（由迁移 v8 创建）
+CREATE_TABLE = '''
+    CREATE TABLE IF NOT EXISTS exam_papers (
+        exam_id INTEGER PRIMARY KEY,
+        content_hash TEXT NOT NULL,
+        source_version INTEGER NOT NULL,
+        paper TEXT NOT NULL,
+        compiled_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (exam_id) REFERENCES exams(id)
+    )
+'''
+
+_SOURCE_VERSION = '''
+    SELECT COALESCE(SUM(version), 0) FROM content_version
+    WHERE name IN ({})
+'''.format(', '.join(f"'{name}'" for name in SOURCE_TABLES))
+
+# 进程内缓存 {考试ID: (内容哈希, 题目列表)}
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def compile_paper(conn, exam_id):
+    """
+    编译试卷快照并写入 exam_papers（调用方负责写事务）
+    :param conn: 数据库连接
+    :param exam_id: 考试ID
+    :return: (内容哈希, 题目字典列表)
+    """
+    source_version = conn.execute(_SOURCE_VERSION).fetchone()[0]
+    rows = conn.execute('''
+        SELECT q.*, eq.score, eq.order_num
+        FROM questions q
+        JOIN exam_questions eq ON q.id = eq.question_id
+        WHERE eq.exam_id = ?
+        ORDER BY eq.order_num
+    ''', (exam_id,)).fetchall()
+    questions = [dict(row) for row in rows]
+
+    # 编程题的测试点一并写入快照，判题时不再查询
+    coding_ids = [q['id'] for q in questions if q['type'] == 'code']
+    test_cases = {question_id: [] for question_id in coding_ids}
+    if coding_ids:
+        placeholders = ', '.join('?' * len(coding_ids))
+        for row in conn.execute(f'''
+            SELECT * FROM test_cases WHERE question_id IN ({placeholders})
+            ORDER BY question_id, order_num
+        ''', coding_ids):
+            test_cases[row['question_id']].append(dict(row))
+    for question in questions:
+        if question['type'] == 'code':
+            question['test_cases'] = test_cases[question['id']]
+
+    paper = json.dumps(questions, ensure_ascii=False, sort_keys=True)
+    content_hash = hashlib.sha256(paper.encode('utf-8')).hexdigest()
+    conn.execute('''
+        INSERT INTO exam_papers (exam_id, content_hash, source_version, paper, compiled_at)
+        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT (exam_id) DO UPDATE SET
+            content_hash = excluded.content_hash,
+            source_version = excluded.source_version,
+            paper = excluded.paper,
+            compiled_at = excluded.compiled_at
+    ''', (exam_id, content_hash, source_version, paper))
+
+    with _cache_lock:
+        _cache[exam_id] = (content_hash, questions)
+    return content_hash, questions
+
+
+def load_paper(conn, exam_id):
+    """
+    读取有效的试卷快照（缓存中的副本哈希一致时不再解析JSON）
+    :param conn: 数据库连接
+    :param exam_id: 考试ID
+    :return: (内容哈希, 题目字典列表)；快照不存在或已过期时返回None，需调用 compile_paper
+    """
+    row = conn.execute(f'''
+        SELECT content_hash, source_version = ({_SOURCE_VERSION}) FROM exam_papers WHERE exam_id = ?
+    ''', (exam_id,)).fetchone()
+    if row is None or not row[1]:
+        return None
+
+    content_hash = row[0]
+    with _cache_lock:
+        cached = _cache.get(exam_id)
+    if cached is not None and cached[0] == content_hash:
+        return cached
+
+    paper = conn.execute('SELECT paper FROM exam_papers WHERE exam_id = ?', (exam_id,)).fetchone()[0]
+    questions = json.loads(paper)
+    with _cache_lock:
+        _cache[exam_id] = (content_hash, questions)
+    return content_hash, questions
+
+
+def invalidate(exam_id=None):
+    """
+    清除进程内缓存
+    :param exam_id: 考试ID，为None时清除全部
+    """
+    with _cache_lock:
+        if exam_id is None:
+            _cache.clear()
+        else:
+            _cache.pop(exam_id, None)
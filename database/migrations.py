@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""
+数据库迁移模块
+按版本号顺序执行结构变更，已执行的版本记录在 schema_version 表中
+"""
+import sqlite3
+
+from config import REVIEW_CONFIG
+from database import rollup, study_stats, exam_drafts, exam_papers
+
+
+def add_column(conn, table, column, definition):
+    """
+    为表增加字段（字段已存在时跳过）
+    :param conn: 数据库连接
+    :param table: 表名
+    :param column: 字段名
+    :param definition: 字段定义
+    """
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in columns:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def _v1_profile_columns(conn):
+    """用户头像、背景字段；错题来源字段"""
+    add_column(conn, 'users', 'avatar_path', 'TEXT')
+    add_column(conn, 'users', 'bg_path', 'TEXT')
+    add_column(conn, 'wrong_questions', 'source', "TEXT DEFAULT 'practice'")
+
+
+def _v4_category_rollup(conn):
+    """分类汇总表，并根据已有记录回填"""
+    conn.execute(rollup.CREATE_TABLE)
+    rollup.rebuild(conn)
+
+
+def _v5_study_statistics(conn):
+    """根据已有记录回填每日学习统计"""
+    study_stats.rebuild(conn)
+
+
+def _v6_content_version(conn):
+    """题库/知识点数据版本号，由触发器在数据变化时递增（供进程内缓存判断是否过期）"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS content_version (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    for table in ('questions', 'knowledge_points'):
+        conn.execute('INSERT OR IGNORE INTO content_version (name, version) VALUES (?, 0)', (table,))
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_version
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE content_version SET version = version + 1 WHERE name = '{table}';
+                END
+            ''')
+
+
+def _v8_exam_papers(conn):
+    """试卷快照表；试卷题目和测试点变化时同样递增版本号，使快照过期"""
+    conn.execute(exam_papers.CREATE_TABLE)
+    for table in ('exam_questions', 'test_cases'):
+        conn.execute('INSERT OR IGNORE INTO content_version (name, version) VALUES (?, 0)', (table,))
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_version
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE content_version SET version = version + 1 WHERE name = '{table}';
+                END
+            ''')
+
+
+def _v9_review_schedule(conn):
+    """错题复习调度字段；已有的未掌握错题立即到期"""
+    add_column(conn, 'wrong_questions', 'ease', f"REAL DEFAULT {REVIEW_CONFIG['initial_ease']}")
+    add_column(conn, 'wrong_questions', 'interval_days', 'INTEGER DEFAULT 0')
+    add_column(conn, 'wrong_questions', 'repetitions', 'INTEGER DEFAULT 0')
+    add_column(conn, 'wrong_questions', 'due_at', 'TIMESTAMP')
+    conn.execute('''
+        UPDATE wrong_questions SET due_at = datetime('now', 'localtime')
+        WHERE mastered = 0 AND due_at IS NULL
+    ''')
+    # 到期队列：按用户取最早到期的错题（已掌握的错题 due_at 为NULL，不在范围内）
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_wrong_user_due ON wrong_questions (user_id, due_at)')
+
+
+def _v10_knowledge_time(conn):
+    """每日统计中单独记录知识点学习时长；按学习记录回填到最后学习的那一天"""
+    add_column(conn, 'study_statistics', 'knowledge_time', 'INTEGER DEFAULT 0')
+    conn.execute('''
+        INSERT INTO study_statistics (user_id, study_date, total_time, knowledge_time)
+        SELECT user_id, date(last_study_at), SUM(study_time), SUM(study_time)
+        FROM learning_records
+        WHERE last_study_at IS NOT NULL AND study_time > 0
+        GROUP BY user_id, date(last_study_at)
+        ON CONFLICT (user_id, study_date) DO UPDATE SET knowledge_time = excluded.knowledge_time
+    ''')
+
+
+# 迁移步骤：(版本号, 说明, SQL语句列表 或 接收连接的函数)
+# 只能在末尾追加新版本，已发布的步骤不可修改
+MIGRATIONS = [
+    (1, '用户头像/背景字段、错题来源字段', _v1_profile_columns),
+    (2, '考试相关表', [
+        '''
+        CREATE TABLE IF NOT EXISTS exams (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            description TEXT,
+            duration INTEGER NOT NULL,
+            total_score INTEGER DEFAULT 100,
+            pass_score INTEGER DEFAULT 60,
+            category TEXT,
+            difficulty TEXT DEFAULT 'medium',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS exam_questions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            exam_id INTEGER NOT NULL,
+            question_id INTEGER NOT NULL,
+            score INTEGER DEFAULT 10,
+            order_num INTEGER DEFAULT 0,
+            FOREIGN KEY (exam_id) REFERENCES exams(id),
+            FOREIGN KEY (question_id) REFERENCES questions(id),
+            UNIQUE(exam_id, question_id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS test_cases (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            question_id INTEGER NOT NULL,
+            input_data TEXT NOT NULL,
+            expected_output TEXT NOT NULL,
+            score INTEGER DEFAULT 10,
+            is_sample BOOLEAN DEFAULT 0,
+            time_limit INTEGER DEFAULT 1000,
+            memory_limit INTEGER DEFAULT 128,
+            description TEXT,
+            order_num INTEGER DEFAULT 0,
+            FOREIGN KEY (question_id) REFERENCES questions(id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS exam_records (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            exam_id INTEGER NOT NULL,
+            start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            end_time TIMESTAMP,
+            total_score INTEGER DEFAULT 0,
+            obtained_score INTEGER DEFAULT 0,
+            status TEXT DEFAULT 'in_progress',
+            time_spent INTEGER DEFAULT 0,
+            FOREIGN KEY (user_id) REFERENCES users(id),
+            FOREIGN KEY (exam_id) REFERENCES exams(id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS exam_answers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            exam_record_id INTEGER NOT NULL,
+            question_id INTEGER NOT NULL,
+            user_answer TEXT,
+            is_correct BOOLEAN,
+            obtained_score INTEGER DEFAULT 0,
+            test_cases_passed INTEGER DEFAULT 0,
+            test_cases_total INTEGER DEFAULT 0,
+            submit_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (exam_record_id) REFERENCES exam_records(id),
+            FOREIGN KEY (question_id) REFERENCES questions(id)
+        )
+        ''',
+    ]),
+    (3, '热点查询的覆盖索引', [
+        # 题库筛选（练习筛选、按分类/题型加载）
+        'CREATE INDEX IF NOT EXISTS idx_questions_category_type ON questions (category, type)',
+        'CREATE INDEX IF NOT EXISTS idx_questions_type ON questions (type)',
+        'CREATE INDEX IF NOT EXISTS idx_knowledge_category_order ON knowledge_points (category, order_num)',
+        # 练习记录：用户统计、分类正确率、“只做新题”排除
+        'CREATE INDEX IF NOT EXISTS idx_practice_user_question '
+        'ON practice_records (user_id, question_id, is_correct)',
+        'CREATE INDEX IF NOT EXISTS idx_practice_user_time ON practice_records (user_id, submit_time)',
+        # 学习记录：学习时长、完成数、分类进度
+        'CREATE INDEX IF NOT EXISTS idx_learning_user_knowledge '
+        'ON learning_records (user_id, knowledge_id, completed, study_time)',
+        'CREATE INDEX IF NOT EXISTS idx_learning_user_time ON learning_records (user_id, last_study_at)',
+        # 错题本：未掌握错题按时间倒序
+        'CREATE INDEX IF NOT EXISTS idx_wrong_user_mastered_time '
+        'ON wrong_questions (user_id, mastered, last_wrong_at)',
+        # 考试：试卷题目、测试点、答题详情、考试记录
+        'CREATE INDEX IF NOT EXISTS idx_exam_questions_exam_order '
+        'ON exam_questions (exam_id, order_num, question_id, score)',
+        'CREATE INDEX IF NOT EXISTS idx_test_cases_question_order ON test_cases (question_id, order_num)',
+        'CREATE INDEX IF NOT EXISTS idx_exam_answers_record_question ON exam_answers (exam_record_id, question_id)',
+        'CREATE INDEX IF NOT EXISTS idx_exam_records_user_time ON exam_records (user_id, start_time)',
+        'ANALYZE',
+    ]),
+    (4, '用户分类汇总表', _v4_category_rollup),
+    (5, '每日学习统计回填', _v5_study_statistics),
+    (6, '题库/知识点数据版本号', _v6_content_version),
+    (7, '考试答题草稿', [
+        exam_drafts.CREATE_TABLE,
+        # 查找可恢复的考试：按用户、状态过滤并按开始时间倒序
+        'CREATE INDEX IF NOT EXISTS idx_exam_records_user_status_time '
+        'ON exam_records (user_id, status, start_time)',
+    ]),
+    (8, '试卷快照', _v8_exam_papers),
+    (9, '错题复习调度', _v9_review_schedule),
+    (10, '每日知识点学习时长', _v10_knowledge_time),
+]
+
+
+def ensure_version_table(conn):
+    """创建 schema_version 表"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def current_version(conn):
+    """
+    获取当前结构版本
+    :param conn: 数据库连接
+    :return: 已执行的最大版本号（未执行任何迁移时为0）
+    """
+    ensure_version_table(conn)
+    row = conn.execute('SELECT MAX(version) FROM schema_version').fetchone()
+    return row[0] or 0
+
+
+def migrate(conn, migrations=MIGRATIONS):
+    """
+    执行所有未执行的迁移步骤，每个步骤在独立事务中完成
+    :param conn: 数据库连接
+    :param migrations: 迁移步骤列表
+    :return: 本次执行的版本号列表
+    """
+    applied = []
+    if current_version(conn) >= migrations[-1][0]:
+        return applied
+
+    for version, description, step in migrations:
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # 获取写锁后再次确认，避免多个进程重复执行
+            done = conn.execute(
+                'SELECT 1 FROM schema_version WHERE version = ?', (version,)
+            ).fetchone()
+            if done:
+                conn.rollback()
+                continue
+
+            if callable(step):
+                step(conn)
+            else:
+                for statement in step:
+                    conn.execute(statement)
+            conn.execute(
+                'INSERT INTO schema_version (version, description) VALUES (?, ?)',
+                (version, description)
+            )
+            conn.commit()
+            applied.append(version)
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+
+    return applied
+
+
+def explain(conn, query, params=()):
+    """
+    获取查询计划
+    :param conn: 数据库连接
+    :param query: SQL查询语句
+    :param params: 查询参数
+    :return: 查询计划描述列表（EXPLAIN QUERY PLAN 的 detail 列）
+    """
+    return [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {query}', params)]
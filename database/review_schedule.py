@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+错题间隔复习调度模块（SM-2）
+每道未掌握的错题记录难度系数 ease、复习间隔 interval_days、连续答对次数 repetitions 和下次复习时间 due_at，
+复习时只取已到期的错题；重测结果按 SM-2 调整间隔（一次会话的结果由 record_reviews 批量写入），间隔达到 REVIEW_CONFIG['mastered_interval'] 天即视为掌握
+
+已掌握的错题 due_at 为NULL，到期查询 WHERE user_id = ? AND due_at <= ? ORDER BY due_at
+直接在索引 (user_id, due_at) 上做范围扫描，取下一批的代价为 O(log n + 批量大小)
+练习或考试中再次答错时，错题立即到期并重置间隔（见 LAPSE_SET）
+"""
+from datetime import datetime, timedelta
+from config import REVIEW_CONFIG
+
+# 到期时间统一按本地时间、datetime('now', 'localtime') 的格式保存，保证字符串比较与时间先后一致
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# 错题被再次答错（遗忘）时的字段更新，用于 wrong_questions 的 ON CONFLICT DO UPDATE 子句：
+# 重新标记为未掌握、立即到期、间隔和连续答对次数清零、难度系数降低
+LAPSE_SET = f'''
+        mastered = 0,
+        due_at = excluded.due_at,
+        interval_days = 0,
+        repetitions = 0,
+        ease = MAX({REVIEW_CONFIG['min_ease']}, ease - {REVIEW_CONFIG['lapse_penalty']})'''
+
+# 重测答对 / 答错时的评分（SM-2 的回忆质量 0~5）
+QUALITY_GOOD = 4
+QUALITY_HARD = 3
+QUALITY_FORGOT = 1
+
+
+def format_time(moment):
+    """datetime 转为数据库中的时间字符串"""
+    return moment.strftime(TIME_FORMAT)
+
+
+def next_state(ease, interval_days, repetitions, quality):
+    """
+    按 SM-2 计算一次复习后的调度状态
+    :param ease: 当前难度系数
+    :param interval_days: 当前间隔（天）
+    :param repetitions: 连续答对次数
+    :param quality: 回忆质量（0~5，小于3视为遗忘）
+    :return: (新难度系数, 新间隔天数, 新连续答对次数)
+    """
+    ease = ease or REVIEW_CONFIG['initial_ease']
+    if quality < 3:
+        repetitions, interval_days = 0, 1
+    else:
+        if repetitions == 0:
+            interval_days = 1
+        elif repetitions == 1:
+            interval_days = 6
+        else:
+            interval_days = max(1, round((interval_days or 1) * ease))
+        repetitions += 1
+    ease += 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+    return max(REVIEW_CONFIG['min_ease'], ease), interval_days, repetitions
+
+
+# 批量写入复习结果；答错（遗忘）的题同时累加错误次数并更新最近答错时间
+_UPDATE_REVIEW = '''
+    UPDATE wrong_questions
+    SET ease = ?, interval_days = ?, repetitions = ?, due_at = ?, mastered = ?,
+        wrong_count = wrong_count + ?,
+        last_wrong_at = CASE WHEN ? THEN ? ELSE last_wrong_at END
+    WHERE user_id = ? AND question_id = ?
+'''
+
+
+def record_reviews(conn, user_id, outcomes, now=None):
+    """
+    批量记录一次复习会话的结果并安排下次复习（调用方负责事务）
+    先一次读出全部错题的调度状态，计算后用一条 executemany 写回
+    :param conn: 数据库连接
+    :param user_id: 用户ID
+    :param outcomes: {题目ID: 回忆质量（0~5）}
+    :param now: 复习时间，默认当前时间
+    :return: {题目ID: 是否因此掌握}，不在错题本中的题目不包含在内
+    """
+    if not outcomes:
+        return {}
+    now = now or datetime.now()
+    question_ids = list(outcomes)
+    placeholders = ','.join('?' * len(question_ids))
+    states = conn.execute(f'''
+        SELECT question_id, ease, interval_days, repetitions FROM wrong_questions
+        WHERE user_id = ? AND question_id IN ({placeholders})
+    ''', [user_id] + question_ids).fetchall()
+
+    results = {}
+    rows = []
+    for question_id, ease, interval_days, repetitions in states:
+        quality = outcomes[question_id]
+        ease, interval_days, repetitions = next_state(ease, interval_days, repetitions, quality)
+        mastered = interval_days >= REVIEW_CONFIG['mastered_interval']
+        due_at = None if mastered else format_time(now + timedelta(days=interval_days))
+        forgot = quality < 3
+        rows.append((ease, interval_days, repetitions, due_at, mastered,
+                     1 if forgot else 0, forgot, format_time(now), user_id, question_id))
+        results[question_id] = mastered
+    conn.executemany(_UPDATE_REVIEW, rows)
+    return results
+
+
+def due_batch(conn, user_id, limit, category=None, now=None):
+    """
+    获取已到期的错题（最早到期的在前）
+    :param conn: 数据库连接
+    :param user_id: 用户ID
+    :param limit: 最多返回多少题
+    :param category: 只取指定分类，为None时不限
+    :param now: 当前时间，默认当前时间
+    :return: 错题字典列表（含题目内容）
+    """
+    category_filter = '' if category is None else 'AND q.category = ?'
+    params = (user_id, format_time(now or datetime.now()))
+    params += () if category is None else (category,)
+    rows = conn.execute(f'''
+        SELECT wq.*, q.question, q.type, q.answer, q.explanation, q.options, q.category
+        FROM wrong_questions wq
+        JOIN questions q ON wq.question_id = q.id
+        WHERE wq.user_id = ? AND wq.due_at <= ? {category_filter}
+        ORDER BY wq.due_at
+        LIMIT ?
+    ''', params + (limit,))
+    return [dict(row) for row in rows]
+
+
+def next_due_at(conn, user_id, category=None, now=None):
+    """
+    获取用户最早一道未到期错题的到期时间
+    :param conn: 数据库连接
+    :param user_id: 用户ID
+    :param category: 只看指定分类，为None时不限
+    :param now: 当前时间，默认当前时间
+    :return: 时间字符串，没有未到期的错题时返回None
+    """
+    category_filter = '' if category is None else 'AND q.category = ?'
+    params = (user_id, format_time(now or datetime.now()))
+    params += () if category is None else (category,)
+    row = conn.execute(f'''
+        SELECT wq.due_at FROM wrong_questions wq
+        JOIN questions q ON wq.question_id = q.id
+        WHERE wq.user_id = ? AND wq.due_at > ? {category_filter}
+        ORDER BY wq.due_at
+        LIMIT 1
+    ''', params).fetchone()
+    return row[0] if row else None
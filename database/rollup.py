@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+分类汇总表模块
+按 (用户, 分类, 题型) 维护练习、考试、知识点的累计数据，
+由练习提交、知识点完成、考试判题时增量更新，统计页面直接读取汇总结果
+
+知识点没有题型，其完成数和学习时长记录在 q_type 为 KNOWLEDGE_TYPE 的行中
+"""
+
+# 知识点汇总行使用的题型占位值
+KNOWLEDGE_TYPE = ''
+
+# 汇总表结构（由迁移 v4 创建）
+CREATE_TABLE = '''
+    CREATE TABLE IF NOT EXISTS user_category_stats (
+        user_id INTEGER NOT NULL,
+        category TEXT NOT NULL,
+        q_type TEXT NOT NULL DEFAULT '',
+        practice_total INTEGER DEFAULT 0,
+        practice_correct INTEGER DEFAULT 0,
+        exam_total INTEGER DEFAULT 0,
+        exam_correct INTEGER DEFAULT 0,
+        knowledge_completed INTEGER DEFAULT 0,
+        study_time INTEGER DEFAULT 0,
+        PRIMARY KEY (user_id, category, q_type)
+    )
+'''
+
+_UPSERT = '''
+    INSERT INTO user_category_stats
+    (user_id, category, q_type, practice_total, practice_correct,
+     exam_total, exam_correct, knowledge_completed, study_time)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (user_id, category, q_type) DO UPDATE SET
+        practice_total = practice_total + excluded.practice_total,
+        practice_correct = practice_correct + excluded.practice_correct,
+        exam_total = exam_total + excluded.exam_total,
+        exam_correct = exam_correct + excluded.exam_correct,
+        knowledge_completed = knowledge_completed + excluded.knowledge_completed,
+        study_time = study_time + excluded.study_time
+'''
+
+
+def _add(conn, user_id, category, q_type, practice=(0, 0), exam=(0, 0), knowledge=(0, 0)):
+    """累加一行汇总数据（调用方负责事务）"""
+    if not category:
+        return
+    conn.execute(_UPSERT, (user_id, category, q_type or KNOWLEDGE_TYPE,
+                           practice[0], practice[1], exam[0], exam[1],
+                           knowledge[0], knowledge[1]))
+
+
+def record_practice(conn, user_id, category, q_type, is_correct):
+    """
+    记录一次练习提交
+    :param conn: 数据库连接（与练习记录写入处于同一事务）
+    :param user_id: 用户ID
+    :param category: 题目分类
+    :param q_type: 题目类型
+    :param is_correct: 是否正确
+    """
+    _add(conn, user_id, category, q_type, practice=(1, 1 if is_correct else 0))
+
+
+def record_exam_answer(conn, user_id, category, q_type, is_correct):
+    """
+    记录一道考试题的判题结果
+    :param conn: 数据库连接（与答题详情写入处于同一事务）
+    :param user_id: 用户ID
+    :param category: 题目分类
+    :param q_type: 题目类型
+    :param is_correct: 是否正确
+    """
+    _add(conn, user_id, category, q_type, exam=(1, 1 if is_correct else 0))
+
+
+def _totals(answers):
+    """按 (分类, 题型) 合并 (分类, 题型, 是否正确)，返回 {(分类, 题型): [总数, 正确数]}"""
+    totals = {}
+    for category, q_type, is_correct in answers:
+        if not category:
+            continue
+        counts = totals.setdefault((category, q_type or KNOWLEDGE_TYPE), [0, 0])
+        counts[0] += 1
+        counts[1] += 1 if is_correct else 0
+    return totals
+
+
+def record_practice_answers(conn, user_id, answers):
+    """
+    批量记录多次练习提交（按分类、题型合并后一次写入）
+    :param conn: 数据库连接（与练习记录写入处于同一事务）
+    :param user_id: 用户ID
+    :param answers: 可迭代的 (分类, 题型, 是否正确)
+    """
+    conn.executemany(_UPSERT, [
+        (user_id, category, q_type, total, correct, 0, 0, 0, 0)
+        for (category, q_type), (total, correct) in _totals(answers).items()
+    ])
+
+
+def record_exam_answers(conn, user_id, answers):
+    """
+    批量记录一次考试的判题结果（按分类、题型合并后一次写入）
+    :param conn: 数据库连接（与答题详情写入处于同一事务）
+    :param user_id: 用户ID
+    :param answers: 可迭代的 (分类, 题型, 是否正确)
+    """
+    conn.executemany(_UPSERT, [
+        (user_id, category, q_type, 0, 0, total, correct, 0, 0)
+        for (category, q_type), (total, correct) in _totals(answers).items()
+    ])
+
+
+def record_knowledge(conn, user_id, category, study_time, newly_completed):
+    """
+    记录一次知识点学习
+    :param conn: 数据库连接（与学习记录写入处于同一事务）
+    :param user_id: 用户ID
+    :param category: 知识点分类
+    :param study_time: 本次学习时长（秒）
+    :param newly_completed: 该知识点是否为首次标记完成
+    """
+    _add(conn, user_id, category, KNOWLEDGE_TYPE,
+         knowledge=(1 if newly_completed else 0, study_time or 0))
+
+
+def rebuild(conn, user_id=None):
+    """
+    根据原始记录重建汇总表（用于修复或首次迁移）
+    :param conn: 数据库连接（调用方负责事务）
+    :param user_id: 只重建指定用户，为None时重建全部
+    :return: 重建后的汇总行数
+    """
+    user_filter = '' if user_id is None else 'WHERE user_id = ?'
+    params = () if user_id is None else (user_id,)
+    conn.execute(f'DELETE FROM user_category_stats {user_filter}', params)
+
+    record_filter = '' if user_id is None else 'AND r.user_id = ?'
+    conn.execute(f'''
+        INSERT INTO user_category_stats (user_id, category, q_type, practice_total, practice_correct)
+        SELECT r.user_id, q.category, q.type, COUNT(*),
+               COUNT(CASE WHEN r.is_correct = 1 THEN 1 END)
+        FROM practice_records r JOIN questions q ON r.question_id = q.id
+        WHERE q.category IS NOT NULL {record_filter}
+        GROUP BY r.user_id, q.category, q.type
+    ''', params)
+
+    # 考试答题详情没有 user_id，需要通过考试记录关联
+    conn.execute(f'''
+        INSERT INTO user_category_stats (user_id, category, q_type, exam_total, exam_correct)
+        SELECT er.user_id, q.category, q.type, COUNT(*),
+               COUNT(CASE WHEN ea.is_correct = 1 THEN 1 END)
+        FROM exam_answers ea
+        JOIN exam_records er ON ea.exam_record_id = er.id
+        JOIN questions q ON ea.question_id = q.id
+        WHERE q.category IS NOT NULL {'' if user_id is None else 'AND er.user_id = ?'}
+        GROUP BY er.user_id, q.category, q.type
+        ON CONFLICT (user_id, category, q_type) DO UPDATE SET
+            exam_total = excluded.exam_total,
+            exam_correct = excluded.exam_correct
+    ''', params)
+
+    conn.execute(f'''
+        INSERT INTO user_category_stats (user_id, category, q_type, knowledge_completed, study_time)
+        SELECT r.user_id, kp.category, ?, COUNT(DISTINCT CASE WHEN r.completed = 1 THEN r.knowledge_id END),
+               COALESCE(SUM(r.study_time), 0)
+        FROM learning_records r JOIN knowledge_points kp ON r.knowledge_id = kp.id
+        WHERE kp.category IS NOT NULL {record_filter}
+        GROUP BY r.user_id, kp.category
+    ''', (KNOWLEDGE_TYPE,) + params)
+
+    row = conn.execute(f'SELECT COUNT(*) FROM user_category_stats {user_filter}', params).fetchone()
+    return row[0]
+
+
+def clear(conn, user_id):
+    """
+    删除用户的汇总数据（重置学习记录时使用）
+    :param conn: 数据库连接
+    :param user_id: 用户ID
+    """
+    conn.execute('DELETE FROM user_category_stats WHERE user_id = ?', (user_id,))
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+每日学习统计模块
+按 (用户, 日期) 累计学习时长（其中知识点学习时长单独记录）、做题数、正确数和新完成的知识点数，
+由练习提交、知识点学习、考试判题时增量更新，连续学习天数、近N天曲线、热力图直接读取每日汇总
+"""
+from datetime import date
+
+
+def today():
+    """当天日期字符串（本地时间，YYYY-MM-DD）"""
+    return date.today().isoformat()
+
+
+def record_activity(conn, user_id, study_time=0, questions=0, correct=0, knowledge=0, study_date=None,
+                    knowledge_time=0):
+    """
+    累加当天的学习统计（调用方负责事务）
+    :param conn: 数据库连接
+    :param user_id: 用户ID
+    :param study_time: 学习时长（秒，含练习、考试和知识点学习）
+    :param questions: 完成题目数
+    :param correct: 正确题目数
+    :param knowledge: 新完成的知识点数
+    :param study_date: 统计日期，默认为当天
+    :param knowledge_time: 其中知识点学习的时长（秒）
+    """
+    conn.execute('''
+        INSERT INTO study_statistics
+        (user_id, study_date, total_time, questions_completed, questions_correct, knowledge_learned,
+         knowledge_time)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (user_id, study_date) DO UPDATE SET
+            total_time = total_time + excluded.total_time,
+            questions_completed = questions_completed + excluded.questions_completed,
+            questions_correct = questions_correct + excluded.questions_correct,
+            knowledge_learned = knowledge_learned + excluded.knowledge_learned,
+            knowledge_time = knowledge_time + excluded.knowledge_time
+    ''', (user_id, study_date or today(), int(study_time or 0), int(questions or 0),
+          int(correct or 0), int(knowledge or 0), int(knowledge_time or 0)))
+
+
+def rebuild(conn, user_id=None):
+    """
+    根据原始记录重建每日统计（用于修复或首次迁移）
+    学习记录只保存累计时长和最后学习时间，重建时全部计入最后学习的那一天；
+    考试时间字段是UTC时间，按本地日期归入交卷当天，与判题时按本地日期增量累加的结果一致
+    :param conn: 数据库连接（调用方负责事务）
+    :param user_id: 只重建指定用户，为None时重建全部
+    :return: 重建后的统计行数
+    """
+    user_filter = '' if user_id is None else 'WHERE user_id = ?'
+    params = () if user_id is None else (user_id,)
+    # 旧数据库在迁移v5时调用重建，此时还没有v10增加的知识点时长字段，先补上
+    from database.migrations import add_column
+    add_column(conn, 'study_statistics', 'knowledge_time', 'INTEGER DEFAULT 0')
+    conn.execute(f'DELETE FROM study_statistics {user_filter}', params)
+
+    sources = [
+        # 练习：时长（秒）、题数、正确数（提交时间为本地时间）
+        f'''
+        SELECT user_id, date(submit_time) AS d, COALESCE(SUM(time_spent), 0),
+               COUNT(*), COUNT(CASE WHEN is_correct = 1 THEN 1 END), 0, 0
+        FROM practice_records WHERE submit_time IS NOT NULL {'' if user_id is None else 'AND user_id = ?'}
+        GROUP BY user_id, d
+        ''',
+        # 知识点：时长（秒，同时计入知识点学习时长）、完成数（学习时间为本地时间）
+        f'''
+        SELECT user_id, date(last_study_at) AS d, COALESCE(SUM(study_time), 0),
+               0, 0, COUNT(CASE WHEN completed = 1 THEN 1 END), COALESCE(SUM(study_time), 0)
+        FROM learning_records WHERE last_study_at IS NOT NULL {'' if user_id is None else 'AND user_id = ?'}
+        GROUP BY user_id, d
+        ''',
+        # 考试：用时（分钟换算为秒）
+        f'''
+        SELECT user_id, date(COALESCE(end_time, start_time), 'localtime') AS d,
+               COALESCE(SUM(time_spent), 0) * 60, 0, 0, 0, 0
+        FROM exam_records WHERE status = 'completed' {'' if user_id is None else 'AND user_id = ?'}
+        GROUP BY user_id, d
+        ''',
+        # 考试：已作答的题数、正确数
+        f'''
+        SELECT er.user_id, date(COALESCE(er.end_time, er.start_time), 'localtime') AS d, 0,
+               COUNT(*), COUNT(CASE WHEN ea.is_correct = 1 THEN 1 END), 0, 0
+        FROM exam_answers ea JOIN exam_records er ON ea.exam_record_id = er.id
+        WHERE er.start_time IS NOT NULL {'' if user_id is None else 'AND er.user_id = ?'}
+        GROUP BY er.user_id, d
+        ''',
+    ]
+    for query in sources:
+        rows = conn.execute(query, params).fetchall()
+        for row in rows:
+            uid, day, study_time, questions, correct, knowledge, knowledge_time = tuple(row)
+            if day:
+                record_activity(conn, uid, study_time, questions, correct, knowledge, study_date=day,
+                                knowledge_time=knowledge_time)
+
+    row = conn.execute(f'SELECT COUNT(*) FROM study_statistics {user_filter}', params).fetchone()
+    return row[0]
@@ -1,11 +1,51 @@
 # -*- coding: utf-8 -*-
-"""PyPalPrep 入口文件"""
+"""
+PyPalPrep 入口文件
+用法: python main.py [--profile-startup [报告路径]]
+--profile-startup 记录启动各阶段时间点和各模块导入耗时，首个页面可用时写入JSON报告
+（默认 startup_profile.json）；登录界面结束后的阶段另给出距登录界面结束的时间
+"""
 import sys
+import time
+
+START = time.perf_counter()
+
+from utils.startup_timer import startup_timer
+
+# 默认的启动耗时报告路径
+PROFILE_REPORT = 'startup_profile.json'
+
+
+def enable_startup_profile(argv):
+    """
+    处理 --profile-startup 参数（须在导入 PyQt5 之前调用，才能记录其导入耗时）
+    :param argv: 命令行参数，会移除 --profile-startup 及其路径，避免传给 QApplication
+    :return: 报告路径，未开启时返回None
+    """
+    if '--profile-startup' not in argv:
+        return None
+    index = argv.index('--profile-startup')
+    del argv[index]
+    path = PROFILE_REPORT
+    if index < len(argv) and not argv[index].startswith('-'):
+        path = argv.pop(index)
+    startup_timer.reset(START)
+    startup_timer.track_imports()
+    startup_timer.report_path = path
+    return path
+
+
+enable_startup_profile(sys.argv)
+
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtGui import QFont
+startup_timer.mark('导入PyQt5')
+from database.db_manager import db_manager
+startup_timer.mark('初始化数据库')
 from ui.main_window import MainWindow
 from ui.launch_overlay_clean_login import LaunchOverlay
 from models.user import User
+startup_timer.mark('导入主窗口模块')
 
 
 def create_app():
@@ -18,6 +58,7 @@ def create_app():
     app.setApplicationName("Python学习教辅系统")
     app.setApplicationVersion("1.0.0")
     app.setOrganizationName("Python Learning Assistant")
+    startup_timer.mark('创建QApplication')
     return app
 
 
@@ -27,6 +68,9 @@ def launch_main_window(username: str, password: str):
     if app is None:
         raise RuntimeError("QApplication 未初始化")
 
+    # 之前的时间包括用户停留在登录界面的时间，报告同时给出距此阶段的时间
+    startup_timer.mark('启动动画结束')
+    startup_timer.anchor = '启动动画结束'
     user = User(user_id=1, username=username, nickname=username)
     main_window = MainWindow(user)
     app._main_window = main_window
@@ -42,6 +86,7 @@ def run():
     overlay = LaunchOverlay()
     overlay.finished.connect(launch_main_window)
     overlay.showFullScreen()
+    startup_timer.mark('显示启动动画')
 
     sys.exit(app.exec_())
 
@@ -8,6 +8,12 @@
 class KnowledgePoint:
     """知识点类"""
 
+    # knowledge_points 表的字段顺序（from_row 接收元组时按此顺序解析）
+    COLUMNS = ('id', 'category', 'title', 'content', 'code_example',
+               'difficulty', 'order_num', 'created_at')
+
+    __slots__ = COLUMNS
+
     def __init__(self, knowledge_id=None, category=None, title=None, content=None,
                  code_example=None, difficulty='medium', order_num=0, created_at=None):
         """
@@ -30,6 +36,20 @@ class KnowledgePoint:
         self.order_num = order_num
         self.created_at = created_at
 
+    @classmethod
+    def from_row(cls, row):
+        """
+        从数据库行直接创建知识点对象（不经过中间字典）
+        :param row: sqlite3.Row（需包含 knowledge_points 表全部字段）或按 COLUMNS 顺序的元组
+        :return: KnowledgePoint对象
+        """
+        if row is None:
+            return None
+        if isinstance(row, tuple):
+            return cls(*row)
+        return cls(row['id'], row['category'], row['title'], row['content'], row['code_example'],
+                   row['difficulty'], row['order_num'], row['created_at'])
+
     @classmethod
     def from_dict(cls, data):
         """
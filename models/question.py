@@ -9,6 +9,13 @@ import json
 class Question:
     """题目类"""
 
+    # questions 表的字段顺序（from_row 接收元组时按此顺序解析）
+    COLUMNS = ('id', 'category', 'type', 'question', 'options', 'answer',
+               'explanation', 'difficulty', 'created_at')
+
+    __slots__ = ('id', 'category', 'type', 'question', '_options', '_options_raw',
+                 'answer', 'explanation', 'difficulty', 'created_at')
+
     def __init__(self, question_id=None, category=None, q_type=None, question=None,
                  options=None, answer=None, explanation=None, difficulty='medium', created_at=None):
         """
@@ -17,7 +24,7 @@ class Question:
         :param category: 分类
         :param q_type: 题目类型（choice/judge/fill/code）
         :param question: 题目内容
-        :param options: 选项（JSON格式字符串或列表）
+        :param options: 选项（JSON格式字符串或列表，字符串在首次访问时才解析）
         :param answer: 答案
         :param explanation: 解析
         :param difficulty: 难度
@@ -27,19 +34,48 @@ class Question:
         self.category = category
         self.type = q_type
         self.question = question
-        # 如果options是字符串，解析为列表
-        if isinstance(options, str) and options:
-            try:
-                self.options = json.loads(options)
-            except json.JSONDecodeError:
-                self.options = []
-        else:
-            self.options = options if options else []
+        self.options = options
         self.answer = answer
         self.explanation = explanation
         self.difficulty = difficulty
         self.created_at = created_at
 
+    @property
+    def options(self):
+        """选项列表（JSON字符串在首次访问时解析）"""
+        if self._options is None:
+            # 保留原始字符串，多线程同时首次访问时各自解析出相同结果
+            raw = self._options_raw
+            try:
+                self._options = json.loads(raw) if raw else []
+            except json.JSONDecodeError:
+                self._options = []
+        return self._options
+
+    @options.setter
+    def options(self, value):
+        # 如果options是字符串，延迟到首次访问时解析为列表
+        if isinstance(value, str):
+            self._options = None
+            self._options_raw = value
+        else:
+            self._options = value if value else []
+            self._options_raw = None
+
+    @classmethod
+    def from_row(cls, row):
+        """
+        从数据库行直接创建题目对象（不经过中间字典）
+        :param row: sqlite3.Row（需包含 questions 表全部字段）或按 COLUMNS 顺序的元组
+        :return: Question对象
+        """
+        if row is None:
+            return None
+        if isinstance(row, tuple):
+            return cls(*row)
+        return cls(row['id'], row['category'], row['type'], row['question'], row['options'],
+                   row['answer'], row['explanation'], row['difficulty'], row['created_at'])
+
     @classmethod
     def from_dict(cls, data):
         """
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+考试保存基准测试
+对比原先逐题写入（每题一条 INSERT、错题 INSERT OR REPLACE + 关联子查询、编程题补一条 UPDATE）
+与 ExamGrader.save 批量写入在50题考试上的耗时和SQL执行次数
+
+用法: python scripts/bench_exam_save.py [--questions 50] [--repeat 20] [--profile wal]
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import KNOWLEDGE_CATEGORIES, STORAGE_PROFILES
+from database.db_manager import DatabaseManager
+from database import rollup, study_stats
+from utils.exam_grader import ExamGrader, GradedAnswer
+
+TYPES = ('choice', 'judge', 'fill', 'code')
+
+
+def seed(manager, question_count):
+    """写入用户、题目和试卷"""
+    with manager.transaction() as conn:
+        conn.execute("INSERT INTO users (username, password) VALUES ('bench', 'x')")
+        conn.executemany(
+            "INSERT INTO questions (category, type, question, answer) VALUES (?, ?, ?, 'A')",
+            [(random.choice(KNOWLEDGE_CATEGORIES), TYPES[i % len(TYPES)], f'题目{i}')
+             for i in range(question_count)]
+        )
+        conn.execute("INSERT INTO exams (name, duration, total_score, pass_score) VALUES ('基准', 60, 100, 60)")
+        rows = conn.execute('SELECT id, category, type FROM questions').fetchall()
+    return [{'id': r[0], 'category': r[1], 'type': r[2], 'answer': 'A', 'score': 2} for r in rows]
+
+
+def new_record(manager):
+    """创建一条进行中的考试记录"""
+    with manager.transaction() as conn:
+        return conn.execute(
+            "INSERT INTO exam_records (user_id, exam_id, status) VALUES (1, 1, 'in_progress')"
+        ).lastrowid
+
+
+def make_grader(manager, questions):
+    """构造已判完的判题器（约一半答错，编程题带测试点统计）"""
+    grader = ExamGrader(1, new_record(manager), questions, {}, db=manager)
+    for q in questions:
+        is_correct = random.random() < 0.5
+        passed, total = (3 if is_correct else 1, 3) if q['type'] == 'code' else (0, 0)
+        grader.graded[q['id']] = GradedAnswer(q['id'], q['category'], q['type'], 'A' if is_correct else 'B',
+                                              is_correct, q['score'] if is_correct else 0, passed, total)
+    return grader
+
+
+def legacy_save(manager, grader, time_spent=30):
+    """改造前的写入方式（仅用于对比）"""
+    manager.connect()
+    cursor = manager.cursor
+    try:
+        for q in grader.questions:
+            g = grader.graded[q['id']]
+            cursor.execute('''
+                INSERT INTO exam_answers (exam_record_id, question_id, user_answer, is_correct, obtained_score)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (grader.exam_record_id, g.question_id, g.user_answer, g.is_correct, g.score))
+            rollup.record_exam_answer(manager.connection, 1, g.category, g.q_type, g.is_correct)
+            study_stats.record_activity(manager.connection, 1, questions=1, correct=g.is_correct)
+            if not g.is_correct:
+                cursor.execute('''
+                    INSERT OR REPLACE INTO wrong_questions
+                    (user_id, question_id, wrong_count, source, last_wrong_at)
+                    VALUES (?, ?, COALESCE((SELECT wrong_count + 1 FROM wrong_questions
+                                            WHERE user_id = ? AND question_id = ?), 1),
+                            'exam', CURRENT_TIMESTAMP)
+                ''', (1, g.question_id, 1, g.question_id))
+            if g.q_type == 'code':
+                cursor.execute('''
+                    UPDATE exam_answers SET test_cases_passed = ?, test_cases_total = ?
+                    WHERE exam_record_id = ? AND question_id = ?
+                ''', (g.test_cases_passed, g.test_cases_total, grader.exam_record_id, g.question_id))
+        cursor.execute('''
+            UPDATE exam_records SET end_time = CURRENT_TIMESTAMP, obtained_score = ?,
+                status = 'completed', time_spent = ? WHERE id = ?
+        ''', (grader.score, time_spent, grader.exam_record_id))
+        study_stats.record_activity(manager.connection, 1, study_time=time_spent * 60)
+        manager.commit()
+    finally:
+        manager.disconnect()
+
+
+def count_statements(manager, save):
+    """统计一次保存执行的SQL次数（executemany 每行计一次）"""
+    statements = []
+    with manager.checkout() as conn:
+        conn.set_trace_callback(statements.append)
+        try:
+            save()
+        finally:
+            conn.set_trace_callback(None)
+    return len(statements)
+
+
+def run(profile, question_count, repeat):
+    tmp_dir = tempfile.mkdtemp(prefix='bench_exam_')
+    try:
+        manager = DatabaseManager(os.path.join(tmp_dir, 'bench.db'), storage_profile=profile)
+        questions = seed(manager, question_count)
+
+        results = {}
+        for label, save in (('逐题写入', lambda g: legacy_save(manager, g)),
+                            ('批量写入', lambda g: g.save(30))):
+            samples = []
+            for _ in range(repeat):
+                grader = make_grader(manager, questions)
+                start = time.perf_counter()
+                save(grader)
+                samples.append(time.perf_counter() - start)
+            samples.sort()
+            grader = make_grader(manager, questions)
+            statements = count_statements(manager, lambda: save(grader))
+            results[label] = (samples[len(samples) // 2] * 1000, samples[-1] * 1000, statements)
+        manager.close()
+        return results
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='考试保存基准测试')
+    parser.add_argument('--questions', type=int, default=50, help='试卷题目数')
+    parser.add_argument('--repeat', type=int, default=20, help='重复次数')
+    parser.add_argument('--profile', choices=sorted(STORAGE_PROFILES), default=None,
+                        help='只测试指定存储配置')
+    args = parser.parse_args()
+
+    print(f"{args.questions} 题考试，重复 {args.repeat} 次")
+    print(f"{'存储配置':<10}{'方式':<10}{'中位(ms)':>10}{'最慢(ms)':>10}{'执行次数':>8}")
+    print('-' * 50)
+    for profile in ([args.profile] if args.profile else sorted(STORAGE_PROFILES)):
+        for label, (median, worst, statements) in run(profile, args.questions, args.repeat).items():
+            print(f"{profile:<14}{label:<10}{median:>10.2f}{worst:>10.2f}{statements:>8}")
+
+
+if __name__ == '__main__':
+    main()
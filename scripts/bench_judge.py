@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+判题基准测试
+对比逐个运行测试点与并行判题（utils/judge.py）的耗时，并验证时限、内存上限生效
+
+用法: python scripts/bench_judge.py [--cases 8] [--work 200000]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.judge import run_case, judge_submission
+
+# 读入n，输出 0..n*work 的累加和，每个测试点耗时大致相同
+SUBMISSION = '''
+n = int(input())
+total = 0
+for i in range(n * WORK):
+    total += i
+print(total)
+'''
+
+
+def make_cases(count, work):
+    """生成测试点"""
+    return [{
+        'id': i + 1,
+        'input_data': f'{i + 1}\n',
+        'expected_output': str(sum(range((i + 1) * work))),
+        'score': 10,
+        'time_limit': 5000,
+        'memory_limit': 128,
+    } for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='判题基准测试')
+    parser.add_argument('--cases', type=int, default=8, help='测试点数量')
+    parser.add_argument('--work', type=int, default=200000, help='每个测试点的循环规模')
+    args = parser.parse_args()
+
+    code = SUBMISSION.replace('WORK', str(args.work))
+    cases = make_cases(args.cases, args.work)
+
+    # 预热解释器池
+    judge_submission('print(1)', [{'input_data': '', 'expected_output': '1', 'memory_limit': 128}])
+
+    start = time.perf_counter()
+    serial = [run_case(code, case, i) for i, case in enumerate(cases)]
+    serial_time = time.perf_counter() - start
+
+    report = judge_submission(
+        code, cases,
+        on_result=lambda r: print(f"  测试点{r.index + 1}: {r.status:<14}{r.elapsed * 1000:>8.1f} ms")
+    )
+
+    print(f"{args.cases} 个测试点")
+    print(f"逐个运行: {serial_time * 1000:.1f} ms，通过 {sum(r.passed for r in serial)}/{len(serial)}")
+    print(f"并行判题: {report.wall_time * 1000:.1f} ms，通过 {report.passed}/{report.total}，"
+          f"节省 {report.time_saved * 1000:.1f} ms（编译一次 {report.compile_time * 1000:.2f} ms）")
+
+    # 大量小测试点：只编译一次与每个测试点重新编译的对比
+    big = SUBMISSION.replace('WORK', '1') + ''.join(f'v{i} = [j * {i} for j in range(3)]\n' for i in range(2000))
+    small_cases = [{'input_data': '1\n', 'expected_output': '0', 'time_limit': 5000} for _ in range(args.cases * 4)]
+    start = time.perf_counter()
+    for i, case in enumerate(small_cases):
+        run_case(big, case, i)
+    recompile_time = time.perf_counter() - start
+    once = judge_submission(big, small_cases)
+    print(f"{len(small_cases)} 个测试点（约2000行代码）: 每次编译 {recompile_time * 1000:.1f} ms，"
+          f"编译一次 {once.wall_time * 1000:.1f} ms")
+    syntax = judge_submission('print(1', cases[:2])
+    print(f"语法错误: {syntax.results[0].status}，{syntax.results[0].message}")
+
+    # 时限与内存上限
+    limits = judge_submission('while True: pass\n', [{'input_data': '', 'expected_output': '', 'time_limit': 300}])
+    memory = judge_submission('x = bytearray(512 * 1024 * 1024)\n',
+                              [{'input_data': '', 'expected_output': '', 'memory_limit': 64}])
+    print(f"死循环（时限300ms）: {limits.results[0].status}，{limits.wall_time * 1000:.0f} ms")
+    print(f"申请512MB（上限64MB）: {memory.results[0].status}，{memory.results[0].message}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+模型构造基准测试
+对比原先的字典式题目模型（from_dict(dict(row)) + 构造时解析options）
+与 __slots__ 模型（from_row 直接构造、options 延迟解析）的构造耗时和内存占用
+
+用法: python scripts/bench_models.py [--count 10000] [--repeat 5]
+"""
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.question import Question
+
+
+class LegacyQuestion:
+    """改造前的题目模型（仅用于对比）"""
+
+    def __init__(self, question_id=None, category=None, q_type=None, question=None,
+                 options=None, answer=None, explanation=None, difficulty='medium', created_at=None):
+        self.id = question_id
+        self.category = category
+        self.type = q_type
+        self.question = question
+        if isinstance(options, str) and options:
+            try:
+                self.options = json.loads(options)
+            except json.JSONDecodeError:
+                self.options = []
+        else:
+            self.options = options if options else []
+        self.answer = answer
+        self.explanation = explanation
+        self.difficulty = difficulty
+        self.created_at = created_at
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            question_id=data.get('id'),
+            category=data.get('category'),
+            q_type=data.get('type'),
+            question=data.get('question'),
+            options=data.get('options'),
+            answer=data.get('answer'),
+            explanation=data.get('explanation'),
+            difficulty=data.get('difficulty', 'medium'),
+            created_at=data.get('created_at')
+        )
+
+
+def fetch_rows(count, row_factory):
+    """在内存数据库中生成题目并读出"""
+    conn = sqlite3.connect(':memory:')
+    conn.execute('''
+        CREATE TABLE questions (
+            id INTEGER PRIMARY KEY, category TEXT, type TEXT, question TEXT, options TEXT,
+            answer TEXT, explanation TEXT, difficulty TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    options = json.dumps(['A. 选项一', 'B. 选项二', 'C. 选项三', 'D. 选项四'], ensure_ascii=False)
+    conn.executemany(
+        "INSERT INTO questions (category, type, question, options, answer, explanation, difficulty) "
+        "VALUES ('函数', 'choice', ?, ?, 'A', '解析', 'easy')",
+        [(f'题目{i}', options) for i in range(count)]
+    )
+    conn.row_factory = row_factory
+    rows = conn.execute('SELECT * FROM questions').fetchall()
+    conn.close()
+    return rows
+
+
+def measure(build, rows, repeat):
+    """返回 (中位构造耗时ms, 对象占用内存KB, 之后访问全部options的耗时ms)"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        build(rows)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    objects = build(rows)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    memory = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+
+    start = time.perf_counter()
+    for obj in objects:
+        obj.options
+    access = time.perf_counter() - start
+
+    return samples[len(samples) // 2] * 1000, memory / 1024, access * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='题目模型构造基准测试')
+    parser.add_argument('--count', type=int, default=10000, help='题目数量')
+    parser.add_argument('--repeat', type=int, default=5, help='重复次数')
+    args = parser.parse_args()
+
+    named_rows = fetch_rows(args.count, sqlite3.Row)
+    tuple_rows = fetch_rows(args.count, None)
+
+    cases = [
+        ('旧模型 from_dict(dict(row))', named_rows,
+         lambda rows: [LegacyQuestion.from_dict(dict(row)) for row in rows]),
+        ('新模型 from_row(Row)', named_rows,
+         lambda rows: [Question.from_row(row) for row in rows]),
+        ('新模型 from_row(tuple)', tuple_rows,
+         lambda rows: [Question.from_row(row) for row in rows]),
+    ]
+
+    print(f"{args.count} 道题目")
+    print(f"{'方式':<28}{'构造(ms)':>10}{'内存(KB)':>12}{'首次访问options(ms)':>22}")
+    print('-' * 72)
+    for label, rows, build in cases:
+        build_ms, memory_kb, access_ms = measure(build, rows, args.repeat)
+        print(f"{label:<28}{build_ms:>10.2f}{memory_kb:>12.1f}{access_ms:>22.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+练习提交基准测试
+对比原先每次提交同步写库（界面线程内一个事务：练习记录、汇总、学习统计、错题本先查后改）
+与写后队列（界面线程只入队，后台线程按批写入）的提交延迟和全部落盘耗时，
+并核对写入结果：记录顺序与提交顺序一致、错题次数和汇总数据与原始记录重建结果一致
+
+用法: python scripts/bench_practice_writer.py [--submissions 500] [--profile wal]
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+from collections import namedtuple
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import KNOWLEDGE_CATEGORIES, STORAGE_PROFILES
+from database.db_manager import DatabaseManager
+from database import rollup, study_stats
+from utils.practice_writer import PracticeWriter
+
+TYPES = ('choice', 'judge', 'fill', 'code')
+
+Question = namedtuple('Question', ['id', 'category', 'type'])
+
+
+def seed(manager, question_count=100):
+    """写入用户和题目"""
+    with manager.transaction() as conn:
+        conn.execute("INSERT INTO users (username, password) VALUES ('bench', 'x')")
+        conn.executemany(
+            "INSERT INTO questions (category, type, question, answer) VALUES (?, ?, ?, 'A')",
+            [(random.choice(KNOWLEDGE_CATEGORIES), TYPES[i % len(TYPES)], f'题目{i}')
+             for i in range(question_count)]
+        )
+        rows = conn.execute('SELECT id, category, type FROM questions').fetchall()
+    return [Question(*row) for row in rows]
+
+
+def legacy_submit(manager, question, answer, is_correct, time_spent):
+    """改造前的同步写入方式（仅用于对比）"""
+    now = datetime.now()
+    with manager.checkout() as conn:
+        conn.execute('''
+            INSERT INTO practice_records (user_id, question_id, user_answer, is_correct, submit_time, time_spent)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (1, question.id, answer, is_correct, now, time_spent))
+        rollup.record_practice(conn, 1, question.category, question.type, is_correct)
+        study_stats.record_activity(conn, 1, study_time=time_spent, questions=1, correct=is_correct)
+        if not is_correct:
+            row = conn.execute('SELECT id, wrong_count FROM wrong_questions WHERE user_id = ? AND question_id = ?',
+                               (1, question.id)).fetchone()
+            if row:
+                conn.execute('UPDATE wrong_questions SET wrong_count = ?, last_wrong_at = ? WHERE id = ?',
+                             (row['wrong_count'] + 1, now, row['id']))
+            else:
+                conn.execute('''
+                    INSERT INTO wrong_questions (user_id, question_id, wrong_count, mastered, first_wrong_at, last_wrong_at)
+                    VALUES (?, ?, 1, 0, ?, ?)
+                ''', (1, question.id, now, now))
+
+
+def verify(manager, submissions):
+    """核对写入结果，返回错误信息列表"""
+    errors = []
+    with manager.checkout() as conn:
+        answers = [row[0] for row in conn.execute('SELECT user_answer FROM practice_records ORDER BY id')]
+        if answers != [answer for _, answer, _ in submissions]:
+            errors.append('练习记录顺序与提交顺序不一致')
+
+        expected = {}
+        for question, _, is_correct in submissions:
+            if not is_correct:
+                expected[question.id] = expected.get(question.id, 0) + 1
+        actual = dict(conn.execute('SELECT question_id, wrong_count FROM wrong_questions').fetchall())
+        if actual != expected:
+            errors.append('错题次数不一致')
+
+        stats = sorted(map(tuple, conn.execute('SELECT * FROM user_category_stats')))
+        rollup.rebuild(conn)
+        if stats != sorted(map(tuple, conn.execute('SELECT * FROM user_category_stats'))):
+            errors.append('汇总数据与重建结果不一致')
+
+        row = conn.execute('SELECT SUM(questions_completed) FROM study_statistics').fetchone()
+        if row[0] != len(submissions):
+            errors.append('学习统计题数不一致')
+    return errors
+
+
+def run(profile, count):
+    results = {}
+    for label in ('同步写入', '写后队列'):
+        tmp_dir = tempfile.mkdtemp(prefix='bench_practice_')
+        try:
+            manager = DatabaseManager(os.path.join(tmp_dir, 'bench.db'), storage_profile=profile)
+            questions = seed(manager)
+            submissions = [(random.choice(questions), f'答案{i}', random.random() < 0.6) for i in range(count)]
+            writer = PracticeWriter(db=manager) if label == '写后队列' else None
+
+            samples = []
+            start = time.perf_counter()
+            for question, answer, is_correct in submissions:
+                submit_start = time.perf_counter()
+                if writer is None:
+                    legacy_submit(manager, question, answer, is_correct, 5)
+                else:
+                    writer.submit(1, question, answer, is_correct, 5)
+                samples.append(time.perf_counter() - submit_start)
+            if writer is not None:
+                writer.close()
+            total = time.perf_counter() - start
+
+            samples.sort()
+            errors = verify(manager, submissions)
+            results[label] = (samples[len(samples) // 2] * 1000, samples[-1] * 1000, total * 1000, errors)
+            manager.close()
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='练习提交基准测试')
+    parser.add_argument('--submissions', type=int, default=500, help='提交次数')
+    parser.add_argument('--profile', choices=sorted(STORAGE_PROFILES), default=None,
+                        help='只测试指定存储配置')
+    args = parser.parse_args()
+
+    print(f"{args.submissions} 次练习提交")
+    print(f"{'存储配置':<10}{'方式':<10}{'提交中位(ms)':>14}{'提交最慢(ms)':>14}{'全部落盘(ms)':>14}  核对")
+    print('-' * 76)
+    failed = False
+    for profile in ([args.profile] if args.profile else sorted(STORAGE_PROFILES)):
+        for label, (median, worst, total, errors) in run(profile, args.submissions).items():
+            print(f"{profile:<14}{label:<10}{median:>14.3f}{worst:>14.3f}{total:>14.1f}  "
+                  f"{'；'.join(errors) or '通过'}")
+            failed = failed or bool(errors)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+题目切换耗时基准测试
+在考试界面（ExamWidget.show_question）和练习界面（PracticeWidget.display_question）中
+按题型交替切换题目，统计每次切换到界面处理完毕（含布局、绘制和延迟删除的控件）的耗时
+
+需要 PyQt5；默认使用 offscreen 平台插件，无需显示器。使用数据库副本，不修改项目数据库
+对比改造前后时，用 --project 指定另一份代码（如 git worktree 检出的旧版本）：
+用法: python scripts/bench_question_nav.py [--rounds 200] [--project 项目目录]
+"""
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='题目切换耗时基准测试')
+    parser.add_argument('--rounds', type=int, default=200, help='每个界面切换题目的次数')
+    parser.add_argument('--project', default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        help='被测项目目录，默认当前项目')
+    return parser.parse_args()
+
+
+def interleave_by_type(questions):
+    """按题型交替排列（choice、judge、fill、code...），每次切换都换一种题型"""
+    by_type = {}
+    for question in questions:
+        by_type.setdefault(question['type'] if isinstance(question, dict) else question.type, []).append(question)
+    ordered = []
+    while any(by_type.values()):
+        for items in by_type.values():
+            if items:
+                ordered.append(items.pop(0))
+    return ordered
+
+
+def settle(app):
+    """处理完界面事件和延迟删除"""
+    from PyQt5.QtCore import QCoreApplication, QEvent
+    app.processEvents()
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+
+
+def measure(app, questions, show, rounds):
+    """依次切换 rounds 次，返回每次耗时（毫秒，已排序）"""
+    samples = []
+    for i in range(rounds):
+        start = time.perf_counter()
+        show(questions[i % len(questions)])
+        settle(app)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples
+
+
+def bench_exam(app, user, rounds):
+    from ui.exam_widget import ExamWidget
+    widget = ExamWidget(user)
+    widget.show()
+    exams = widget.db.execute_query('SELECT * FROM exams')
+    widget.db.disconnect()
+    questions = []
+    for exam in exams:
+        widget.current_exam = dict(exam)
+        widget.load_exam_questions()
+        questions.extend(widget.questions)
+    widget.questions = interleave_by_type(questions)
+    widget.tab_widget.setCurrentWidget(widget.exam_progress_widget)
+    settle(app)
+
+    def show(question):
+        widget.current_question_index = widget.questions.index(question)
+        widget.show_question()
+
+    samples = measure(app, widget.questions, show, rounds)
+    widget.hide()
+    return samples
+
+
+def bench_practice(app, user, rounds):
+    from ui.practice_widget import PracticeWidget
+    from utils.data_loader import DataLoader
+    widget = PracticeWidget(user)
+    widget.show()
+    questions = interleave_by_type(DataLoader.load_all_questions())
+    settle(app)
+    samples = measure(app, questions, widget.display_question, rounds)
+    widget.hide()
+    return samples
+
+
+def main():
+    args = parse_args()
+    project = os.path.abspath(args.project)
+    sys.path.insert(0, project)
+    os.chdir(project)
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    tmp_dir = tempfile.mkdtemp(prefix='bench_nav_')
+    try:
+        import config
+        config.DATABASE_PATH = os.path.join(tmp_dir, 'nav.db')
+        shutil.copy(os.path.join(project, 'database', 'python_learning.db'), config.DATABASE_PATH)
+
+        from PyQt5.QtWidgets import QApplication
+        from models.user import User
+        app = QApplication(sys.argv[:1])
+        user = User(user_id=1, username='bench', nickname='bench')
+
+        print(f"项目: {project}")
+        print(f"{'界面':<12}{'次数':>6}{'中位(ms)':>12}{'P90(ms)':>12}{'最慢(ms)':>12}")
+        print('-' * 56)
+        for label, bench in (('模拟考试', bench_exam), ('题库练习', bench_practice)):
+            samples = bench(app, user, args.rounds)
+            print(f"{label:<12}{len(samples):>8}{samples[len(samples) // 2]:>12.2f}"
+                  f"{samples[int(len(samples) * 0.9)]:>12.2f}{samples[-1]:>12.2f}")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    # 直接退出，不等待界面对象析构时的数据库和计时器清理
+    sys.stdout.flush()
+    os._exit(0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+错题复习队列基准测试
+1. 对比原先加载全部未掌握错题再截取前N题（DataLoader.load_user_wrong_questions）
+   与 review_schedule.due_batch 按 (user_id, due_at) 索引只取到期的N题，在不同错题规模下的耗时
+   取下一批的耗时应基本不随错题总数增长
+2. 对比重测结束时逐题 UPDATE 并各自提交与 review_schedule.record_reviews 一个事务批量写入的耗时
+
+用法: python scripts/bench_review_queue.py [--sizes 1000 10000 100000] [--batch 15] [--retest 50]
+"""
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import KNOWLEDGE_CATEGORIES, STORAGE_PROFILES
+from database.db_manager import DatabaseManager
+from database import review_schedule
+
+LEGACY_QUERY = '''
+    SELECT wq.*, q.question, q.type, q.answer, q.explanation, q.options, q.category
+    FROM wrong_questions wq
+    LEFT JOIN questions q ON wq.question_id = q.id
+    WHERE wq.user_id = ? AND wq.mastered = 0
+    ORDER BY wq.last_wrong_at DESC
+'''
+
+
+def seed(manager, size):
+    """写入 size 道题目及用户1的错题：约三成已到期，其余分布在未来60天，另有一成已掌握"""
+    now = datetime.now()
+    with manager.transaction() as conn:
+        conn.execute("INSERT INTO users (username, password) VALUES ('bench', 'x')")
+        conn.executemany(
+            "INSERT INTO questions (category, type, question, answer) VALUES (?, 'choice', ?, 'A')",
+            [(random.choice(KNOWLEDGE_CATEGORIES), f'题目{i}') for i in range(size)]
+        )
+        rows = []
+        for question_id in range(1, size + 1):
+            last_wrong = now - timedelta(days=random.randint(1, 60))
+            if random.random() < 0.1:
+                due_at, mastered = None, 1
+            elif random.random() < 0.3:
+                due_at, mastered = now - timedelta(hours=random.randint(1, 500)), 0
+            else:
+                due_at, mastered = now + timedelta(hours=random.randint(1, 1440)), 0
+            rows.append((question_id, mastered, review_schedule.format_time(last_wrong),
+                         review_schedule.format_time(due_at) if due_at else None))
+        conn.executemany('''
+            INSERT INTO wrong_questions (user_id, question_id, mastered, last_wrong_at, due_at)
+            VALUES (1, ?, ?, ?, ?)
+        ''', rows)
+        conn.execute('ANALYZE')
+
+
+def measure(func, repeat):
+    """重复执行并返回中位耗时（毫秒）"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[len(samples) // 2] * 1000
+
+
+def run(size, batch, repeat):
+    tmp_dir = tempfile.mkdtemp(prefix='bench_review_')
+    try:
+        manager = DatabaseManager(os.path.join(tmp_dir, 'bench.db'), storage_profile='wal')
+        seed(manager, size)
+        with manager.checkout() as conn:
+            legacy = measure(lambda: [dict(r) for r in conn.execute(LEGACY_QUERY, (1,))][:batch], repeat)
+            due = measure(lambda: review_schedule.due_batch(conn, 1, batch), repeat)
+            category = KNOWLEDGE_CATEGORIES[0]
+            due_category = measure(lambda: review_schedule.due_batch(conn, 1, batch, category=category), repeat)
+        manager.close()
+        return legacy, due, due_category
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def legacy_retest_save(manager, question_ids):
+    """改造前的重测保存：每题一条 UPDATE，各自提交（仅用于对比）"""
+    manager.connect()
+    try:
+        for qid in question_ids:
+            manager.execute_update('UPDATE wrong_questions SET mastered = 1 WHERE user_id = ? AND question_id = ?',
+                                   (1, qid))
+    finally:
+        manager.disconnect()
+
+
+def run_retest(profile, count, repeat):
+    """重测保存耗时：(逐题提交, 批量写入) 中位耗时（毫秒）"""
+    tmp_dir = tempfile.mkdtemp(prefix='bench_retest_')
+    try:
+        manager = DatabaseManager(os.path.join(tmp_dir, 'bench.db'), storage_profile=profile)
+        seed(manager, count)
+        question_ids = list(range(1, count + 1))
+        outcomes = {qid: random.choice((review_schedule.QUALITY_GOOD, review_schedule.QUALITY_FORGOT))
+                    for qid in question_ids}
+
+        def batch_save():
+            with manager.transaction() as conn:
+                review_schedule.record_reviews(conn, 1, outcomes)
+
+        legacy = measure(lambda: legacy_retest_save(manager, question_ids), repeat)
+        batch = measure(batch_save, repeat)
+        manager.close()
+        return legacy, batch
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='错题复习队列基准测试')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help='错题数量')
+    parser.add_argument('--batch', type=int, default=15, help='每次复习的题数')
+    parser.add_argument('--repeat', type=int, default=20, help='重复次数')
+    parser.add_argument('--retest', type=int, default=50, help='重测题数')
+    args = parser.parse_args()
+
+    print(f"每批 {args.batch} 题，中位耗时（毫秒）")
+    print(f"{'错题数':>8}{'全部加载后截取':>16}{'到期队列':>12}{'到期队列(分类)':>16}")
+    print('-' * 56)
+    for size in args.sizes:
+        legacy, due, due_category = run(size, args.batch, args.repeat)
+        print(f"{size:>10}{legacy:>18.2f}{due:>14.3f}{due_category:>18.3f}")
+
+    print(f"\n重测 {args.retest} 题保存，中位耗时（毫秒）")
+    print(f"{'存储配置':<10}{'逐题提交':>10}{'批量写入':>10}")
+    print('-' * 36)
+    for profile in sorted(STORAGE_PROFILES):
+        legacy, batch = run_retest(profile, args.retest, max(3, args.repeat // 4))
+        print(f"{profile:<14}{legacy:>12.2f}{batch:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+题目抽样基准测试
+对比原先的 ORDER BY RANDOM() 全量加载与 QuestionSampler 按ID抽样后按需加载，
+在不同题库规模下的耗时
+
+用法: python scripts/bench_sampling.py [--sizes 1000 10000 50000] [--limit 50] [--repeat 20]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import KNOWLEDGE_CATEGORIES, QUESTION_TYPES
+from database.db_manager import DatabaseManager
+from models.question import Question
+import utils.data_loader as data_loader
+import utils.question_sampler as question_sampler
+from utils.data_loader import DataLoader
+from utils.question_sampler import QuestionSampler
+
+USER_ID = 1
+
+
+def seed(manager, size, done_ratio=0.3):
+    """写入 size 道题目，并让测试用户做过其中一部分"""
+    types = list(QUESTION_TYPES)
+    options = '["A. 选项一", "B. 选项二", "C. 选项三", "D. 选项四"]'
+    with manager.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO questions (category, type, question, options, answer, explanation) "
+            "VALUES (?, ?, ?, ?, 'A', ?)",
+            [(random.choice(KNOWLEDGE_CATEGORIES), random.choice(types),
+              f'题目{i}：' + '题干内容' * 20, options, '解析内容' * 20)
+             for i in range(size)]
+        )
+        conn.executemany(
+            "INSERT INTO practice_records (user_id, question_id, user_answer, is_correct) VALUES (?, ?, 'A', 1)",
+            [(USER_ID, qid) for qid in random.sample(range(1, size + 1), int(size * done_ratio))]
+        )
+
+
+def legacy_load(manager, category, q_type, only_new):
+    """原实现：ORDER BY RANDOM() + NOT IN，加载全部符合条件的题目"""
+    conditions = []
+    params = []
+    if category:
+        conditions.append("category = ?")
+        params.append(category)
+    if q_type:
+        conditions.append("type = ?")
+        params.append(q_type)
+    if only_new:
+        conditions.append("id NOT IN (SELECT question_id FROM practice_records WHERE user_id = ?)")
+        params.append(USER_ID)
+    where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    query = f"SELECT * FROM questions{where} ORDER BY RANDOM()"
+    return [Question.from_dict(dict(row)) for row in manager.execute_query(query, tuple(params))]
+
+
+def sampler_load(category, q_type, only_new, limit):
+    """新实现：索引上抽取ID，只加载抽中的题目"""
+    ids = QuestionSampler.sample_ids(category, q_type,
+                                     exclude_done_by=USER_ID if only_new else None, limit=limit)
+    return DataLoader.load_questions_by_ids(ids)
+
+
+def timed(func, repeat):
+    """返回多次调用的中位耗时（毫秒）"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[len(samples) // 2] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='题目抽样基准测试')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000], help='题库规模')
+    parser.add_argument('--limit', type=int, default=50, help='每次抽取的题目数')
+    parser.add_argument('--repeat', type=int, default=20, help='每组重复次数')
+    args = parser.parse_args()
+
+    print(f"{'题库':>8}{'筛选':>10}{'旧实现(ms)':>14}{'抽样(ms)':>12}{'加速':>8}")
+    print('-' * 52)
+    for size in args.sizes:
+        tmp_dir = tempfile.mkdtemp(prefix='bench_sampling_')
+        manager = DatabaseManager(os.path.join(tmp_dir, 'bench.db'))
+        seed(manager, size)
+        # 让加载器和抽样器使用临时数据库
+        data_loader.db_manager = manager
+        question_sampler.db_manager = manager
+
+        for label, kwargs in (('全部', {'category': None, 'q_type': None}),
+                              ('分类+题型', {'category': KNOWLEDGE_CATEGORIES[0], 'q_type': 'choice'})):
+            for only_new in (False, True):
+                legacy = lambda: legacy_load(manager, kwargs['category'], kwargs['q_type'], only_new)
+                sampled = lambda: sampler_load(kwargs['category'], kwargs['q_type'], only_new, args.limit)
+
+                old_ms = timed(legacy, args.repeat)
+                new_ms = timed(sampled, args.repeat)
+                name = label + ('/新题' if only_new else '')
+                print(f"{size:>8}{name:>10}{old_ms:>14.2f}{new_ms:>12.2f}{old_ms / new_ms:>7.1f}x")
+        manager.close()
+        print('-' * 52)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+启动耗时基准测试
+分别以“启动即创建全部页面”和“页面按需创建”两种方式启动主窗口（各自在新进程中，使用数据库副本），
+对比从进程启动到主窗口首次绘制、到首个页面可用的时间，并列出各阶段耗时
+
+--check 只以当前配置启动，各阶段中位时间与 config.STARTUP_BUDGET 比较，超出预算时退出码为1，
+并列出导入累计耗时最多的模块；--output 把中位一次的阶段与模块导入耗时写入JSON
+
+需要 PyQt5；默认使用 offscreen 平台插件，无需显示器
+用法: python scripts/bench_startup.py [--repeat 3] [--check] [--output report.json]
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+START = time.perf_counter()
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+# 首次绘制后最长等待时间（秒）
+TIMEOUT = 60
+# 报告中保留的导入耗时最多的模块数
+TOP_IMPORTS = 30
+
+MODES = {
+    'eager': ('启动即创建全部页面', False),
+    'lazy': ('页面按需创建', True),
+}
+
+
+def child(mode, db_path):
+    """子进程：启动主窗口直到首个页面可用，输出各阶段与模块导入记录（JSON）"""
+    from utils.startup_timer import startup_timer
+    startup_timer.reset(START)
+    startup_timer.track_imports()
+
+    import config
+    config.DATABASE_PATH = db_path
+    config.WINDOW_CONFIG['lazy_pages'] = MODES[mode][1]
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    import main
+    from models.user import User
+
+    app = main.create_app()
+    window = main.MainWindow(User(user_id=1, username='bench', nickname='bench'))
+    window.show()
+    deadline = time.perf_counter() + TIMEOUT
+    while startup_timer.at('首个页面可用') is None and time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+    print(json.dumps(startup_timer.to_dict(top=TOP_IMPORTS), ensure_ascii=False))
+    # close() 会弹出退出确认框，这里只隐藏窗口
+    window.hide()
+    app.quit()
+
+
+def run_child(mode):
+    """在新进程中启动一次，返回记录 {'phases': [...], 'imports': [...]}"""
+    tmp_dir = tempfile.mkdtemp(prefix='bench_startup_')
+    try:
+        db_path = os.path.join(tmp_dir, 'startup.db')
+        shutil.copy(os.path.join(PROJECT_ROOT, 'database', 'python_learning.db'), db_path)
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', mode, '--db', db_path],
+            capture_output=True, text=True, encoding='utf-8', cwd=PROJECT_ROOT
+        )
+        lines = [line for line in result.stdout.splitlines() if line.startswith('{')]
+        if result.returncode != 0 or not lines:
+            raise RuntimeError(f'启动失败（{mode}）:\n{result.stderr}')
+        return json.loads(lines[-1])
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def phase_at(report, phase):
+    """阶段第一次出现的时间点（毫秒），未出现时返回 nan"""
+    for event in report['phases']:
+        if event['phase'] == phase:
+            return event['at_ms']
+    return float('nan')
+
+
+def median_run(mode, repeat, phase):
+    """启动 repeat 次，返回按 phase 时间点取中位的一次"""
+    runs = sorted((run_child(mode) for _ in range(repeat)), key=lambda report: phase_at(report, phase))
+    return runs[len(runs) // 2]
+
+
+def print_phases(report):
+    for event in report['phases']:
+        spent = f"{event['duration_ms']:>10.1f}" if event['duration_ms'] is not None else ''
+        print(f"  {event['phase']:<24}{event['at_ms']:>10.1f}{spent}")
+
+
+def check(repeat, output):
+    """按当前配置启动，与启动耗时预算比较，返回退出码"""
+    from config import STARTUP_BUDGET, WINDOW_CONFIG
+    mode = 'lazy' if WINDOW_CONFIG['lazy_pages'] else 'eager'
+    # 每个预算阶段分别取中位值，避免偶发的慢启动误报
+    runs = [run_child(mode) for _ in range(repeat)]
+
+    failures = 0
+    print(f"{'阶段':<16}{'中位(ms)':>12}{'预算(ms)':>12}")
+    print('-' * 44)
+    for phase, budget in STARTUP_BUDGET.items():
+        samples = sorted(phase_at(report, phase) for report in runs)
+        value = samples[len(samples) // 2]
+        ok = value <= budget
+        failures += 0 if ok else 1
+        print(f"{phase:<16}{value:>12.1f}{budget:>12}  {'OK' if ok else 'FAIL'}")
+
+    report = sorted(runs, key=lambda r: phase_at(r, '首个页面可用'))[len(runs) // 2]
+    print("\n各阶段（中位一次）")
+    print_phases(report)
+    print("\n导入累计耗时最多的模块")
+    for item in report['imports'][:15]:
+        print(f"  {item['module']:<40}{item['cumulative_ms']:>10.1f}{item['self_ms']:>10.1f}")
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n报告已写入: {output}")
+
+    if failures:
+        print(f"\n{failures} 个阶段超出启动耗时预算")
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='启动耗时基准测试')
+    parser.add_argument('--repeat', type=int, default=3, help='每种方式启动次数（取中位）')
+    parser.add_argument('--check', action='store_true', help='与 config.STARTUP_BUDGET 比较，超出时退出码为1')
+    parser.add_argument('--output', help='--check 时把中位一次的记录写入该JSON文件')
+    parser.add_argument('--child', choices=sorted(MODES), help=argparse.SUPPRESS)
+    parser.add_argument('--db', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.db)
+        return 0
+    if args.check:
+        return check(args.repeat, args.output)
+
+    print(f"{'方式':<16}{'首次绘制(ms)':>14}{'首个页面可用(ms)':>18}")
+    print('-' * 50)
+    details = {}
+    for mode, (label, _) in MODES.items():
+        report = median_run(mode, args.repeat, '主窗口首次绘制')
+        details[label] = report
+        print(f"{label:<16}{phase_at(report, '主窗口首次绘制'):>14.1f}{phase_at(report, '首个页面可用'):>18.1f}")
+
+    for label, report in details.items():
+        print(f"\n{label}（中位一次）")
+        print_phases(report)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+存储配置基准测试
+对比 legacy（回滚日志）与 wal 两种存储配置下，
+读、写延迟在空闲和并发负载时的变化
+
+用法: python scripts/bench_storage.py [--writes 200] [--readers 3]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import KNOWLEDGE_CATEGORIES, QUESTION_TYPES
+from database.db_manager import DatabaseManager
+
+READ_QUERY = """
+    SELECT q.category, COUNT(*) AS total,
+           COUNT(CASE WHEN pr.is_correct = 1 THEN 1 END) AS correct
+    FROM practice_records pr
+    JOIN questions q ON pr.question_id = q.id
+    WHERE pr.user_id = ?
+    GROUP BY q.category
+"""
+
+
+def seed(manager, question_count=500, record_count=5000):
+    """写入测试用题目和练习记录"""
+    types = list(QUESTION_TYPES)
+    with manager.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO questions (category, type, question, answer) VALUES (?, ?, ?, ?)",
+            [(random.choice(KNOWLEDGE_CATEGORIES), random.choice(types), f'题目{i}', 'A')
+             for i in range(question_count)]
+        )
+        conn.executemany(
+            "INSERT INTO practice_records (user_id, question_id, user_answer, is_correct) VALUES (1, ?, 'A', ?)",
+            [(random.randint(1, question_count), random.randint(0, 1)) for _ in range(record_count)]
+        )
+
+
+def write_once(manager, question_count=500, batch=20):
+    """模拟一次判卷写入：一个事务写入 batch 条记录"""
+    start = time.perf_counter()
+    with manager.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO practice_records (user_id, question_id, user_answer, is_correct) VALUES (1, ?, 'A', ?)",
+            [(random.randint(1, question_count), random.randint(0, 1)) for _ in range(batch)]
+        )
+    return time.perf_counter() - start
+
+
+def read_once(manager):
+    """模拟一次统计页读取"""
+    start = time.perf_counter()
+    with manager.checkout() as conn:
+        conn.execute(READ_QUERY, (1,)).fetchall()
+    return time.perf_counter() - start
+
+
+def summarize(samples):
+    """返回 (p50, p95, max)，单位毫秒"""
+    if not samples:
+        return 0.0, 0.0, 0.0
+    ordered = sorted(samples)
+    p50 = ordered[len(ordered) // 2]
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return p50 * 1000, p95 * 1000, ordered[-1] * 1000
+
+
+def run_profile(profile, writes, readers):
+    """对单个存储配置执行 空闲读 / 空闲写 / 并发读写 三组测试"""
+    tmp_dir = tempfile.mkdtemp(prefix='bench_storage_')
+    manager = DatabaseManager(os.path.join(tmp_dir, 'bench.db'), storage_profile=profile)
+    seed(manager)
+    results = {}
+
+    results['idle_read'] = [read_once(manager) for _ in range(writes)]
+    results['idle_write'] = [write_once(manager) for _ in range(writes)]
+
+    # 并发：一个写线程 + 多个读线程
+    stop = threading.Event()
+    read_samples = []
+    write_samples = []
+    lock = threading.Lock()
+
+    def reader():
+        local = []
+        while not stop.is_set():
+            local.append(read_once(manager))
+        with lock:
+            read_samples.extend(local)
+
+    def writer():
+        for _ in range(writes):
+            write_samples.append(write_once(manager))
+            # 留出间隔，模拟界面操作触发的离散写入
+            time.sleep(0.005)
+        stop.set()
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    results['busy_read'] = read_samples
+    results['busy_write'] = write_samples
+    manager.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SQLite存储配置基准测试')
+    parser.add_argument('--writes', type=int, default=200, help='每组写事务次数')
+    parser.add_argument('--readers', type=int, default=3, help='并发读线程数')
+    args = parser.parse_args()
+
+    print(f"{'配置':<8}{'场景':<12}{'次数':>8}{'p50(ms)':>10}{'p95(ms)':>10}{'max(ms)':>10}")
+    print('-' * 58)
+    for profile in ('legacy', 'wal'):
+        results = run_profile(profile, args.writes, args.readers)
+        for scenario in ('idle_read', 'busy_read', 'idle_write', 'busy_write'):
+            p50, p95, worst = summarize(results[scenario])
+            print(f"{profile:<8}{scenario:<12}{len(results[scenario]):>8}"
+                  f"{p50:>10.2f}{p95:>10.2f}{worst:>10.2f}")
+        print('-' * 58)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+查询计划检查
+在临时数据库上执行迁移，并用 EXPLAIN QUERY PLAN 确认热点查询命中索引
+
+用法: python scripts/check_query_plans.py
+全部通过时退出码为0，否则为1
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db_manager import DatabaseManager
+from database.migrations import explain
+
+# (来源, SQL, 参数, 计划中应出现的索引)
+CHECKS = [
+    ('DataLoader.load_knowledge_by_category',
+     'SELECT * FROM knowledge_points WHERE category = ? ORDER BY order_num',
+     ('函数',), 'idx_knowledge_category_order'),
+    ('DataLoader.load_questions_by_category',
+     'SELECT * FROM questions WHERE category = ? ORDER BY type',
+     ('函数',), 'idx_questions_category_type'),
+    ('DataLoader.load_questions_by_type',
+     'SELECT * FROM questions WHERE type = ?',
+     ('code',), 'idx_questions_type'),
+    ('DataLoader.load_user_learning_records',
+     '''SELECT lr.*, kp.title, kp.category FROM learning_records lr
+        LEFT JOIN knowledge_points kp ON lr.knowledge_id = kp.id
+        WHERE lr.user_id = ? ORDER BY lr.last_study_at DESC''',
+     (1,), 'idx_learning_user_time'),
+    ('DataLoader.load_user_practice_records',
+     '''SELECT pr.*, q.question, q.type, q.category FROM practice_records pr
+        LEFT JOIN questions q ON pr.question_id = q.id
+        WHERE pr.user_id = ? ORDER BY pr.submit_time DESC LIMIT ?''',
+     (1, 20), 'idx_practice_user_time'),
+    ('DataLoader.load_user_wrong_questions',
+     '''SELECT wq.*, q.question FROM wrong_questions wq
+        LEFT JOIN questions q ON wq.question_id = q.id
+        WHERE wq.user_id = ? AND wq.mastered = 0 ORDER BY wq.last_wrong_at DESC''',
+     (1,), 'idx_wrong_user_mastered_time'),
+    ('DataLoader.count_wrong_questions_by_category (分类)',
+     'SELECT category, 0 AS wrong FROM questions GROUP BY category',
+     (), 'COVERING INDEX idx_questions_category_type'),
+    ('DataLoader.count_wrong_questions_by_category (错题)',
+     '''SELECT q.category, 1 AS wrong FROM wrong_questions wq
+        LEFT JOIN questions q ON wq.question_id = q.id
+        WHERE wq.user_id = ? AND wq.mastered = 0''',
+     (1,), 'idx_wrong_user_mastered_time'),
+    ('DataLoader.load_wrong_question',
+     '''SELECT wq.*, q.question FROM wrong_questions wq LEFT JOIN questions q ON wq.question_id = q.id
+        WHERE wq.user_id = ? AND wq.question_id = ?''',
+     (1, 1), 'sqlite_autoindex_wrong_questions_1'),
+    ('DataLoader.get_user_statistics (分类汇总)',
+     '''SELECT SUM(study_time), SUM(knowledge_completed), SUM(practice_total), SUM(practice_correct)
+        FROM user_category_stats WHERE user_id = ?''',
+     (1,), 'sqlite_autoindex_user_category_stats_1'),
+    ('DataLoader.get_practice_breakdown',
+     '''SELECT category, q_type, practice_total, practice_correct FROM user_category_stats
+        WHERE user_id = ? AND practice_total > 0''',
+     (1,), 'sqlite_autoindex_user_category_stats_1'),
+    ('DataLoader.get_category_progress (知识点总数)',
+     'SELECT category, COUNT(*) FROM knowledge_points GROUP BY category',
+     (), 'idx_knowledge_category_order'),
+    ('DataLoader.get_category_progress (分类汇总)',
+     '''SELECT category, SUM(knowledge_completed), SUM(practice_total) FROM user_category_stats
+        WHERE user_id = ? GROUP BY category''',
+     (1,), 'sqlite_autoindex_user_category_stats_1'),
+    ('rollup.rebuild (练习记录)',
+     '''SELECT r.user_id, q.category, q.type, COUNT(*) FROM practice_records r
+        JOIN questions q ON r.question_id = q.id WHERE r.user_id = ?
+        GROUP BY r.user_id, q.category, q.type''',
+     (1,), 'idx_practice_user_question'),
+    ('DataLoader.get_daily_statistics',
+     '''SELECT study_date, total_time FROM study_statistics
+        WHERE user_id = ? AND study_date BETWEEN ? AND ?''',
+     (1, '2024-01-01', '2024-01-07'), 'sqlite_autoindex_study_statistics_1'),
+    ('DataLoader.get_study_streak',
+     'SELECT study_date FROM study_statistics WHERE user_id = ? AND total_time > 0 ORDER BY study_date',
+     (1,), 'sqlite_autoindex_study_statistics_1'),
+    ('QuestionSampler.candidate_ids (分类+题型)',
+     'SELECT q.id FROM questions q WHERE q.category = ? AND q.type = ?',
+     ('函数', 'code'), 'COVERING INDEX idx_questions_category_type'),
+    ('QuestionSampler.candidate_ids (只做新题)',
+     '''SELECT q.id FROM questions q WHERE q.category = ? AND NOT EXISTS
+        (SELECT 1 FROM practice_records pr WHERE pr.user_id = ? AND pr.question_id = q.id)''',
+     ('函数', 1), 'idx_practice_user_question'),
+    ('exam_papers.load_paper',
+     '''SELECT content_hash, source_version = (SELECT COALESCE(SUM(version), 0) FROM content_version
+        WHERE name IN ('questions', 'exam_questions', 'test_cases')) FROM exam_papers WHERE exam_id = ?''',
+     (1,), 'exam_papers USING INTEGER PRIMARY KEY'),
+    ('exam_papers.compile_paper',
+     '''SELECT q.*, eq.score, eq.order_num FROM questions q
+        JOIN exam_questions eq ON q.id = eq.question_id
+        WHERE eq.exam_id = ? ORDER BY eq.order_num''',
+     (1,), 'idx_exam_questions_exam_order'),
+    ('exam_papers.compile_paper (测试点)',
+     '''SELECT * FROM test_cases WHERE question_id IN (?, ?, ?)
+        ORDER BY question_id, order_num''',
+     (1, 2, 3), 'idx_test_cases_question_order'),
+    ('ExamGrader.grade_coding_question',
+     'SELECT * FROM test_cases WHERE question_id = ? ORDER BY order_num',
+     (1,), 'idx_test_cases_question_order'),
+    ('ExamWidget.load_exam_history',
+     '''SELECT er.*, e.name FROM exam_records er JOIN exams e ON er.exam_id = e.id
+        WHERE er.user_id = ? ORDER BY er.start_time DESC''',
+     (1,), 'idx_exam_records_user_time'),
+    ('exam_drafts.load_resumable',
+     '''SELECT er.id, er.exam_id, d.answers, d.current_index, d.elapsed_seconds
+        FROM exam_records er JOIN exam_drafts d ON d.exam_record_id = er.id
+        WHERE er.user_id = ? AND er.status = 'in_progress'
+        ORDER BY er.start_time DESC LIMIT 1''',
+     (1,), 'idx_exam_records_user_status_time'),
+    ('review_schedule.due_batch',
+     '''SELECT wq.*, q.question FROM wrong_questions wq JOIN questions q ON wq.question_id = q.id
+        WHERE wq.user_id = ? AND wq.due_at <= ? ORDER BY wq.due_at LIMIT ?''',
+     (1, '2024-01-01 00:00:00', 15), 'idx_wrong_user_due (user_id=? AND due_at<?)'),
+    ('review_schedule.next_due_at',
+     '''SELECT wq.due_at FROM wrong_questions wq JOIN questions q ON wq.question_id = q.id
+        WHERE wq.user_id = ? AND wq.due_at > ? ORDER BY wq.due_at LIMIT 1''',
+     (1, '2024-01-01 00:00:00'), 'idx_wrong_user_due (user_id=? AND due_at>?)'),
+    ('review_schedule.next_due_at (分类)',
+     '''SELECT wq.due_at FROM wrong_questions wq JOIN questions q ON wq.question_id = q.id
+        WHERE wq.user_id = ? AND wq.due_at > ? AND q.category = ? ORDER BY wq.due_at LIMIT 1''',
+     (1, '2024-01-01 00:00:00', '函数'), 'idx_wrong_user_due (user_id=? AND due_at>?)'),
+]
+
+
+def main():
+    tmp_dir = tempfile.mkdtemp(prefix='check_plans_')
+    manager = DatabaseManager(os.path.join(tmp_dir, 'plans.db'))
+
+    failures = 0
+    with manager.checkout() as conn:
+        for source, query, params, index in CHECKS:
+            plan = explain(conn, query, params)
+            ok = any(index in detail for detail in plan)
+            failures += 0 if ok else 1
+            print(f"[{'OK' if ok else 'FAIL'}] {source}")
+            for detail in plan:
+                print(f"       {detail}")
+    manager.close()
+
+    print(f"\n{len(CHECKS) - failures}/{len(CHECKS)} 条查询命中预期索引")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,6 +4,7 @@
 添加Python学习相关的知识点和题目数据
 """
 from database.db_manager import db_manager
+from utils.content_cache import content_cache
 import json
 
 
@@ -83,6 +84,7 @@ def init_knowledge_data():
     print(f"已添加 {len(knowledge_data)} 条知识点数据")
 
     db_manager.disconnect()
+    content_cache.invalidate('knowledge_points')
 
 
 def init_question_data():
@@ -237,6 +239,7 @@ def init_question_data():
     print(f"已添加 {len(code_questions)} 道编程题")
 
     db_manager.disconnect()
+    content_cache.invalidate('questions')
 
 
 def main():
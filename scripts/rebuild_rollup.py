@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+重建汇总表
+根据练习记录、考试记录和学习记录重新计算分类汇总（user_category_stats）
+和每日学习统计（study_statistics），用于汇总数据与原始记录不一致时的修复
+
+用法: python scripts/rebuild_rollup.py [--user 用户ID] [--db 数据库路径]
+"""
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import DATABASE_PATH
+from database.db_manager import DatabaseManager
+from database import rollup, study_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='重建分类汇总表和每日学习统计')
+    parser.add_argument('--user', type=int, default=None, help='只重建指定用户（默认全部）')
+    parser.add_argument('--db', default=DATABASE_PATH, help='数据库文件路径')
+    args = parser.parse_args()
+
+    manager = DatabaseManager(args.db)
+    with manager.transaction() as conn:
+        rollup_count = rollup.rebuild(conn, args.user)
+        daily_count = study_stats.rebuild(conn, args.user)
+    manager.close()
+
+    target = f'用户 {args.user}' if args.user is not None else '全部用户'
+    print(f"已重建{target}的分类汇总，共 {rollup_count} 行")
+    print(f"已重建{target}的每日学习统计，共 {daily_count} 行")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+练习提交写后队列测试
+覆盖：写入顺序、数据库错误后重试、出错提交的隔离、关闭时写完剩余数据或报告丢失
+全部使用临时数据库
+用法: python -m pytest tests
+"""
+import os
+import sys
+import sqlite3
+import shutil
+import tempfile
+import unittest
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 全局 db_manager 在导入时创建，先指向临时数据库，避免改动项目数据库
+TMP_DIR = tempfile.mkdtemp(prefix='test_practice_writer_')
+import config
+config.DATABASE_PATH = os.path.join(TMP_DIR, 'global.db')
+
+from database.db_manager import DatabaseManager
+from utils.practice_writer import PracticeWriter
+
+Question = namedtuple('Question', ['id', 'category', 'type'])
+QUESTION = Question(1, '函数', 'choice')
+
+
+class FlakyDatabase:
+    """前 failures 次开启事务时抛出数据库错误，之后正常写入；failures 为None时一直失败"""
+
+    def __init__(self, db, failures=None):
+        self.db = db
+        self.failures = failures
+        self.attempts = 0
+
+    @contextmanager
+    def transaction(self):
+        self.attempts += 1
+        if self.failures is None or self.attempts <= self.failures:
+            raise sqlite3.OperationalError('database is locked')
+        with self.db.transaction() as conn:
+            yield conn
+
+
+class PracticeWriterTest(unittest.TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp(prefix='writer_', dir=TMP_DIR)
+        self.db = DatabaseManager(os.path.join(self.tmp_dir, 'test.db'))
+
+    def tearDown(self):
+        self.db.close()
+
+    def answers(self):
+        with self.db.checkout() as conn:
+            return [row[0] for row in conn.execute('SELECT user_answer FROM practice_records ORDER BY id')]
+
+    def test_writes_in_submission_order(self):
+        writer = PracticeWriter(self.db, flush_interval=0.05, max_batch=7)
+        for i in range(50):
+            writer.submit(1, QUESTION, i, i % 3 == 0)
+        self.assertTrue(writer.flush(5))
+        self.assertEqual(self.answers(), [str(i) for i in range(50)])
+        with self.db.checkout() as conn:
+            wrong_count = conn.execute('SELECT wrong_count FROM wrong_questions WHERE user_id = 1').fetchone()[0]
+        self.assertEqual(wrong_count, 33)
+        self.assertTrue(writer.close())
+
+    def test_retries_after_database_error(self):
+        flaky = FlakyDatabase(self.db, failures=2)
+        writer = PracticeWriter(flaky, flush_interval=0.01)
+        for i in range(5):
+            writer.submit(1, QUESTION, i, True)
+        self.assertTrue(writer.flush(5))
+        self.assertEqual(flaky.attempts, 3)
+        self.assertEqual(self.answers(), [str(i) for i in range(5)])
+        self.assertTrue(writer.close())
+
+    def test_bad_submission_is_dropped_and_writer_keeps_running(self):
+        writer = PracticeWriter(self.db, flush_interval=0.01)
+        writer.submit(1, QUESTION, 'a', False)
+        # submit_time 类型错误，写入时 format_time 抛出 AttributeError
+        writer.submit(1, QUESTION, 'b', False, submit_time='not a time')
+        writer.submit(1, QUESTION, 'c', False)
+        self.assertTrue(writer.flush(5))
+        self.assertEqual(self.answers(), ['a', 'c'])
+        self.assertEqual([s.user_answer for s in writer.lost], ['b'])
+
+        writer.submit(1, QUESTION, 'd', True)
+        self.assertTrue(writer.flush(5))
+        self.assertEqual(self.answers(), ['a', 'c', 'd'])
+        self.assertFalse(writer.close())
+
+    def test_close_writes_remaining_submissions(self):
+        writer = PracticeWriter(self.db, flush_interval=60)
+        for i in range(10):
+            writer.submit(1, QUESTION, i, True, submit_time=datetime(2024, 1, 1, 8, 0, i))
+        self.assertTrue(writer.close())
+        self.assertEqual(self.answers(), [str(i) for i in range(10)])
+
+    def test_close_retries_then_reports_loss(self):
+        flaky = FlakyDatabase(self.db)
+        writer = PracticeWriter(flaky, flush_interval=60)
+        writer.submit(1, QUESTION, 'a', True)
+        self.assertFalse(writer.close(timeout=0.5))
+        self.assertGreater(flaky.attempts, 1)
+        self.assertEqual([s.user_answer for s in writer.lost], ['a'])
+        self.assertFalse(writer._thread.is_alive())
+        # 写线程结束后 flush 立即返回，不阻塞调用方
+        self.assertTrue(writer.flush(5))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,15 +5,137 @@
 """
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QPushButton, QListWidget, QListWidgetItem, QTextEdit,
-                             QRadioButton, QButtonGroup, QMessageBox, QGroupBox,
+                             QMessageBox, QGroupBox,
                              QProgressBar, QTabWidget, QTableWidget, QTableWidgetItem,
                              QHeaderView, QScrollArea, QFrame, QLineEdit, QDialog, QDialogButtonBox)
-from PyQt5.QtCore import Qt, QTimer, QDateTime
+from PyQt5.QtCore import Qt, QTimer, QDateTime, QThread, pyqtSignal
 from PyQt5.QtGui import QFont, QColor
-from config import THEME_COLORS
+from config import THEME_COLORS, EXAM_CONFIG
 from database.db_manager import DatabaseManager
+from database import exam_drafts, exam_papers
+from utils.exam_grader import ExamGrader
+from ui.question_views import QuestionViewPool, ChoiceView, JudgeView, FillView, CodeView
 import json
 import time
+import sqlite3
+
+
+class ExamGradingThread(QThread):
+    """考试判题线程：先批改客观题，再运行编程题测试点，最后在一个事务中保存"""
+    question_graded = pyqtSignal(int, int)              # 题目ID, 得分
+    objectives_graded = pyqtSignal(int)                 # 客观题总分
+    test_case_finished = pyqtSignal(int, int, bool)     # 题目ID, 测试点序号, 是否通过
+    grading_finished = pyqtSignal(int)                  # 总分（已保存）
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, grader, time_spent):
+        super().__init__()
+        self.grader = grader
+        self.time_spent = time_spent
+
+    def run(self):
+        """执行判题"""
+        try:
+            objective_score = self.grader.grade_objectives(
+                on_graded=lambda graded: self.question_graded.emit(graded.question_id, graded.score)
+            )
+            self.objectives_graded.emit(objective_score)
+
+            self.grader.grade_coding(
+                on_graded=lambda graded: self.question_graded.emit(graded.question_id, graded.score),
+                on_case=lambda question_id, case: self.test_case_finished.emit(
+                    question_id, case.index, case.passed)
+            )
+            self.grading_finished.emit(self.grader.save(self.time_spent))
+        except Exception as e:
+            self.error_occurred.emit(str(e))
+
+
+class ExamResultDialog(QDialog):
+    """考试成绩窗口：客观题判完即显示，编程题得分随判题进度补充"""
+
+    def __init__(self, exam, grader, time_spent, parent=None):
+        super().__init__(parent)
+        self.exam = exam
+        self.grader = grader
+        self.time_spent = time_spent
+        # 编程题的测试点进度 {题目ID: [已完成, 已通过]}
+        self.case_progress = {q['id']: [0, 0] for q in grader.coding_questions}
+        self.coding_items = {}
+        self.init_ui()
+
+    def init_ui(self):
+        """初始化界面"""
+        self.setWindowTitle('考试结果')
+        self.setMinimumWidth(420)
+        layout = QVBoxLayout()
+
+        self.score_label = QLabel(f"得分：判题中... / {self.exam['total_score']}")
+        self.score_label.setFont(QFont('Microsoft YaHei', 14, QFont.Bold))
+        layout.addWidget(self.score_label)
+
+        time_label = QLabel(f'用时：{self.time_spent} 分钟')
+        time_label.setFont(QFont('Microsoft YaHei', 11))
+        layout.addWidget(time_label)
+
+        self.status_label = QLabel('正在批改客观题...')
+        self.status_label.setFont(QFont('Microsoft YaHei', 11))
+        layout.addWidget(self.status_label)
+
+        answered = len(self.grader.objective_questions) + len(self.case_progress)
+        self.progress = QProgressBar()
+        self.progress.setMaximum(max(answered, 1))
+        self.progress.setValue(0)
+        layout.addWidget(self.progress)
+
+        if self.case_progress:
+            self.coding_list = QListWidget()
+            self.coding_list.setFont(QFont('Microsoft YaHei', 10))
+            for index, question in enumerate(self.grader.coding_questions, 1):
+                item = QListWidgetItem(f'编程题 {index}：等待判题')
+                self.coding_list.addItem(item)
+                self.coding_items[question['id']] = (index, item)
+            layout.addWidget(self.coding_list)
+
+        self.button_box = QDialogButtonBox(QDialogButtonBox.Ok)
+        self.button_box.button(QDialogButtonBox.Ok).setEnabled(False)
+        self.button_box.accepted.connect(self.accept)
+        layout.addWidget(self.button_box)
+
+        self.setLayout(layout)
+
+    def on_question_graded(self, question_id, score):
+        """一道题判完"""
+        self.progress.setValue(self.progress.value() + 1)
+        if question_id in self.coding_items:
+            index, item = self.coding_items[question_id]
+            done, passed = self.case_progress[question_id]
+            item.setText(f'编程题 {index}：通过 {passed}/{done} 个测试点，得 {score} 分')
+            self.score_label.setText(f"得分：{self.grader.score} / {self.exam['total_score']}（编程题判题中）")
+
+    def on_objectives_graded(self, objective_score):
+        """客观题全部判完，先显示客观题成绩"""
+        self.score_label.setText(f"得分：{objective_score} / {self.exam['total_score']}"
+                                 + ('（编程题判题中）' if self.case_progress else ''))
+        self.status_label.setText('正在运行编程题测试点...' if self.case_progress else '正在保存成绩...')
+
+    def on_test_case_finished(self, question_id, case_index, passed):
+        """一个测试点运行完成"""
+        progress = self.case_progress[question_id]
+        progress[0] += 1
+        progress[1] += 1 if passed else 0
+        index, item = self.coding_items[question_id]
+        item.setText(f'编程题 {index}：已运行 {progress[0]} 个测试点，通过 {progress[1]} 个')
+
+    def on_grading_finished(self, total_score):
+        """判题并保存完成"""
+        passed = total_score >= self.exam['pass_score']
+        self.score_label.setText(f"得分：{total_score} / {self.exam['total_score']}")
+        status = f"结果：{'✓ 及格' if passed else '✗ 不及格'}"
+        if self.grader.time_saved >= 0.1:
+            status += f'\n编程题测试点并行运行，节省 {self.grader.time_saved:.1f} 秒'
+        self.status_label.setText(status)
+        self.button_box.button(QDialogButtonBox.Ok).setEnabled(True)
 
 
 class ExamWidget(QWidget):
@@ -33,9 +155,23 @@ class ExamWidget(QWidget):
         self.exam_record_id = None
         self.current_question_index = 0
         self.questions = []
+        # 当前试卷快照的内容哈希
+        self.paper_hash = None
         self.answers = {}
         self.start_time = None
         self.timer = None
+        # 后台判题线程与成绩窗口
+        self.grading_thread = None
+        self.result_dialog = None
+        # 答题草稿防抖保存：最后一次修改后 autosave_delay 毫秒才写入
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.setSingleShot(True)
+        self.autosave_timer.setInterval(EXAM_CONFIG['autosave_delay'])
+        self.autosave_timer.timeout.connect(self.flush_draft)
+        # 上次写入草稿时的已用时间（秒）
+        self.last_autosave = 0
+        # 本次打开程序后是否已询问过恢复考试
+        self.resume_checked = False
 
         self.init_ui()
 
@@ -196,6 +332,53 @@ class ExamWidget(QWidget):
         self.question_widget.setMinimumHeight(480)
         self.question_widget.setMaximumHeight(480)
 
+        # 题目标题、内容和答题视图只创建一次，切换题目时重新绑定
+        self.question_title_label = QLabel()
+        self.question_title_label.setFont(QFont('Microsoft YaHei', 14, QFont.Bold))
+        self.question_title_label.setStyleSheet(f'color: {THEME_COLORS["primary"]}; padding: 10px;')
+        self.question_layout.addWidget(self.question_title_label)
+
+        self.question_content_label = QLabel()
+        self.question_content_label.setWordWrap(True)
+        self.question_content_label.setFont(QFont('Microsoft YaHei', 15))
+        self.question_content_label.setStyleSheet('padding: 10px; background-color: white; border-radius: 5px;')
+        self.question_layout.addWidget(self.question_content_label)
+
+        option_style = 'padding: 8px; background-color: white;'
+        self.answer_views = QuestionViewPool({
+            'choice': lambda: ChoiceView(font_size=13, item_style=option_style),
+            'judge': lambda: JudgeView(font_size=13, item_style=option_style),
+            'fill': lambda: FillView(font_size=10, input_style='''
+                QLineEdit {
+                    padding: 10px;
+                    border: 2px solid #E0E0E0;
+                    border-radius: 5px;
+                    font-size: 12px;
+                }
+            '''),
+            'code': lambda: CodeView(font_size=10, editor_style='''
+                QTextEdit {
+                    background-color: #2b2b2b;
+                    color: #f8f8f2;
+                    border: 2px solid #5B9BD5;
+                    border-radius: 5px;
+                    padding: 10px;
+                }
+            ''', hint='💡 提示：本题将通过多个测试点进行评分',
+                hint_style=f'color: {THEME_COLORS["info"]}; padding: 5px;'),
+        })
+        for q_type in ('choice', 'judge', 'fill', 'code'):
+            self.answer_views.view(q_type).answer_changed.connect(self.on_answer_changed)
+        self.answer_views.clear()
+        self.question_layout.addWidget(self.answer_views)
+
+        self.unknown_type_label = QLabel()
+        self.unknown_type_label.setFont(QFont('Microsoft YaHei', 10))
+        self.unknown_type_label.setStyleSheet('color: red; padding: 10px;')
+        self.unknown_type_label.hide()
+        self.question_layout.addWidget(self.unknown_type_label)
+        self.question_layout.addStretch()
+
         scroll = QScrollArea()
         scroll.setWidget(self.question_widget)
         scroll.setWidgetResizable(True)
@@ -371,49 +554,110 @@ class ExamWidget(QWidget):
             # 创建考试记录
             self.create_exam_record()
 
-            # 初始化答案字典
-            self.answers = {}
-            self.current_question_index = 0
+            self.begin_exam_session({}, 0, 0)
+
+            QMessageBox.information(self, '提示', '考试已开始，请认真作答！')
 
-            # 开始计时
-            self.start_time = time.time()
-            self.timer = QTimer()
-            self.timer.timeout.connect(self.update_timer)
-            self.timer.start(1000)  # 每秒更新
+        except Exception as e:
+            QMessageBox.critical(self, '错误', f'开始考试失败: {str(e)}')
 
-            # 切换到考试界面
-            self.tab_widget.setCurrentWidget(self.exam_progress_widget)
+    def begin_exam_session(self, answers, current_index, elapsed_seconds):
+        """
+        进入答题界面并开始计时（新考试和恢复的考试共用）
+        :param answers: 已作答的答案
+        :param current_index: 当前题号
+        :param elapsed_seconds: 已用时间（秒）
+        """
+        self.answers = answers
+        self.current_question_index = min(current_index, len(self.questions) - 1)
 
-            # 显示第一题
-            self.show_question()
+        # 开始计时（恢复的考试扣除已用时间）
+        self.start_time = time.time() - elapsed_seconds
+        self.last_autosave = elapsed_seconds
+        if self.timer:
+            self.timer.stop()
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.update_timer)
+        self.timer.start(1000)  # 每秒更新
 
-            # 更新进度
-            self.update_progress()
+        # 立即写入一次草稿，开考后程序意外退出也能恢复
+        self.flush_draft()
 
-            QMessageBox.information(self, '提示', '考试已开始，请认真作答！')
+        # 切换到考试界面
+        self.tab_widget.setCurrentWidget(self.exam_progress_widget)
 
-        except Exception as e:
-            QMessageBox.critical(self, '错误', f'开始考试失败: {str(e)}')
+        # 显示当前题
+        self.show_question()
+
+        # 更新进度
+        self.update_progress()
+
+    def check_resumable_exam(self):
+        """检查是否有意外中断的考试，询问是否继续"""
+        if self.resume_checked or self.exam_record_id is not None:
+            return
+        self.resume_checked = True
 
-    def load_exam_questions(self):
-        """加载考试题目"""
         try:
-            self.db.connect()
-            result = self.db.execute_query('''
-                SELECT q.*, eq.score, eq.order_num
-                FROM questions q
-                JOIN exam_questions eq ON q.id = eq.question_id
-                WHERE eq.exam_id = ?
-                ORDER BY eq.order_num
-            ''', (self.current_exam['id'],))
+            with self.db.checkout() as conn:
+                draft = exam_drafts.load_resumable(conn, self.current_user.id)
+        except sqlite3.Error as e:
+            print(f"读取考试草稿失败: {e}")
+            return
+        if draft is None:
+            return
 
-            self.questions = [dict(row) for row in result]
+        exam = draft['exam']
+        remaining = max(0, exam['duration'] * 60 - draft['elapsed_seconds'])
+        reply = QMessageBox.question(
+            self, '恢复考试',
+            f"检测到未完成的考试「{exam['name']}」\n"
+            f"已答 {len(draft['answers'])} 题，剩余时间 {remaining // 60:02d}:{remaining % 60:02d}\n"
+            f"是否继续作答？（选择“否”将放弃该场考试）",
+            QMessageBox.Yes | QMessageBox.No
+        )
 
-            if not self.questions:
-                raise Exception('该考试没有题目')
+        try:
+            if reply != QMessageBox.Yes:
+                with self.db.transaction() as conn:
+                    exam_drafts.abandon(conn, draft['exam_record_id'])
+                self.load_exam_history()
+                return
 
-        finally:
-            self.db.disconnect()
+            self.current_exam = exam
+            self.exam_record_id = draft['exam_record_id']
+            self.load_exam_questions()
+            self.begin_exam_session(draft['answers'], draft['current_index'], draft['elapsed_seconds'])
+        except Exception as e:
+            self.current_exam = None
+            self.exam_record_id = None
+            QMessageBox.critical(self, '错误', f'恢复考试失败: {str(e)}')
+
+    def flush_draft(self):
+        """把当前答案、题号和已用时间写入考试草稿"""
+        self.autosave_timer.stop()
+        if self.exam_record_id is None or not self.start_time:
+            return
+        elapsed = int(time.time() - self.start_time)
+        try:
+            with self.db.transaction() as conn:
+                exam_drafts.save(conn, self.exam_record_id, self.answers, self.current_question_index, elapsed)
+            self.last_autosave = elapsed
+        except sqlite3.Error as e:
+            print(f"保存考试草稿失败: {e}")
+
+    def load_exam_questions(self):
+        """加载考试题目（读取试卷快照，快照不存在或题库已变化时重新编译）"""
+        exam_id = self.current_exam['id']
+        with self.db.checkout() as conn:
+            paper = exam_papers.load_paper(conn, exam_id)
+        if paper is None:
+            with self.db.transaction() as conn:
+                paper = exam_papers.compile_paper(conn, exam_id)
+
+        self.paper_hash, self.questions = paper
+        if not self.questions:
+            raise Exception('该考试没有题目')
 
     def create_exam_record(self):
         """创建考试记录"""
@@ -429,185 +673,42 @@ class ExamWidget(QWidget):
             self.db.disconnect()
 
     def show_question(self):
-        """显示当前题目"""
-        # 清空题目区域
-        for i in reversed(range(self.question_layout.count())):
-            widget = self.question_layout.itemAt(i).widget()
-            if widget:
-                widget.deleteLater()
-
+        """显示当前题目（复用答题视图，只重新绑定数据）"""
         if self.current_question_index >= len(self.questions):
             return
 
         question = self.questions[self.current_question_index]
+        question_id = question['id']
 
-        # 题目标题
-        title_label = QLabel(f"第 {self.current_question_index + 1} 题 ({question['score']}分)")
-        title_label.setFont(QFont('Microsoft YaHei', 14, QFont.Bold))
-        title_label.setStyleSheet(f'color: {THEME_COLORS["primary"]}; padding: 10px;')
-        self.question_layout.addWidget(title_label)
-
-        # 题目内容
-        question_label = QLabel(f"<b>{question['question']}</b>")
-        question_label.setWordWrap(True)
-        question_label.setFont(QFont('Microsoft YaHei', 15))
-        question_label.setStyleSheet('padding: 10px; background-color: white; border-radius: 5px;')
-        self.question_layout.addWidget(question_label)
+        self.question_title_label.setText(f"第 {self.current_question_index + 1} 题 ({question['score']}分)")
+        self.question_content_label.setText(f"<b>{question['question']}</b>")
 
-        # 根据题型显示答题区域
+        # 根据题型绑定答题视图
         q_type = question.get('type', '')
-        if q_type == 'choice':
-            self.show_choice_question(question)
-        elif q_type == 'judge':
-            self.show_judge_question(question)
-        elif q_type == 'fill':
-            self.show_fill_question(question)
-        elif q_type == 'code':
-            self.show_coding_question(question)
-        else:
+        view = self.answer_views.view(q_type)
+        self.unknown_type_label.setVisible(view is None)
+        if view is None:
             # 如果类型不匹配，显示警告
-            warning_label = QLabel(f'未知题型: {q_type}')
-            warning_label.setFont(QFont('Microsoft YaHei', 10))
-            warning_label.setStyleSheet('color: red; padding: 10px;')
-            self.question_layout.addWidget(warning_label)
-
-        # 由于固定了高度，不再需要 addStretch() 来填充剩余空间
-
-
-    def show_choice_question(self, question):
-        """显示选择题"""
-        try:
-            # 调试：打印 options 字段的原始值
-            print(f"[DEBUG] question['options'] = {question.get('options', 'KEY_NOT_FOUND')}")
-
-            options = json.loads(question['options']) if question['options'] else []
-
-            # 调试：打印解析后的选项数量
-            print(f"[DEBUG] Parsed {len(options)} options: {options}")
-
-            if not options:
-                # 如果没有选项，显示警告
-                warning_label = QLabel("⚠️ 该题目缺少选项数据")
-                warning_label.setFont(QFont('Microsoft YaHei', 10))
-                warning_label.setStyleSheet('color: red; padding: 10px;')
-                self.question_layout.addWidget(warning_label)
-                return
-
-            self.button_group = QButtonGroup()
-            for i, option in enumerate(options):
-                radio = QRadioButton(f"{chr(65+i)}. {option}")
-                radio.setFont(QFont('Microsoft YaHei', 13))
-                radio.setStyleSheet('padding: 8px; background-color: white;')
-                self.button_group.addButton(radio, i)
-
-                # 恢复之前的答案
-                if question['id'] in self.answers and self.answers[question['id']] == chr(65+i):
-                    radio.setChecked(True)
-
-                self.question_layout.addWidget(radio)
-                print(f"[DEBUG] Added radio button: {chr(65+i)}. {option}")
-
-            # 保存答案
-            self.button_group.buttonClicked.connect(
-                lambda btn: self.save_answer(question['id'], chr(65+self.button_group.id(btn)))
-            )
-        except Exception as e:
-            # 显示错误信息
-            error_label = QLabel(f"❌ 选项加载失败: {str(e)}")
-            error_label.setFont(QFont('Microsoft YaHei', 10))
-            error_label.setStyleSheet('color: red; padding: 10px;')
-            self.question_layout.addWidget(error_label)
-            print(f"[ERROR] show_choice_question failed: {e}")
-            import traceback
-            traceback.print_exc()
-
-
-    def show_judge_question(self, question):
-        """显示判断题"""
-        self.button_group = QButtonGroup()
-
-        true_radio = QRadioButton('正确')
-        true_radio.setFont(QFont('Microsoft YaHei', 13))
-        true_radio.setStyleSheet('padding: 8px; background-color: white;')
-        self.button_group.addButton(true_radio, 1)
-        self.question_layout.addWidget(true_radio)
-
-        false_radio = QRadioButton('错误')
-        false_radio.setFont(QFont('Microsoft YaHei', 13))
-        false_radio.setStyleSheet('padding: 8px; background-color: white;')
-        self.button_group.addButton(false_radio, 0)
-        self.question_layout.addWidget(false_radio)
-
-        # 恢复之前的答案
-        if question['id'] in self.answers:
-            if self.answers[question['id']] == '正确':
-                true_radio.setChecked(True)
-            else:
-                false_radio.setChecked(True)
-
-        # 保存答案
-        self.button_group.buttonClicked.connect(
-            lambda btn: self.save_answer(question['id'], '正确' if self.button_group.id(btn) == 1 else '错误')
-        )
-
-    def show_fill_question(self, question):
-        """显示填空题"""
-        self.answer_input = QLineEdit()
-        self.answer_input.setFont(QFont('Microsoft YaHei', 10))
-        self.answer_input.setPlaceholderText('请输入答案...')
-        self.answer_input.setStyleSheet('''
-            QLineEdit {
-                padding: 10px;
-                border: 2px solid #E0E0E0;
-                border-radius: 5px;
-                font-size: 12px;
-            }
-        ''')
-
-        # 恢复之前的答案
-        if question['id'] in self.answers:
-            self.answer_input.setText(self.answers[question['id']])
-
-        self.answer_input.textChanged.connect(
-            lambda text: self.save_answer(question['id'], text)
-        )
-        self.question_layout.addWidget(self.answer_input)
-
-    def show_coding_question(self, question):
-        """显示编程题"""
-        # 代码编辑器
-        self.code_editor = QTextEdit()
-        self.code_editor.setFont(QFont('Consolas', 10))
-        self.code_editor.setPlaceholderText('# 请在此编写Python代码...\n')
-        self.code_editor.setStyleSheet('''
-            QTextEdit {
-                background-color: #2b2b2b;
-                color: #f8f8f2;
-                border: 2px solid #5B9BD5;
-                border-radius: 5px;
-                padding: 10px;
-            }
-        ''')
-        self.code_editor.setMinimumHeight(300)
-
-        # 恢复之前的答案
-        if question['id'] in self.answers:
-            self.code_editor.setText(self.answers[question['id']])
-
-        self.code_editor.textChanged.connect(
-            lambda: self.save_answer(question['id'], self.code_editor.toPlainText())
-        )
-        self.question_layout.addWidget(self.code_editor)
+            self.unknown_type_label.setText(f'未知题型: {q_type}')
+        elif q_type == 'choice':
+            try:
+                options = json.loads(question['options']) if question['options'] else []
+            except (TypeError, ValueError) as e:
+                print(f"选项解析失败: {e}")
+                options = []
+            view.bind(options, self.answers.get(question_id))
+        else:
+            view.bind(self.answers.get(question_id))
 
-        # 测试点提示
-        hint_label = QLabel('💡 提示：本题将通过多个测试点进行评分')
-        hint_label.setFont(QFont('Microsoft YaHei', 9))
-        hint_label.setStyleSheet(f'color: {THEME_COLORS["info"]}; padding: 5px;')
-        self.question_layout.addWidget(hint_label)
+    def on_answer_changed(self, answer):
+        """当前题目的答案被修改"""
+        if self.current_question_index < len(self.questions):
+            self.save_answer(self.questions[self.current_question_index]['id'], answer)
 
     def save_answer(self, question_id, answer):
-        """保存答案"""
+        """保存答案（草稿防抖写入，连续输入只在停顿后写一次）"""
         self.answers[question_id] = answer
+        self.autosave_timer.start()
 
     def update_timer(self):
         """更新计时器"""
@@ -625,6 +726,10 @@ class ExamWidget(QWidget):
             self.submit_exam()
             return
 
+        # 定期保存已用时间（按距上次保存的间隔判断，计时器跳过或合并的秒数不会漏存）
+        if elapsed - self.last_autosave >= EXAM_CONFIG['autosave_interval']:
+            self.flush_draft()
+
         minutes = remaining // 60
         seconds = remaining % 60
         self.timer_label.setText(f'剩余时间: {minutes:02d}:{seconds:02d}')
@@ -648,6 +753,7 @@ class ExamWidget(QWidget):
             self.current_question_index -= 1
             self.show_question()
             self.update_progress()
+            self.autosave_timer.start()
 
     def next_question(self):
         """下一题"""
@@ -655,9 +761,13 @@ class ExamWidget(QWidget):
             self.current_question_index += 1
             self.show_question()
             self.update_progress()
+            self.autosave_timer.start()
 
     def submit_exam(self):
-        """提交考试"""
+        """提交考试（判题和保存在后台线程中进行）"""
+        if self.grading_thread is not None and self.grading_thread.isRunning():
+            return
+
         # 确认提交
         reply = QMessageBox.question(
             self, '确认提交',
@@ -668,224 +778,72 @@ class ExamWidget(QWidget):
         if reply != QMessageBox.Yes:
             return
 
-        # 停止计时
+        # 停止计时，并把最新答案写入草稿（草稿在成绩保存的同一事务中删除，
+        # 判题或保存失败时可从草稿恢复本场考试）
         if self.timer:
             self.timer.stop()
+        self.flush_draft()
 
         # 计算用时
         time_spent = int((time.time() - self.start_time) / 60) if self.start_time else 0
 
-        try:
-            # 统一连接数据库，避免嵌套连接导致锁定
-            self.db.connect()
-
-            # 判题并保存结果（使用内部方法，不再嵌套connect）
-            total_score = 0
-            for question in self.questions:
-                score = self.grade_question_internal(question)
-                total_score += score
-
-            # 更新考试记录
-            self.db.cursor.execute('''
-                UPDATE exam_records
-                SET end_time = CURRENT_TIMESTAMP,
-                    obtained_score = ?,
-                    status = 'completed',
-                    time_spent = ?
-                WHERE id = ?
-            ''', (total_score, time_spent, self.exam_record_id))
-            self.db.commit()
-
-            # 显示成绩
-            pass_score = self.current_exam['pass_score']
-            passed = total_score >= pass_score
-            result_msg = f"""
-考试已提交！
-
-得分：{total_score} / {self.current_exam['total_score']}
-用时：{time_spent} 分钟
-结果：{'✓ 及格' if passed else '✗ 不及格'}
-            """
-            QMessageBox.information(self, '考试结果', result_msg)
-
-            # 切换到考试记录页
-            self.load_exam_history()
-            self.tab_widget.setCurrentWidget(self.exam_history_widget)
-
-            # 重置状态
-            self.current_exam = None
-            self.exam_record_id = None
-            self.questions = []
-            self.answers = {}
-            self.start_time = None
-
-            # 清空考试进行中界面
-            for i in reversed(range(self.question_layout.count())):
-                widget = self.question_layout.itemAt(i).widget()
-                if widget:
-                    widget.deleteLater()
-            
-            # 重置界面显示
-            self.exam_info_label.setText('当前无考试')
-            self.timer_label.setText('剩余时间: --:--')
-            self.progress_bar.setValue(0)
-            self.progress_bar.setMaximum(0)
-            
-            # 停止计时器
-            if self.timer:
-                self.timer.stop()
-
-        except Exception as e:
-            QMessageBox.critical(self, '错误', f'提交考试失败: {str(e)}')
-        finally:
-            self.db.disconnect()
-
-    def grade_question(self, question):
-        """判题并返回得分（带数据库连接管理，供外部调用）"""
-        try:
-            self.db.connect()
-            score = self.grade_question_internal(question)
-            self.db.commit()
-            return score
-        finally:
-            self.db.disconnect()
-
-    def grade_question_internal(self, question):
-        """判题并返回得分（内部方法，假设数据库已连接）"""
-        question_id = question['id']
-        if question_id not in self.answers:
-            # 未作答
-            return 0
-
-        user_answer = self.answers[question_id]
-        correct_answer = question['answer']
-        score = question['score']
-
-        is_correct = False
-
-        if question['type'] == 'code':
-            # 编程题通过测试点判题
-            score = self.grade_coding_question_internal(question, user_answer)
-            is_correct = score > 0
-        else:
-            # 其他题型直接比对答案
-            if question['type'] == 'fill':
-                is_correct = user_answer.strip() == correct_answer.strip()
-            else:
-                is_correct = user_answer == correct_answer
-
-            score = score if is_correct else 0
-
-        # 记录答题详情（假设已连接）
-        self.db.cursor.execute('''
-            INSERT INTO exam_answers (exam_record_id, question_id, user_answer, is_correct, obtained_score)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (self.exam_record_id, question_id, user_answer, is_correct, score))
-
-        # 如果答错，加入错题本
-        if not is_correct:
-            self.add_to_wrong_questions_internal(question_id, 'exam')
-
-        return score
-
-    def grade_coding_question(self, question, user_code):
-        """编程题判题（带数据库连接管理，供外部调用）"""
-        try:
-            self.db.connect()
-            score = self.grade_coding_question_internal(question, user_code)
-            self.db.commit()
-            return score
-        except Exception as e:
-            print(f"编程题判题失败: {e}")
-            return 0
-        finally:
-            self.db.disconnect()
-
-    def grade_coding_question_internal(self, question, user_code):
-        """编程题判题（内部方法，假设数据库已连接）"""
-        # 获取测试点
-        result = self.db.execute_query(
-            'SELECT * FROM test_cases WHERE question_id = ? ORDER BY order_num',
-            (question['id'],)
-        )
-        test_cases = [dict(row) for row in result]
-
-        if not test_cases:
-            # 没有测试点，使用标准答案比对
-            return question['score'] if user_code.strip() == question['answer'].strip() else 0
-
-        # 运行测试点
-        passed_count = 0
-        total_score = 0
-
-        for test_case in test_cases:
-            passed = self.run_test_case(user_code, test_case)
-            if passed:
-                passed_count += 1
-                total_score += test_case['score']
+        # 判题器持有题目和答案的副本，界面状态可以立即重置
+        grader = ExamGrader(self.current_user.id, self.exam_record_id,
+                            list(self.questions), dict(self.answers), db=self.db)
+        self.result_dialog = ExamResultDialog(self.current_exam, grader, time_spent, self)
 
-        # 更新答题记录的测试点信息
-        self.db.cursor.execute('''
-            UPDATE exam_answers
-            SET test_cases_passed = ?, test_cases_total = ?
-            WHERE exam_record_id = ? AND question_id = ?
-        ''', (passed_count, len(test_cases), self.exam_record_id, question['id']))
+        self.grading_thread = ExamGradingThread(grader, time_spent)
+        self.grading_thread.question_graded.connect(self.result_dialog.on_question_graded)
+        self.grading_thread.objectives_graded.connect(self.result_dialog.on_objectives_graded)
+        self.grading_thread.test_case_finished.connect(self.result_dialog.on_test_case_finished)
+        self.grading_thread.grading_finished.connect(self.on_grading_finished)
+        self.grading_thread.error_occurred.connect(self.on_grading_failed)
 
-        return total_score
+        self.reset_exam_state()
+        self.result_dialog.show()
+        self.grading_thread.start()
 
-    def run_test_case(self, code, test_case):
-        """运行单个测试点"""
-        try:
-            import io
-            import sys
-            from contextlib import redirect_stdout
-
-            # 准备输入
-            input_data = test_case['input_data']
-            expected_output = test_case['expected_output'].strip()
-
-            # 创建输入流
-            old_stdin = sys.stdin
-            sys.stdin = io.StringIO(input_data)
-
-            # 捕获输出
-            f = io.StringIO()
-            with redirect_stdout(f):
-                exec(code, {'__builtins__': __builtins__})
-
-            # 恢复stdin
-            sys.stdin = old_stdin
+    def on_grading_finished(self, total_score):
+        """判题并保存完成"""
+        if self.result_dialog is not None:
+            self.result_dialog.on_grading_finished(total_score)
 
-            # 比对输出
-            actual_output = f.getvalue().strip()
-            return actual_output == expected_output
+        # 切换到考试记录页
+        self.load_exam_history()
+        self.tab_widget.setCurrentWidget(self.exam_history_widget)
+
+    def on_grading_failed(self, message):
+        """判题或保存失败：成绩未保存、草稿仍在，重新询问是否继续作答"""
+        if self.result_dialog is not None:
+            self.result_dialog.close()
+        QMessageBox.critical(self, '错误', f'提交考试失败: {message}')
+        self.resume_checked = False
+        self.check_resumable_exam()
+
+    def reset_exam_state(self):
+        """重置考试状态并清空考试进行中界面"""
+        self.current_exam = None
+        self.exam_record_id = None
+        self.questions = []
+        self.paper_hash = None
+        self.answers = {}
+        self.start_time = None
 
-        except Exception as e:
-            print(f"测试点执行失败: {e}")
-            return False
+        # 清空题目显示（控件保留复用）
+        self.question_title_label.clear()
+        self.question_content_label.clear()
+        self.unknown_type_label.hide()
+        self.answer_views.clear()
 
-    def add_to_wrong_questions(self, question_id, source='exam'):
-        """添加到错题本（带数据库连接管理，供外部调用）"""
-        try:
-            self.db.connect()
-            self.add_to_wrong_questions_internal(question_id, source)
-            self.db.commit()
-        finally:
-            self.db.disconnect()
+        # 重置界面显示
+        self.exam_info_label.setText('当前无考试')
+        self.timer_label.setText('剩余时间: --:--')
+        self.progress_bar.setValue(0)
+        self.progress_bar.setMaximum(0)
 
-    def add_to_wrong_questions_internal(self, question_id, source='exam'):
-        """添加到错题本（内部方法，假设数据库已连接）"""
-        self.db.cursor.execute('''
-            INSERT OR REPLACE INTO wrong_questions
-            (user_id, question_id, wrong_count, source, last_wrong_at)
-            VALUES (
-                ?,
-                ?,
-                COALESCE((SELECT wrong_count + 1 FROM wrong_questions WHERE user_id = ? AND question_id = ?), 1),
-                ?,
-                CURRENT_TIMESTAMP
-            )
-        ''', (self.current_user.id, question_id, self.current_user.id, question_id, source))
+        # 停止计时器
+        if self.timer:
+            self.timer.stop()
 
     def load_exam_history(self):
         """加载考试历史记录"""
@@ -913,7 +871,7 @@ class ExamWidget(QWidget):
                 self.history_table.setItem(row_position, 4, QTableWidgetItem(str(record.get('exam_total_score', record.get('total_score', 0)))))
                 self.history_table.setItem(row_position, 5, QTableWidgetItem(str(record['obtained_score'])))
 
-                status_text = '已完成' if record['status'] == 'completed' else '进行中'
+                status_text = {'completed': '已完成', 'abandoned': '已放弃'}.get(record['status'], '进行中')
                 self.history_table.setItem(row_position, 6, QTableWidgetItem(status_text))
 
         except Exception as e:
@@ -925,4 +883,5 @@ class ExamWidget(QWidget):
         """刷新界面"""
         self.load_available_exams()
         self.load_exam_history()
+        self.check_resumable_exam()
 
@@ -9,9 +9,11 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushBut
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont, QTextCursor
 from database.db_manager import db_manager
+from database import rollup, study_stats
 from utils.data_loader import DataLoader
 from config import KNOWLEDGE_CATEGORIES, THEME_COLORS
 from datetime import datetime
+import sqlite3
 import time
 
 
@@ -235,45 +237,48 @@ class KnowledgeWidget(QWidget):
         # 计算学习时长
         study_time = int(time.time() - self.start_time) if self.start_time else 0
 
-        # 保存学习记录
-        db_manager.connect()
-
-        # 检查是否已有记录
-        query = """
-            SELECT id, study_time FROM learning_records
-            WHERE user_id = ? AND knowledge_id = ?
-        """
-        result = db_manager.execute_query(
-            query,
-            (self.current_user.id, self.current_knowledge.id)
-        )
-
-        if result:
-            # 更新现有记录
-            record = dict(result[0])
-            total_time = record['study_time'] + study_time
-            update_query = """
-                UPDATE learning_records
-                SET study_time = ?, completed = 1, last_study_at = ?
-                WHERE id = ?
-            """
-            db_manager.execute_update(
-                update_query,
-                (total_time, datetime.now(), record['id'])
-            )
-        else:
-            # 创建新记录
-            insert_query = """
-                INSERT INTO learning_records
-                (user_id, knowledge_id, study_time, completed, last_study_at)
-                VALUES (?, ?, ?, 1, ?)
-            """
-            db_manager.insert(
-                insert_query,
-                (self.current_user.id, self.current_knowledge.id, study_time, datetime.now())
-            )
-
-        db_manager.disconnect()
+        # 保存学习记录（与分类汇总在同一事务中更新）
+        now = datetime.now()
+        try:
+            with db_manager.checkout() as conn:
+                # 检查是否已有记录
+                record = conn.execute(
+                    """
+                    SELECT id, study_time, completed FROM learning_records
+                    WHERE user_id = ? AND knowledge_id = ?
+                    """,
+                    (self.current_user.id, self.current_knowledge.id)
+                ).fetchone()
+
+                if record:
+                    # 更新现有记录
+                    conn.execute(
+                        """
+                        UPDATE learning_records
+                        SET study_time = ?, completed = 1, last_study_at = ?
+                        WHERE id = ?
+                        """,
+                        (record['study_time'] + study_time, now, record['id'])
+                    )
+                    newly_completed = not record['completed']
+                else:
+                    # 创建新记录
+                    conn.execute(
+                        """
+                        INSERT INTO learning_records
+                        (user_id, knowledge_id, study_time, completed, last_study_at)
+                        VALUES (?, ?, ?, 1, ?)
+                        """,
+                        (self.current_user.id, self.current_knowledge.id, study_time, now)
+                    )
+                    newly_completed = True
+
+                rollup.record_knowledge(conn, self.current_user.id, self.current_knowledge.category,
+                                        study_time, newly_completed)
+                study_stats.record_activity(conn, self.current_user.id, study_time=study_time,
+                                            knowledge=1 if newly_completed else 0, knowledge_time=study_time)
+        except sqlite3.Error as e:
+            print(f"保存学习记录失败: {e}")
 
         QMessageBox.information(self, '成功', '已标记为完成！')
         self.update_progress()
@@ -294,8 +299,8 @@ class KnowledgeWidget(QWidget):
 
         # 已完成数
         completed_query = """
-            SELECT COUNT(*) as count FROM learning_records
-            WHERE user_id = ? AND completed = 1
+            SELECT COALESCE(SUM(knowledge_completed), 0) as count FROM user_category_stats
+            WHERE user_id = ?
         """
         completed_result = db_manager.execute_query(completed_query, (self.current_user.id,))
         completed_count = dict(completed_result[0])['count'] if completed_result else 0
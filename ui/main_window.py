@@ -3,6 +3,7 @@
 主窗口
 系统主界面，包含菜单栏、工具栏、状态栏和各功能模块
 """
+import importlib
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QStackedWidget, QListWidget, QListWidgetItem,
                              QMenuBar, QMenu, QAction, QToolBar,
@@ -13,6 +14,22 @@ from config import WINDOW_CONFIG, THEME_COLORS
 from models.user import User
 from ui.ai_assistant_widget import FloatingAssistant
 from database.db_manager import db_manager
+from utils.practice_writer import flush_pending, close_writer
+from utils.startup_timer import startup_timer
+
+# 导航页面：(属性名, 导航标题, 模块, 类名)，按导航顺序排列
+PAGES = [
+    ('knowledge_widget', '知识学习', 'ui.knowledge_widget', 'KnowledgeWidget'),
+    ('practice_widget', '题库练习', 'ui.practice_widget', 'PracticeWidget'),
+    ('exam_widget', '模拟考试', 'ui.exam_widget', 'ExamWidget'),
+    ('editor_widget', '编辑器', 'ui.editor_widget', 'EditorWidget'),
+    # 学习进度（“学习记录”迁移到个人主页）
+    ('progress_widget', '学习进度', 'ui.progress_widget', 'ProgressWidget'),
+    ('mistakes_widget', '错题本', 'ui.mistakes_widget', 'MistakesWidget'),
+    ('statistics_widget', '成绩统计', 'ui.statistics_widget', 'StatisticsWidget'),
+    # 个人主页（包含学习记录、头像更换、背景自定义）
+    ('profile_widget', '个人主页', 'ui.profile_widget', 'ProfileWidget'),
+]
 
 
 class MainWindow(QMainWindow):
@@ -24,7 +41,9 @@ class MainWindow(QMainWindow):
         :param user: 当前登录用户
         """
         super().__init__()
+        startup_timer.mark('创建主窗口')
         self.current_user = user
+        self._first_paint_done = False
         self.init_ui()
 
     def init_ui(self):
@@ -118,57 +137,24 @@ class MainWindow(QMainWindow):
             pass
 
     def init_modules(self):
-        """初始化各功能模块"""
-        # 这里会在后续添加各个功能模块的标签页
-        # 暂时添加占位符
-        from ui.knowledge_widget import KnowledgeWidget
-        from ui.practice_widget import PracticeWidget
-        from ui.editor_widget import EditorWidget
-        from ui.progress_widget import ProgressWidget
-        from ui.mistakes_widget import MistakesWidget
-        from ui.statistics_widget import StatisticsWidget
-        from ui.profile_widget import ProfileWidget
-        from ui.exam_widget import ExamWidget
-
-        # 添加知识点学习模块（不使用图标，只保留文字）
-        self.knowledge_widget = KnowledgeWidget(self.current_user)
-        self.stack.addWidget(self.knowledge_widget)
-        self.nav_list.addItem(QListWidgetItem('知识学习'))
-
-        # 添加题库练习模块
-        self.practice_widget = PracticeWidget(self.current_user)
-        self.stack.addWidget(self.practice_widget)
-        self.nav_list.addItem(QListWidgetItem('题库练习'))
-
-        # 添加模拟考试模块
-        self.exam_widget = ExamWidget(self.current_user)
-        self.stack.addWidget(self.exam_widget)
-        self.nav_list.addItem(QListWidgetItem('模拟考试'))
-
-        # 添加代码编辑器模块
-        self.editor_widget = EditorWidget(self.current_user)
-        self.stack.addWidget(self.editor_widget)
-        self.nav_list.addItem(QListWidgetItem('编辑器'))
-
-        # 添加学习进度模块（将“学习记录”会迁移到个人主页）
-        self.progress_widget = ProgressWidget(self.current_user)
-        self.stack.addWidget(self.progress_widget)
-        self.nav_list.addItem(QListWidgetItem('学习进度'))
-
-        # 添加错题本模块
-        self.mistakes_widget = MistakesWidget(self.current_user)
-        self.stack.addWidget(self.mistakes_widget)
-        self.nav_list.addItem(QListWidgetItem('错题本'))
-
-        # 添加成绩统计模块
-        self.statistics_widget = StatisticsWidget(self.current_user)
-        self.stack.addWidget(self.statistics_widget)
-        self.nav_list.addItem(QListWidgetItem('成绩统计'))
-
-        # 添加个人主页模块（包含学习记录、头像更换、背景自定义）
-        self.profile_widget = ProfileWidget(self.current_user)
-        self.stack.addWidget(self.profile_widget)
-        self.nav_list.addItem(QListWidgetItem('个人主页'))
+        """
+        初始化各功能模块
+        默认每个导航项先放一个占位页，第一次切换到该页时才导入模块并创建界面（见 ensure_page），
+        首次绘制后再创建第一个页面；WINDOW_CONFIG['lazy_pages'] 为False时启动即创建全部页面
+        """
+        with startup_timer.measure('创建导航与占位页'):
+            self.page_placeholders = {}
+            for index, (_, title, _, _) in enumerate(PAGES):
+                placeholder = QLabel('加载中...')
+                placeholder.setAlignment(Qt.AlignCenter)
+                placeholder.setFont(QFont('Microsoft YaHei', 14))
+                self.page_placeholders[index] = placeholder
+                self.stack.addWidget(placeholder)
+                self.nav_list.addItem(QListWidgetItem(title))
+
+        if not WINDOW_CONFIG['lazy_pages']:
+            for index in range(len(PAGES)):
+                self.ensure_page(index)
 
         # 统一条目高度、对齐与提示，提升“均匀分布”的观感
         # 调整字体（进一步缩小：约 +5%），并将每项高度略增（88 -> 102）
@@ -187,11 +173,55 @@ class MainWindow(QMainWindow):
             item.setSizeHint(QSize(340, 240))  # 更宽更高,纵向更舒展
             item.setToolTip(item.text())      # 收起时悬停显示完整名称
 
+    def ensure_page(self, index):
+        """
+        确保指定页面已创建：仍是占位页时导入模块、创建界面并替换占位页
+        :param index: 页面序号
+        """
+        placeholder = self.page_placeholders.pop(index, None)
+        if placeholder is None:
+            return
+
+        attr, title, module_name, class_name = PAGES[index]
+        with startup_timer.measure(f'创建页面: {title}'):
+            module = importlib.import_module(module_name)
+            widget = getattr(module, class_name)(self.current_user)
+        setattr(self, attr, widget)
+        self.stack.insertWidget(index, widget)
+        self.stack.removeWidget(placeholder)
+        placeholder.deleteLater()
+
+    def paintEvent(self, event):
+        """首次绘制后再创建第一个页面，让窗口尽快显示出来"""
+        super().paintEvent(event)
+        if not self._first_paint_done:
+            self._first_paint_done = True
+            startup_timer.mark('主窗口首次绘制')
+            QTimer.singleShot(0, self.open_first_page)
+
+    def open_first_page(self):
+        """显示第一个页面（导航切换时按需创建）"""
+        if self.nav_list.currentRow() < 0:
+            self.nav_list.setCurrentRow(0)
+        startup_timer.mark('首个页面可用')
+        if WINDOW_CONFIG['startup_report']:
+            print(startup_timer.report())
+        path = startup_timer.finish()
+        if path:
+            print(f"启动耗时报告已写入: {path}")
+
     def on_page_changed(self, index):
         """页面切换时刷新数据"""
+        # 先写完队列中的练习提交，各页面读到的是最新数据
+        flush_pending()
+
+        # 第一次打开的页面在此创建；新建的页面同样刷新，
+        # 部分页面（如模拟考试的历史记录、未完成考试提示）只在 refresh() 中加载
+        self.ensure_page(index)
+
         # 切换到对应页面
         self.stack.setCurrentIndex(index)
-        
+
         # 根据索引刷新对应页面的数据
         # 索引对应：0=知识学习, 1=题库练习, 2=模拟考试, 3=编辑器, 
         #          4=学习进度, 5=错题本, 6=成绩统计, 7=个人主页
@@ -517,6 +547,8 @@ class MainWindow(QMainWindow):
         )
 
         if reply == QMessageBox.Yes:
+            # 退出前写完队列中的练习提交
+            close_writer()
             event.accept()
         else:
             event.ignore()
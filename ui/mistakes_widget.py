@@ -15,7 +15,9 @@ from utils.code_executor import CodeExecutor
 from models.question import Question
 from config import THEME_COLORS, QUESTION_TYPES
 from database.db_manager import db_manager
+from database import review_schedule
 from datetime import datetime
+import sqlite3
 
 
 class MistakesWidget(QWidget):
@@ -463,15 +465,13 @@ class MistakesWidget(QWidget):
         self.review_queue = []
         self.current_index = 0
         self.mastered_for_retest = []
+        self.ambiguous_ids = set()
         self.in_retest = False
         self.review_mode = False
 
     def load_data(self):
-        """加载错题数据"""
-        wrong_questions = DataLoader.load_user_wrong_questions(self.current_user.id)
-
-        # 保存数据引用
-        self.wrong_questions_data = wrong_questions
+        """加载错题数据（只加载各分类的错题数，题目内容在打开列表或详情时再加载）"""
+        self.category_counts = DataLoader.count_wrong_questions_by_category(self.current_user.id)
 
         # 构建分组（按分类作为知识点分组），并按错题数降序显示
         self.populate_category_groups()
@@ -485,27 +485,19 @@ class MistakesWidget(QWidget):
             if w:
                 w.deleteLater()
 
-        # 汇总所有分类（来自所有题目，保证“都显示”）
-        all_questions = DataLoader.load_all_questions()
-        all_categories = sorted({q.category or '未分类' for q in all_questions})
-
-        # 错题计数
+        # 各分类错题数（含没有错题的分类，已按错题数降序、名称升序排好）
         wrong_counts = {}
-        for wq in getattr(self, 'wrong_questions_data', []):
-            cat = wq.get('category') or '未分类'
-            wrong_counts[cat] = wrong_counts.get(cat, 0) + 1
-
-        # 排序：先按错题数降序，再按名称
-        sorted_categories = sorted(all_categories, key=lambda c: (-wrong_counts.get(c, 0), c))
+        for category, count in getattr(self, 'category_counts', []):
+            cat = category or '未分类'
+            wrong_counts[cat] = wrong_counts.get(cat, 0) + count
 
         # “全部”卡片
-        total_wrong = len(getattr(self, 'wrong_questions_data', []))
+        total_wrong = sum(wrong_counts.values())
         self.groups_container_layout.addWidget(self._create_category_card('全部', total_wrong, None))
 
         # 分类卡片（竖向大块，可滚动）
-        for cat in sorted_categories:
-            cnt = wrong_counts.get(cat, 0)
-            self.groups_container_layout.addWidget(self._create_category_card(cat, cnt, cat))
+        for cat in sorted(wrong_counts, key=lambda c: (-wrong_counts[c], c)):
+            self.groups_container_layout.addWidget(self._create_category_card(cat, wrong_counts[cat], cat))
 
         self.groups_container_layout.addStretch()
         # 初始隐藏预览列表
@@ -560,13 +552,12 @@ class MistakesWidget(QWidget):
 
         # 更新预览列表
         self.group_list.clear()
-        filtered = [wq for wq in self.wrong_questions_data if (not category or wq.get('category') == category)]
-        for idx, wq in enumerate(filtered):
-            short = wq.get('question', '')
-            if len(short) > 60:
-                short = short[:60] + '...'
-            item = QListWidgetItem(f'[{QUESTION_TYPES.get(wq.get("type"), wq.get("type",""))}] {short}')
-            item.setData(Qt.UserRole, wq)
+        # 列表只显示题干摘要，双击时再加载完整题目
+        summaries = DataLoader.load_wrong_question_summaries(self.current_user.id, category or None)
+        for summary in summaries:
+            q_type = summary.get('type') or ''
+            item = QListWidgetItem(f'[{QUESTION_TYPES.get(q_type, q_type)}] {summary["preview"]}')
+            item.setData(Qt.UserRole, summary['question_id'])
             self.group_list.addItem(item)
         self.group_list.setVisible(True)
 
@@ -585,8 +576,9 @@ class MistakesWidget(QWidget):
         self.groups_scroll.setVisible(True)
 
     def open_preview_item(self, item):
-        """双击预览项，打开详情对话框"""
-        wq = item.data(Qt.UserRole)
+        """双击预览项，加载完整题目并打开详情对话框"""
+        question_id = item.data(Qt.UserRole)
+        wq = DataLoader.load_wrong_question(self.current_user.id, question_id) if question_id else None
         if wq:
             self.view_question_detail(wq)
 
@@ -774,18 +766,24 @@ class MistakesWidget(QWidget):
 
     def start_review(self):
         """开始卡片式复习"""
-        # 使用保存的review_count值
-        count = self.review_count
-
-        pool = [wq for wq in self.wrong_questions_data if (not self.selected_category or wq.get('category') == self.selected_category)]
-        self.review_queue = pool[:count]
+        # 只复习已到期的错题（最早到期的在前），数量不超过设置的题数
+        with db_manager.checkout() as conn:
+            category = self.selected_category or None
+            self.review_queue = review_schedule.due_batch(conn, self.current_user.id, self.review_count,
+                                                          category=category)
+            next_due = None if self.review_queue else review_schedule.next_due_at(
+                conn, self.current_user.id, category=category)
         self.current_index = 0
         self.mastered_for_retest = []
         self.mastered_candidates = []
+        self.ambiguous_ids = set()
         self.in_retest = False
 
         if not self.review_queue:
-            QMessageBox.information(self, '提示', '当前分组没有可复习的错题。')
+            message = '当前分组没有到期需要复习的错题。'
+            if next_due:
+                message += f'\n下一道错题将于 {next_due[:16]} 到期。'
+            QMessageBox.information(self, '提示', message)
             return
 
         self.enter_review_mode()
@@ -916,8 +914,9 @@ class MistakesWidget(QWidget):
         """当前题标记为模糊（稍后重复出现）"""
         if self.current_index >= len(self.review_queue):
             return
-        # 将当前题移到队尾
+        # 将当前题移到队尾（重测答对时按“较难回忆”安排下次复习）
         wq = self.review_queue[self.current_index]
+        self.ambiguous_ids.add(wq.get('question_id'))
         del self.review_queue[self.current_index]
         self.review_queue.append(wq)
         # 显示下一题（当前位置现在是下一题）
@@ -963,24 +962,27 @@ class MistakesWidget(QWidget):
         self.progress_label.setText(f'进度：{cur}/{total}')
 
         if self.current_index >= total:
-            # 重测结束：将回答正确的题移出错题本
-            correct_ids = [qid for qid, ok in self.retest_results.items() if ok]
-            removed = 0
-            if correct_ids:
-                try:
-                    db_manager.connect()
-                    for qid in correct_ids:
-                        update_query = """
-                            UPDATE wrong_questions
-                            SET mastered = 1
-                            WHERE user_id = ? AND question_id = ?
-                        """
-                        db_manager.execute_update(update_query, (self.current_user.id, qid))
-                        removed += 1
-                finally:
-                    db_manager.disconnect()
-
-            QMessageBox.information(self, '重测完成', f'重新测试完成！本次共移除 {removed} 道错题。')
+            # 重测结束：全部结果在一个事务中批量写入，按 SM-2 安排下次复习，间隔足够长的题移出错题本
+            outcomes = {}
+            for qid, ok in self.retest_results.items():
+                if not ok:
+                    outcomes[qid] = review_schedule.QUALITY_FORGOT
+                elif qid in self.ambiguous_ids:
+                    outcomes[qid] = review_schedule.QUALITY_HARD
+                else:
+                    outcomes[qid] = review_schedule.QUALITY_GOOD
+            results = {}
+            try:
+                with db_manager.transaction() as conn:
+                    results = review_schedule.record_reviews(conn, self.current_user.id, outcomes)
+            except sqlite3.Error as e:
+                print(f"保存复习结果失败: {e}")
+            mastered = sum(1 for done in results.values() if done)
+            scheduled = len(results) - mastered
+
+            QMessageBox.information(self, '重测完成',
+                                    f'重新测试完成！本次 {mastered} 道错题已掌握并移出错题本，'
+                                    f'{scheduled} 道已安排下次复习。')
             self.card_group.setTitle('卡片式复习')
             self.card_group.setVisible(False)
             self.in_retest = False
@@ -1106,6 +1108,7 @@ class MistakesWidget(QWidget):
         if self.current_index >= len(self.review_queue):
             return
         wq = self.review_queue[self.current_index]
+        self.ambiguous_ids.add(wq.get('question_id'))
         del self.review_queue[self.current_index]
         self.review_queue.append(wq)
         self.show_current_retest_card()
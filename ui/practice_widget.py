@@ -4,17 +4,16 @@
 支持选择题、判断题、填空题、编程题的练习
 """
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-                             QListWidget, QTextEdit, QRadioButton, QLineEdit, QGroupBox,
-                             QMessageBox, QButtonGroup, QComboBox, QCheckBox, QSplitter,
+                             QListWidget, QTextEdit, QGroupBox,
+                             QMessageBox, QComboBox, QCheckBox, QSplitter,
                              QListWidgetItem, QProgressBar, QScrollArea)
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont
-from database.db_manager import db_manager
-from utils.data_loader import DataLoader
 from utils.code_executor import CodeExecutor
-from models.question import Question
+from utils.practice_session import PracticeSession
+from utils.practice_writer import get_practice_writer
+from ui.question_views import QuestionViewPool, ChoiceView, JudgeView, FillView, CodeView
 from config import KNOWLEDGE_CATEGORIES, QUESTION_TYPES, THEME_COLORS
-from datetime import datetime
 import time
 import json
 
@@ -27,7 +26,7 @@ class PracticeWidget(QWidget):
         super().__init__()
         self.current_user = user
         self.current_question = None
-        self.current_questions = []
+        self.session = None
         self.current_index = 0
         self.start_time = None
         self.code_executor = CodeExecutor()
@@ -132,6 +131,15 @@ class PracticeWidget(QWidget):
         self.answer_layout = QVBoxLayout(self.answer_widget)
         answer_scroll.setWidget(self.answer_widget)
 
+        # 每种题型一个答题视图，切换题目时重新绑定
+        self.answer_views = QuestionViewPool({
+            'choice': lambda: ChoiceView(font_size=14, labelled=False),
+            'judge': lambda: JudgeView(labels=('正确 (T)', '错误 (F)'), values=('T', 'F'), font_size=14),
+            'fill': lambda: FillView(prompt='请输入答案:', placeholder='在此输入答案...', font_size=13),
+            'code': lambda: self.create_code_view(),
+        })
+        self.answer_layout.addWidget(self.answer_views)
+
         answer_group_layout.addWidget(answer_scroll)
         answer_group.setLayout(answer_group_layout)
 
@@ -226,46 +234,17 @@ class PracticeWidget(QWidget):
             q_type = self.type_combo.currentData()
             only_new = self.only_new_checkbox.isChecked()
 
-            db_manager.connect()
-
-            # 构建基础查询和排除已做题目的子查询
-            exclude_done = ""
-            params = []
-
-            if only_new:
-                # 排除已做题目
-                exclude_done = " AND id NOT IN (SELECT question_id FROM practice_records WHERE user_id = ?)"
-                params.append(self.current_user.id)
-
-            if category == '全部' and not q_type:
-                query = f"SELECT * FROM questions WHERE 1=1{exclude_done} ORDER BY RANDOM()"
-                results = db_manager.execute_query(query, tuple(params))
-            elif category == '全部':
-                query = f"SELECT * FROM questions WHERE type = ?{exclude_done} ORDER BY RANDOM()"
-                params.insert(0, q_type)
-                results = db_manager.execute_query(query, tuple(params))
-            elif not q_type:
-                query = f"SELECT * FROM questions WHERE category = ?{exclude_done} ORDER BY RANDOM()"
-                params.insert(0, category)
-                results = db_manager.execute_query(query, tuple(params))
-            else:
-                query = f"SELECT * FROM questions WHERE category = ? AND type = ?{exclude_done} ORDER BY RANDOM()"
-                params = [category, q_type] + params
-                results = db_manager.execute_query(query, tuple(params))
-
-            db_manager.disconnect()
-
-            self.current_questions = []
-            for row in results:
-                q = Question.from_dict(dict(row))
-                self.current_questions.append(q)
+            # 会话只保存打乱后的题目ID，题目内容翻页时按需加载
+            if self.session:
+                self.session.close()
+            self.session = PracticeSession.create(
+                category, q_type,
+                exclude_done_by=self.current_user.id if only_new else None
+            )
 
-            if self.current_questions:
+            if len(self.session) > 0:
                 self.current_index = 0
-                self.display_question(self.current_questions[0])
-                self.update_navigation()
-                status = "（仅未做）" if only_new else "（包含已做）"
-                QMessageBox.information(self, '成功', f'已加载 {len(self.current_questions)} 道题目{status}！')
+                self.show_current_question()
             else:
                 if only_new:
                     QMessageBox.warning(self, '提示', '没有找到未做的题目！\n提示：可以取消勾选"只显示未做题目"来查看所有题目。')
@@ -278,10 +257,6 @@ class PracticeWidget(QWidget):
             error_msg = f'加载题目失败: {str(e)}\n\n{traceback.format_exc()}'
             print(f'[ERROR] {error_msg}')
             QMessageBox.critical(self, '错误', f'加载题目失败: {str(e)}')
-            try:
-                db_manager.disconnect()
-            except:
-                pass
 
     def display_question(self, question):
         """显示题目"""
@@ -290,11 +265,12 @@ class PracticeWidget(QWidget):
         self.timer.start(1000)
 
         # 更新题目编号
-        self.question_label.setText(f'题目: {self.current_index + 1}/{len(self.current_questions)}')
+        total = len(self.session) if self.session else 0
+        self.question_label.setText(f'题目: {self.current_index + 1}/{total}')
 
         # 更新进度条
-        if len(self.current_questions) > 0:
-            progress = int(((self.current_index + 1) / len(self.current_questions)) * 100)
+        if total > 0:
+            progress = int(((self.current_index + 1) / total) * 100)
             self.progress_bar.setValue(progress)
 
         # 显示题目内容
@@ -309,80 +285,20 @@ class PracticeWidget(QWidget):
         # 清空解析
         self.explanation_text.clear()
 
-        # 根据题型显示答题区域
-        self.clear_answer_widget()
-
-        if question.type == 'choice':
-            self.display_choice_answer(question)
-        elif question.type == 'judge':
-            self.display_judge_answer(question)
-        elif question.type == 'fill':
-            self.display_fill_answer(question)
-        elif question.type == 'code':
-            self.display_code_answer(question)
+        # 根据题型绑定答题视图
+        view = self.answer_views.view(question.type)
+        if view is not None:
+            if question.type == 'choice':
+                view.bind(question.options)
+            else:
+                view.bind()
 
         self.submit_btn.setEnabled(True)
 
-    def clear_answer_widget(self):
-        """清空答题区域"""
-        # 删除所有子部件
-        while self.answer_layout.count():
-            child = self.answer_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
-
-    def display_choice_answer(self, question):
-        """显示选择题答题区域"""
-        self.button_group = QButtonGroup()
-
-        for i, option in enumerate(question.options):
-            radio = QRadioButton(option)
-            radio.setFont(QFont('Microsoft YaHei', 14))  # 放大选项字体
-            self.button_group.addButton(radio, i)
-            self.answer_layout.addWidget(radio)
-
-        self.answer_layout.addStretch()
-
-    def display_judge_answer(self, question):
-        """显示判断题答题区域"""
-        self.button_group = QButtonGroup()
-
-        true_radio = QRadioButton('正确 (T)')
-        true_radio.setFont(QFont('Microsoft YaHei', 14))  # 放大判断选项字体
-        self.button_group.addButton(true_radio, 0)
-        self.answer_layout.addWidget(true_radio)
-
-        false_radio = QRadioButton('错误 (F)')
-        false_radio.setFont(QFont('Microsoft YaHei', 14))  # 放大判断选项字体
-        self.button_group.addButton(false_radio, 1)
-        self.answer_layout.addWidget(false_radio)
-
-        self.answer_layout.addStretch()
-
-    def display_fill_answer(self, question):
-        """显示填空题答题区域"""
-        label = QLabel('请输入答案:')
-        label.setFont(QFont('Microsoft YaHei', 14))  # 放大提示文本
-        self.answer_layout.addWidget(label)
-
-        self.fill_input = QLineEdit()
-        self.fill_input.setFont(QFont('Microsoft YaHei', 13))  # 放大输入框字体
-        self.fill_input.setPlaceholderText('在此输入答案...')
-        self.answer_layout.addWidget(self.fill_input)
-
-        self.answer_layout.addStretch()
-
-    def display_code_answer(self, question):
-        """显示编程题答题区域"""
-        label = QLabel('请输入Python代码:')
-        label.setFont(QFont('Microsoft YaHei', 14))  # 放大提示文本
-        self.answer_layout.addWidget(label)
-
-        self.code_input = QTextEdit()
-        self.code_input.setFont(QFont('Consolas', 12))  # 放大代码字体
-        self.code_input.setPlaceholderText('在此输入Python代码...')
-        self.code_input.setMinimumHeight(200)  # 增加最小高度
-        self.code_input.setStyleSheet('''
+    def create_code_view(self):
+        """创建编程题答题视图"""
+        view = CodeView(prompt='请输入Python代码:', placeholder='在此输入Python代码...', font_size=12,
+                        min_height=200, runnable=True, editor_style='''
             QTextEdit {
                 background-color: #263238;
                 color: #AAAAAA;
@@ -390,46 +306,37 @@ class PracticeWidget(QWidget):
                 padding: 10px;
             }
         ''')
-        self.answer_layout.addWidget(self.code_input)
-
-        run_btn = QPushButton('▶️ 运行代码')
-        run_btn.setFont(QFont('Microsoft YaHei', 12))  # 放大按马字体
-        run_btn.clicked.connect(self.run_code)
-        self.answer_layout.addWidget(run_btn)
+        view.run_requested.connect(self.run_code)
+        return view
 
-        output_label = QLabel('运行结果:')
-        output_label.setFont(QFont('Microsoft YaHei', 12))  # 放大输出提示
-        self.answer_layout.addWidget(output_label)
-
-        self.code_output = QTextEdit()
-        self.code_output.setFont(QFont('Consolas', 11))  # 放大输出字体
-        self.code_output.setReadOnly(True)
-        self.code_output.setMaximumHeight(150)  # 增加输出高度
-        self.answer_layout.addWidget(self.code_output)
+    def clear_answer_widget(self):
+        """清空答题区域（视图保留复用）"""
+        self.answer_views.clear()
 
     def run_code(self):
         """运行代码"""
-        if not hasattr(self, 'code_input'):
+        view = self.answer_views.views.get('code')
+        if view is None:
             return
 
-        code = self.code_input.toPlainText().strip()
+        code = view.code().strip()
         if not code:
-            self.code_output.setPlainText('请输入代码！')
+            view.output.setPlainText('请输入代码！')
             return
 
         # 验证代码语法
         is_valid, error = self.code_executor.validate_code(code)
         if not is_valid:
-            self.code_output.setPlainText(f'❌ 语法错误:\n{error}')
+            view.output.setPlainText(f'❌ 语法错误:\n{error}')
             return
 
         # 执行代码
         success, output, error = self.code_executor.execute(code)
         if success:
             result = f'✓ 执行成功:\n{output if output else "(无输出)"}'
-            self.code_output.setPlainText(result)
+            view.output.setPlainText(result)
         else:
-            self.code_output.setPlainText(f'❌ 执行错误:\n{error}')
+            view.output.setPlainText(f'❌ 执行错误:\n{error}')
 
     def submit_answer(self):
         """提交答案"""
@@ -448,57 +355,9 @@ class PracticeWidget(QWidget):
         # 检查答案
         is_correct = self.current_question.check_answer(user_answer)
 
-        # 保存练习记录
-        db_manager.connect()
-        insert_query = """
-            INSERT INTO practice_records
-            (user_id, question_id, user_answer, is_correct, submit_time, time_spent)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """
-        db_manager.insert(
-            insert_query,
-            (self.current_user.id, self.current_question.id, str(user_answer),
-             is_correct, datetime.now(), time_spent)
-        )
-
-        # 如果答错，添加到错题本
-        if not is_correct:
-            # 检查错题本中是否已存在
-            check_query = """
-                SELECT id, wrong_count FROM wrong_questions
-                WHERE user_id = ? AND question_id = ?
-            """
-            result = db_manager.execute_query(
-                check_query,
-                (self.current_user.id, self.current_question.id)
-            )
-
-            if result:
-                # 更新错误次数
-                wrong_record = dict(result[0])
-                update_query = """
-                    UPDATE wrong_questions
-                    SET wrong_count = ?, last_wrong_at = ?
-                    WHERE id = ?
-                """
-                db_manager.execute_update(
-                    update_query,
-                    (wrong_record['wrong_count'] + 1, datetime.now(), wrong_record['id'])
-                )
-            else:
-                # 添加新的错题记录
-                insert_wrong_query = """
-                    INSERT INTO wrong_questions
-                    (user_id, question_id, wrong_count, mastered, first_wrong_at, last_wrong_at)
-                    VALUES (?, ?, 1, 0, ?, ?)
-                """
-                db_manager.insert(
-                    insert_wrong_query,
-                    (self.current_user.id, self.current_question.id,
-                     datetime.now(), datetime.now())
-                )
-
-        db_manager.disconnect()
+        # 练习记录、错题本和汇总数据交给后台写队列批量保存，界面立即显示结果
+        get_practice_writer().submit(self.current_user.id, self.current_question, user_answer,
+                                     is_correct, time_spent)
 
         # 显示结果和解析
         self.show_result(is_correct, user_answer)
@@ -511,29 +370,8 @@ class PracticeWidget(QWidget):
         if not self.current_question:
             return None
 
-        if self.current_question.type == 'choice':
-            if hasattr(self, 'button_group'):
-                checked = self.button_group.checkedId()
-                if checked >= 0:
-                    options = ['A', 'B', 'C', 'D', 'E', 'F']
-                    return options[checked] if checked < len(options) else None
-        elif self.current_question.type == 'judge':
-            if hasattr(self, 'button_group'):
-                checked = self.button_group.checkedId()
-                if checked == 0:
-                    return 'T'
-                elif checked == 1:
-                    return 'F'
-        elif self.current_question.type == 'fill':
-            if hasattr(self, 'fill_input'):
-                answer = self.fill_input.text().strip()
-                return answer if answer else None
-        elif self.current_question.type == 'code':
-            if hasattr(self, 'code_input'):
-                code = self.code_input.toPlainText().strip()
-                return code if code else None
-
-        return None
+        view = self.answer_views.current
+        return view.answer() if view is not None else None
 
     def show_result(self, is_correct, user_answer):
         """显示答题结果"""
@@ -559,20 +397,30 @@ class PracticeWidget(QWidget):
         """上一题"""
         if self.current_index > 0:
             self.current_index -= 1
-            self.display_question(self.current_questions[self.current_index])
-            self.update_navigation()
+            self.show_current_question()
 
     def next_question(self):
         """下一题"""
-        if self.current_index < len(self.current_questions) - 1:
+        if self.session and self.current_index < len(self.session) - 1:
             self.current_index += 1
-            self.display_question(self.current_questions[self.current_index])
-            self.update_navigation()
+            self.show_current_question()
+
+    def show_current_question(self):
+        """显示会话中当前位置的题目（按需加载所在页）"""
+        question = self.session.get(self.current_index)
+        if question is None:
+            # 题目在会话期间被删除
+            self.clear_display()
+            self.question_label.setText(f'题目: {self.current_index + 1}/{len(self.session)}（已删除）')
+        else:
+            self.display_question(question)
+        self.update_navigation()
 
     def update_navigation(self):
         """更新导航按钮状态"""
+        total = len(self.session) if self.session else 0
         self.prev_btn.setEnabled(self.current_index > 0)
-        self.next_btn.setEnabled(self.current_index < len(self.current_questions) - 1)
+        self.next_btn.setEnabled(self.current_index < total - 1)
 
     def update_time(self):
         """更新用时显示"""
@@ -13,6 +13,8 @@ from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QGraphicsDropShadowEffect
 from utils.data_loader import DataLoader
 from database.db_manager import db_manager
+from database import rollup
+from utils.practice_writer import flush_pending
 from config import THEME_COLORS
 
 
@@ -75,11 +77,13 @@ class ProfileWidget(QWidget):
         self.stat_review = self.create_stat_badge('巩固量', '0', THEME_COLORS['success'])
         self.stat_total_time = self.create_stat_badge('累计时长', '0 分钟', THEME_COLORS['primary'])
         self.stat_today_time = self.create_stat_badge('今日时长', '0 分钟', THEME_COLORS['warning'])
+        self.stat_streak = self.create_stat_badge('连续学习', '0 天', THEME_COLORS['info'])
 
         stats_layout.addWidget(self.stat_wrong)
         stats_layout.addWidget(self.stat_review)
         stats_layout.addWidget(self.stat_total_time)
         stats_layout.addWidget(self.stat_today_time)
+        stats_layout.addWidget(self.stat_streak)
         stats_group.setLayout(stats_layout)
         main_layout.addWidget(stats_group)
 
@@ -294,12 +298,12 @@ class ProfileWidget(QWidget):
         return box
 
     def load_my_stats(self):
-        # 错题数
-        wrong_list = DataLoader.load_user_wrong_questions(self.current_user.id)
-        self.stat_wrong.value_label.setText(str(len(wrong_list)))
+        stats = DataLoader.get_user_statistics(self.current_user.id)
+
+        # 错题数（未掌握）
+        self.stat_wrong.value_label.setText(str(stats.get('wrong_questions_count', 0)))
 
         # 巩固量：使用已完成知识点数量
-        stats = DataLoader.get_user_statistics(self.current_user.id)
         self.stat_review.value_label.setText(str(stats.get('completed_knowledge', 0)))
 
         # 累计时长
@@ -310,20 +314,17 @@ class ProfileWidget(QWidget):
         today_secs = self.query_today_study_seconds()
         self.stat_today_time.value_label.setText(self.format_minutes(today_secs))
 
+        # 连续学习天数（读取每日统计）
+        streak = DataLoader.get_study_streak(self.current_user.id)
+        self.stat_streak.value_label.setText(f"{streak['current']} 天")
+        self.stat_streak.setToolTip(f"最长连续 {streak['longest']} 天")
+
     def query_today_study_seconds(self):
+        # 与“累计时长”一致只统计知识点学习时间，读取每日统计中今天的一行
         try:
-            db_manager.connect()
-            sql = """
-                SELECT COALESCE(SUM(study_time),0) AS s
-                FROM learning_records
-                WHERE user_id = ? AND date(last_study_at) = date('now','localtime')
-            """
-            rows = db_manager.execute_query(sql, (self.current_user.id,))
-            return int(dict(rows[0])['s']) if rows else 0
+            return int(DataLoader.get_today_statistics(self.current_user.id)['knowledge_time'] or 0)
         except Exception:
             return 0
-        finally:
-            db_manager.disconnect()
 
     def format_minutes(self, seconds):
         m = seconds // 60
@@ -389,6 +390,8 @@ class ProfileWidget(QWidget):
         # 执行重置
         try:
             # 只清空用户相关的记录表，保留题库、知识点、考试等数据
+            # 先写完队列中的练习提交，避免清空后又被写回
+            flush_pending()
             db_manager.connect()
 
             # 1. 先删除答题详情（有外键约束，需要先删除）
@@ -398,6 +401,12 @@ class ProfileWidget(QWidget):
                     SELECT id FROM exam_records WHERE user_id = ?
                 )
             ''', (self.current_user.id,))
+            db_manager.execute_update('''
+                DELETE FROM exam_drafts
+                WHERE exam_record_id IN (
+                    SELECT id FROM exam_records WHERE user_id = ?
+                )
+            ''', (self.current_user.id,))
 
             # 2. 清空考试记录
             db_manager.execute_update('DELETE FROM exam_records WHERE user_id = ?', (self.current_user.id,))
@@ -414,6 +423,10 @@ class ProfileWidget(QWidget):
             # 6. 清空学习统计
             db_manager.execute_update('DELETE FROM study_statistics WHERE user_id = ?', (self.current_user.id,))
 
+            # 7. 清空分类汇总
+            with db_manager.transaction() as conn:
+                rollup.clear(conn, self.current_user.id)
+
             db_manager.disconnect()
 
             QMessageBox.information(
@@ -9,7 +9,6 @@ from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 from utils.data_loader import DataLoader
 from config import THEME_COLORS, KNOWLEDGE_CATEGORIES
-from database.db_manager import db_manager
 
 
 class ProgressWidget(QWidget):
@@ -165,45 +164,18 @@ class ProgressWidget(QWidget):
         """加载分类进度"""
         self.category_table.setRowCount(0)
 
-        db_manager.connect()
+        # 各分类知识点进度和练习正确率（读取分类汇总表）
+        category_progress = DataLoader.get_category_progress(self.current_user.id)
 
         for i, category in enumerate(KNOWLEDGE_CATEGORIES):
-            # 获取该分类的总知识点数
-            total_query = "SELECT COUNT(*) as count FROM knowledge_points WHERE category = ?"
-            total_result = db_manager.execute_query(total_query, (category,))
-            total_count = dict(total_result[0])['count'] if total_result else 0
-
-            # 获取已完成数（确保数据准确性：使用DISTINCT避免重复计数）
-            completed_query = """
-                SELECT COUNT(DISTINCT lr.knowledge_id) as count
-                FROM learning_records lr
-                JOIN knowledge_points kp ON lr.knowledge_id = kp.id
-                WHERE lr.user_id = ? AND kp.category = ? AND lr.completed = 1
-            """
-            completed_result = db_manager.execute_query(
-                completed_query,
-                (self.current_user.id, category)
-            )
-            completed_count = dict(completed_result[0])['count'] if completed_result else 0
+            entry = category_progress.get(category, {})
+            total_count = entry.get('knowledge_total', 0)
+            completed_count = entry.get('knowledge_completed', 0)
 
             # 获取该分类的练习题正确率
-            accuracy_query = """
-                SELECT
-                    COUNT(CASE WHEN pr.is_correct = 1 THEN 1 END) as correct,
-                    COUNT(*) as total
-                FROM practice_records pr
-                JOIN questions q ON pr.question_id = q.id
-                WHERE pr.user_id = ? AND q.category = ?
-            """
-            accuracy_result = db_manager.execute_query(
-                accuracy_query,
-                (self.current_user.id, category)
-            )
-
-            if accuracy_result and dict(accuracy_result[0])['total'] > 0:
-                correct = dict(accuracy_result[0])['correct']
-                total = dict(accuracy_result[0])['total']
-                accuracy = round((correct / total) * 100, 1)
+            practice_total = entry.get('practice_total', 0)
+            if practice_total > 0:
+                accuracy = round((entry['practice_correct'] / practice_total) * 100, 1)
                 accuracy_text = f"{accuracy}%"
             else:
                 accuracy_text = "未练习"
@@ -260,8 +232,6 @@ class ProgressWidget(QWidget):
                     accuracy_item.setForeground(Qt.darkRed)
             self.category_table.setItem(i, 4, accuracy_item)
 
-        db_manager.disconnect()
-
     def load_recent_records(self):
         """加载最近学习记录"""
         # 最近学习记录已迁移到个人主页（ProfileWidget），此处不再显示
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+题目答题视图
+每种题型只创建一个答题视图，切换题目时重新绑定数据而不是销毁重建控件，
+供考试和练习界面共用（各自通过构造参数设置字体、样式和答案取值）
+"""
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QLabel, QPushButton, QRadioButton,
+                             QButtonGroup, QLineEdit, QTextEdit)
+from PyQt5.QtCore import pyqtSignal
+from PyQt5.QtGui import QFont
+
+
+class QuestionView(QWidget):
+    """答题视图基类（子类提供 bind() 绑定题目数据，answer() 返回当前答案、未作答时返回None）"""
+    # 用户修改答案时发出（绑定数据时不发出）
+    answer_changed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.view_layout = QVBoxLayout(self)
+        self.view_layout.setContentsMargins(0, 0, 0, 0)
+
+
+class ChoiceView(QuestionView):
+    """选择题：单选按钮按需增加，多余的隐藏"""
+
+    def __init__(self, font_size=13, item_style='', labelled=True, parent=None):
+        """
+        :param font_size: 选项字号
+        :param item_style: 选项样式表
+        :param labelled: 是否在选项前加 “A. ” 等序号（选项文本本身带序号时传False）
+        """
+        super().__init__(parent)
+        self.font_size = font_size
+        self.item_style = item_style
+        self.labelled = labelled
+        self.radios = []
+        self.group = QButtonGroup(self)
+        self.group.buttonClicked.connect(lambda btn: self.answer_changed.emit(chr(65 + self.group.id(btn))))
+
+        self.warning_label = QLabel('⚠️ 该题目缺少选项数据')
+        self.warning_label.setFont(QFont('Microsoft YaHei', 10))
+        self.warning_label.setStyleSheet('color: red; padding: 10px;')
+        self.warning_label.hide()
+        self.view_layout.addWidget(self.warning_label)
+        self.view_layout.addStretch()
+
+    def bind(self, options, answer=None):
+        """
+        绑定选项
+        :param options: 选项文本列表
+        :param answer: 已选答案（'A'、'B'...）
+        """
+        while len(self.radios) < len(options):
+            radio = QRadioButton()
+            radio.setFont(QFont('Microsoft YaHei', self.font_size))
+            if self.item_style:
+                radio.setStyleSheet(self.item_style)
+            self.group.addButton(radio, len(self.radios))
+            self.view_layout.insertWidget(len(self.radios), radio)
+            self.radios.append(radio)
+
+        # 互斥模式下无法取消选中，先关闭互斥
+        self.group.setExclusive(False)
+        for i, radio in enumerate(self.radios):
+            radio.setChecked(False)
+            if i < len(options):
+                radio.setText(f"{chr(65 + i)}. {options[i]}" if self.labelled else options[i])
+                radio.show()
+            else:
+                radio.hide()
+        self.group.setExclusive(True)
+
+        if answer and len(answer) == 1 and 0 <= ord(answer) - 65 < len(options):
+            self.radios[ord(answer) - 65].setChecked(True)
+        self.warning_label.setVisible(not options)
+
+    def answer(self):
+        checked = self.group.checkedId()
+        return chr(65 + checked) if checked >= 0 else None
+
+
+class JudgeView(QuestionView):
+    """判断题"""
+
+    def __init__(self, labels=('正确', '错误'), values=('正确', '错误'), font_size=13, item_style='',
+                 parent=None):
+        """
+        :param labels: “正确”“错误” 两个按钮的文本
+        :param values: 两个按钮对应的答案取值
+        :param font_size: 字号
+        :param item_style: 按钮样式表
+        """
+        super().__init__(parent)
+        self.values = values
+        self.group = QButtonGroup(self)
+        self.radios = []
+        for label in labels:
+            radio = QRadioButton(label)
+            radio.setFont(QFont('Microsoft YaHei', font_size))
+            if item_style:
+                radio.setStyleSheet(item_style)
+            self.group.addButton(radio, len(self.radios))
+            self.view_layout.addWidget(radio)
+            self.radios.append(radio)
+        self.view_layout.addStretch()
+        self.group.buttonClicked.connect(lambda btn: self.answer_changed.emit(self.values[self.group.id(btn)]))
+
+    def bind(self, answer=None):
+        """
+        绑定已有答案
+        :param answer: 已选答案（values 中的取值）
+        """
+        self.group.setExclusive(False)
+        for radio in self.radios:
+            radio.setChecked(False)
+        self.group.setExclusive(True)
+        if answer in self.values:
+            self.radios[self.values.index(answer)].setChecked(True)
+
+    def answer(self):
+        checked = self.group.checkedId()
+        return self.values[checked] if checked >= 0 else None
+
+
+class FillView(QuestionView):
+    """填空题"""
+
+    def __init__(self, prompt=None, placeholder='请输入答案...', font_size=13, input_style='', parent=None):
+        """
+        :param prompt: 输入框上方的提示文本，为None时不显示
+        :param placeholder: 输入框占位文本
+        :param font_size: 输入框字号
+        :param input_style: 输入框样式表
+        """
+        super().__init__(parent)
+        if prompt:
+            label = QLabel(prompt)
+            label.setFont(QFont('Microsoft YaHei', 14))
+            self.view_layout.addWidget(label)
+
+        self.input = QLineEdit()
+        self.input.setFont(QFont('Microsoft YaHei', font_size))
+        self.input.setPlaceholderText(placeholder)
+        if input_style:
+            self.input.setStyleSheet(input_style)
+        self.input.textChanged.connect(self.answer_changed.emit)
+        self.view_layout.addWidget(self.input)
+        self.view_layout.addStretch()
+
+    def bind(self, answer=None):
+        """
+        绑定已有答案
+        :param answer: 已填写的答案
+        """
+        self.input.blockSignals(True)
+        self.input.setText(answer or '')
+        self.input.blockSignals(False)
+
+    def answer(self):
+        text = self.input.text().strip()
+        return text if text else None
+
+
+class CodeView(QuestionView):
+    """编程题：代码编辑器，可选运行按钮和输出区"""
+    # 点击运行按钮时发出
+    run_requested = pyqtSignal()
+
+    def __init__(self, prompt=None, placeholder='# 请在此编写Python代码...\n', font_size=10, editor_style='',
+                 min_height=300, hint=None, hint_style='', runnable=False, parent=None):
+        """
+        :param prompt: 编辑器上方的提示文本
+        :param placeholder: 编辑器占位文本
+        :param font_size: 代码字号
+        :param editor_style: 编辑器样式表
+        :param min_height: 编辑器最小高度
+        :param hint: 编辑器下方的说明文本
+        :param hint_style: 说明文本样式表
+        :param runnable: 是否显示运行按钮和输出区
+        """
+        super().__init__(parent)
+        if prompt:
+            label = QLabel(prompt)
+            label.setFont(QFont('Microsoft YaHei', 14))
+            self.view_layout.addWidget(label)
+
+        self.editor = QTextEdit()
+        self.editor.setFont(QFont('Consolas', font_size))
+        self.editor.setPlaceholderText(placeholder)
+        self.editor.setAcceptRichText(False)
+        if editor_style:
+            self.editor.setStyleSheet(editor_style)
+        self.editor.setMinimumHeight(min_height)
+        self.editor.textChanged.connect(lambda: self.answer_changed.emit(self.editor.toPlainText()))
+        self.view_layout.addWidget(self.editor)
+
+        if hint:
+            hint_label = QLabel(hint)
+            hint_label.setFont(QFont('Microsoft YaHei', 9))
+            hint_label.setStyleSheet(hint_style or 'padding: 5px;')
+            self.view_layout.addWidget(hint_label)
+
+        self.output = None
+        if runnable:
+            run_btn = QPushButton('▶️ 运行代码')
+            run_btn.setFont(QFont('Microsoft YaHei', 12))
+            run_btn.clicked.connect(self.run_requested.emit)
+            self.view_layout.addWidget(run_btn)
+
+            output_label = QLabel('运行结果:')
+            output_label.setFont(QFont('Microsoft YaHei', 12))
+            self.view_layout.addWidget(output_label)
+
+            self.output = QTextEdit()
+            self.output.setFont(QFont('Consolas', 11))
+            self.output.setReadOnly(True)
+            self.output.setMaximumHeight(150)
+            self.view_layout.addWidget(self.output)
+
+    def bind(self, answer=None):
+        """
+        绑定已有代码（同时清空运行结果）
+        :param answer: 已编写的代码
+        """
+        self.editor.blockSignals(True)
+        self.editor.setPlainText(answer or '')
+        self.editor.blockSignals(False)
+        if self.output is not None:
+            self.output.clear()
+
+    def code(self):
+        """编辑器中的完整代码"""
+        return self.editor.toPlainText()
+
+    def answer(self):
+        code = self.editor.toPlainText().strip()
+        return code if code else None
+
+
+class QuestionViewPool(QWidget):
+    """
+    按题型复用的答题视图池
+    每种题型的视图在第一次使用时创建，之后只切换显示并重新绑定数据
+    """
+
+    def __init__(self, factories, parent=None):
+        """
+        :param factories: {题型: 创建视图的函数}
+        """
+        super().__init__(parent)
+        self.factories = factories
+        self.views = {}
+        self.current = None
+        self.view_layout = QVBoxLayout(self)
+        self.view_layout.setContentsMargins(0, 0, 0, 0)
+
+    def view(self, q_type):
+        """
+        切换到指定题型的视图
+        :param q_type: 题型
+        :return: QuestionView，没有对应视图时返回None
+        """
+        view = self.views.get(q_type)
+        if view is None:
+            factory = self.factories.get(q_type)
+            if factory is None:
+                self.clear()
+                return None
+            view = factory()
+            self.views[q_type] = view
+            self.view_layout.addWidget(view)
+
+        if self.current is not view:
+            if self.current is not None:
+                self.current.hide()
+            view.show()
+            self.current = view
+        return view
+
+    def clear(self):
+        """隐藏当前视图"""
+        if self.current is not None:
+            self.current.hide()
+            self.current = None
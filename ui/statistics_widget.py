@@ -7,15 +7,19 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QGroupBo
                              QTableWidget, QTableWidgetItem, QHeaderView, QComboBox, QSizePolicy)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
+from datetime import date, timedelta
 from utils.data_loader import DataLoader
 from config import THEME_COLORS, KNOWLEDGE_CATEGORIES, QUESTION_TYPES
-from database.db_manager import db_manager
 import matplotlib
 matplotlib.use('Qt5Agg')
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
 import matplotlib.pyplot as plt
 
+# 学习曲线显示的天数、热力图显示的周数
+DAILY_DAYS = 30
+HEATMAP_WEEKS = 26
+
 
 class StatisticsWidget(QWidget):
     """成绩统计界面"""
@@ -82,57 +86,84 @@ class StatisticsWidget(QWidget):
         charts_layout.addWidget(type_group)
 
         main_layout.addLayout(charts_layout)
+
+        # 学习活动区域（读取每日学习统计）
+        activity_layout = QHBoxLayout()
+        activity_layout.setContentsMargins(0, 0, 0, 0)
+        activity_layout.setSpacing(10)
+
+        # 近N天学习曲线
+        daily_group = QGroupBox(f'近{DAILY_DAYS}天学习')
+        daily_group.setFont(QFont('SF Pro Display', 13, QFont.Bold))
+        daily_group.setStyleSheet('QGroupBox { padding-top: 28px; margin-top: 0px; } QGroupBox::title { left: 10px; top: 6px; }')
+        daily_group.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        daily_layout = QVBoxLayout()
+        daily_layout.setContentsMargins(8, 18, 8, 8)
+
+        self.daily_figure = Figure(figsize=(7, 4))
+        self.daily_canvas = FigureCanvas(self.daily_figure)
+        self.daily_canvas.setMinimumHeight(0)
+        self.daily_canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        daily_layout.addWidget(self.daily_canvas)
+
+        daily_group.setLayout(daily_layout)
+        activity_layout.addWidget(daily_group)
+
+        # 学习热力图
+        heatmap_group = QGroupBox('学习热力图')
+        heatmap_group.setFont(QFont('SF Pro Display', 13, QFont.Bold))
+        heatmap_group.setStyleSheet('QGroupBox { padding-top: 28px; margin-top: 0px; } QGroupBox::title { left: 10px; top: 6px; }')
+        heatmap_group.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        heatmap_layout = QVBoxLayout()
+        heatmap_layout.setContentsMargins(8, 18, 8, 8)
+
+        self.heatmap_figure = Figure(figsize=(7, 4))
+        self.heatmap_canvas = FigureCanvas(self.heatmap_figure)
+        self.heatmap_canvas.setMinimumHeight(0)
+        self.heatmap_canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        heatmap_layout.addWidget(self.heatmap_canvas)
+
+        heatmap_group.setLayout(heatmap_layout)
+        activity_layout.addWidget(heatmap_group)
+
+        main_layout.addLayout(activity_layout)
         # 让图表区域占满剩余空间
         main_layout.setStretch(0, 0)  # 标题不伸展
         main_layout.setStretch(1, 1)  # 图表伸展
+        main_layout.setStretch(2, 1)
         charts_layout.setStretch(0, 1)
         charts_layout.setStretch(1, 1)
+        activity_layout.setStretch(0, 1)
+        activity_layout.setStretch(1, 1)
 
 
         self.setLayout(main_layout)
 
     def load_data(self):
         """加载数据"""
-        self.load_accuracy_chart()
-        self.load_type_chart()
-
-    def load_accuracy_chart(self):
+        # 一次分组查询同时得到分类和题型的统计
+        breakdown = DataLoader.get_practice_breakdown(self.current_user.id)
+        self.load_accuracy_chart(breakdown)
+        self.load_type_chart(breakdown)
+        self.load_daily_chart()
+        self.load_heatmap_chart()
+
+    def load_accuracy_chart(self, breakdown=None):
         """加载准确率饼图"""
-        db_manager.connect()
+        if breakdown is None:
+            breakdown = DataLoader.get_practice_breakdown(self.current_user.id)
 
         # 获取各分类的准确率
         categories = []
         accuracies = []
 
         for category in KNOWLEDGE_CATEGORIES:
-            # 该分类的总题数
-            total_query = """
-                SELECT COUNT(*) as count FROM practice_records pr
-                JOIN questions q ON pr.question_id = q.id
-                WHERE pr.user_id = ? AND q.category = ?
-            """
-            total_result = db_manager.execute_query(total_query, (self.current_user.id, category))
-            total_count = dict(total_result[0])['count'] if total_result else 0
-
-            if total_count > 0:
-                # 该分类的正确题数
-                correct_query = """
-                    SELECT COUNT(*) as count FROM practice_records pr
-                    JOIN questions q ON pr.question_id = q.id
-                    WHERE pr.user_id = ? AND q.category = ? AND pr.is_correct = 1
-                """
-                correct_result = db_manager.execute_query(
-                    correct_query,
-                    (self.current_user.id, category)
-                )
-                correct_count = dict(correct_result[0])['count'] if correct_result else 0
-
-                accuracy = (correct_count / total_count) * 100
+            stats = breakdown['categories'].get(category)
+            if stats and stats['total'] > 0:
+                accuracy = (stats['correct'] / stats['total']) * 100
                 categories.append(category)
                 accuracies.append(round(accuracy, 1))
 
-        db_manager.disconnect()
-
         # 绘制饼图
         self.accuracy_figure.clear()
         ax = self.accuracy_figure.add_subplot(111)
@@ -160,29 +191,21 @@ class StatisticsWidget(QWidget):
         ax.set_title('各分类准确率', fontsize=14, fontweight='bold')
         self.accuracy_canvas.draw()
 
-    def load_type_chart(self):
+    def load_type_chart(self, breakdown=None):
         """加载题型分布柱状图"""
-        db_manager.connect()
+        if breakdown is None:
+            breakdown = DataLoader.get_practice_breakdown(self.current_user.id)
 
         # 获取各题型的练习数量
         types = []
         counts = []
 
         for q_type, type_name in QUESTION_TYPES.items():
-            query = """
-                SELECT COUNT(*) as count FROM practice_records pr
-                JOIN questions q ON pr.question_id = q.id
-                WHERE pr.user_id = ? AND q.type = ?
-            """
-            result = db_manager.execute_query(query, (self.current_user.id, q_type))
-            count = dict(result[0])['count'] if result else 0
-
+            count = breakdown['types'].get(q_type, {}).get('total', 0)
             if count > 0:
                 types.append(type_name)
                 counts.append(count)
 
-        db_manager.disconnect()
-
         # 绘制柱状图
         self.type_figure.clear()
         ax = self.type_figure.add_subplot(111)
@@ -208,6 +231,63 @@ class StatisticsWidget(QWidget):
 
         self.type_canvas.draw()
 
+    def load_daily_chart(self):
+        """加载近N天学习曲线（学习时长柱状图 + 做题数折线）"""
+        series = DataLoader.get_daily_statistics(self.current_user.id, days=DAILY_DAYS)
+
+        self.daily_figure.clear()
+        ax = self.daily_figure.add_subplot(111)
+
+        if any(day['total_time'] or day['questions_completed'] for day in series):
+            labels = [day['study_date'][5:] for day in series]
+            minutes = [round(day['total_time'] / 60, 1) for day in series]
+            questions = [day['questions_completed'] for day in series]
+            positions = range(len(series))
+
+            ax.bar(positions, minutes, color=THEME_COLORS['primary'], alpha=0.7, label='学习时长')
+            ax.set_ylabel('学习时长（分钟）', fontsize=12)
+            ax.set_xticks(list(positions)[::5])
+            ax.set_xticklabels(labels[::5], fontsize=9)
+            ax.grid(axis='y', alpha=0.3)
+
+            question_ax = ax.twinx()
+            question_ax.plot(positions, questions, color=THEME_COLORS['success'], marker='o',
+                             markersize=3, label='做题数')
+            question_ax.set_ylabel('做题数', fontsize=12)
+        else:
+            ax.text(0.5, 0.5, '暂无数据', ha='center', va='center',
+                   fontsize=14, transform=ax.transAxes)
+
+        self.daily_canvas.draw()
+
+    def load_heatmap_chart(self):
+        """加载学习热力图（每列一周，颜色深浅表示当天学习时长），标题显示连续学习天数"""
+        today = date.today()
+        # 从 HEATMAP_WEEKS 周前的周一开始，到今天为止
+        start = today - timedelta(days=today.weekday() + (HEATMAP_WEEKS - 1) * 7)
+        heatmap = DataLoader.get_study_heatmap(self.current_user.id, days=(today - start).days + 1)
+        streak = DataLoader.get_study_streak(self.current_user.id)
+
+        grid = [[float('nan')] * HEATMAP_WEEKS for _ in range(7)]
+        for offset in range((today - start).days + 1):
+            day = start + timedelta(days=offset)
+            grid[day.weekday()][offset // 7] = heatmap.get(day.isoformat(), 0) / 60
+
+        self.heatmap_figure.clear()
+        ax = self.heatmap_figure.add_subplot(111)
+        image = ax.imshow(grid, cmap='Greens', aspect='auto', vmin=0)
+        ax.set_yticks([0, 2, 4, 6])
+        ax.set_yticklabels(['周一', '周三', '周五', '周日'], fontsize=9)
+        month_ticks = [week for week in range(HEATMAP_WEEKS)
+                       if (start + timedelta(weeks=week)).day <= 7]
+        ax.set_xticks(month_ticks)
+        ax.set_xticklabels([f'{(start + timedelta(weeks=week)).month}月' for week in month_ticks], fontsize=9)
+        self.heatmap_figure.colorbar(image, ax=ax, label='学习时长（分钟）')
+        ax.set_title(f"当前连续学习 {streak['current']} 天，最长 {streak['longest']} 天",
+                     fontsize=12, fontweight='bold')
+
+        self.heatmap_canvas.draw()
+
     def refresh(self):
         """刷新数据"""
         self.load_data()
@@ -2,87 +2,61 @@
 """
 代码执行器
 用于安全执行用户输入的Python代码
+代码在独立子进程中运行（见 utils/sandbox.py），超时后强制结束，不会占用界面进程
+优先使用预热解释器池（见 utils/worker_pool.py），池不可用时启动新进程
 """
-import sys
-import io
-import contextlib
-import signal
-from threading import Thread
-import queue
+from config import EDITOR_CONFIG
+from utils.sandbox import run_code, describe_failure
+from utils.worker_pool import get_worker_pool
 
 
 class CodeExecutor:
     """代码执行器类"""
 
-    def __init__(self, timeout=5):
+    def __init__(self, timeout=None, memory_limit=None):
         """
         初始化代码执行器
-        :param timeout: 超时时间（秒）
+        :param timeout: 超时时间（秒），默认 EDITOR_CONFIG['timeout']
+        :param memory_limit: 内存上限（MB），默认 EDITOR_CONFIG['memory_limit']
         """
-        self.timeout = timeout
+        self.timeout = timeout or EDITOR_CONFIG['timeout']
+        self.memory_limit = memory_limit
+        # 创建执行器时即预热解释器池，首次点击运行无需等待进程启动
+        self.pool = get_worker_pool() if memory_limit is None else None
 
-    def execute(self, code):
+    def execute(self, code, stdin_data=None):
         """
         执行Python代码
         :param code: 要执行的代码字符串
+        :param stdin_data: 标准输入内容（可选）
         :return: (是否成功, 输出内容, 错误信息)
         """
         if not code or not code.strip():
             return False, '', '代码不能为空'
 
-        # 创建捕获输出的StringIO对象
-        output_buffer = io.StringIO()
-        error_buffer = io.StringIO()
+        try:
+            result = self.run(code, stdin_data)
+        except OSError as e:
+            return False, '', f'无法启动执行进程: {e}'
 
-        # 使用队列在线程间传递结果
-        result_queue = queue.Queue()
+        if result.status == 'ok':
+            return True, result.stdout, ''
+        return False, result.stdout, describe_failure(result, self.timeout)
 
-        def run_code():
-            """在单独线程中运行代码"""
+    def run(self, code, stdin_data=None):
+        """
+        执行代码并返回完整结果
+        :param code: 代码字符串
+        :param stdin_data: 标准输入内容
+        :return: SandboxResult
+        """
+        if self.pool is not None:
             try:
-                # 重定向标准输出和标准错误
-                with contextlib.redirect_stdout(output_buffer), contextlib.redirect_stderr(error_buffer):
-                    # 创建执行环境
-                    exec_globals = {
-                        '__builtins__': __builtins__,
-                        # 可以添加一些安全的内置函数
-                    }
-                    exec_locals = {}
-
-                    # 执行代码
-                    exec(code, exec_globals, exec_locals)
-
-                # 获取输出
-                output = output_buffer.getvalue()
-                error = error_buffer.getvalue()
-
-                if error:
-                    result_queue.put((False, output, error))
-                else:
-                    result_queue.put((True, output, ''))
-
-            except Exception as e:
-                error_msg = f'{type(e).__name__}: {str(e)}'
-                result_queue.put((False, output_buffer.getvalue(), error_msg))
-
-        # 创建并启动执行线程
-        exec_thread = Thread(target=run_code)
-        exec_thread.daemon = True
-        exec_thread.start()
-
-        # 等待执行完成或超时
-        exec_thread.join(timeout=self.timeout)
-
-        if exec_thread.is_alive():
-            # 执行超时
-            return False, '', f'代码执行超时（超过{self.timeout}秒）'
-
-        # 获取执行结果
-        try:
-            success, output, error = result_queue.get_nowait()
-            return success, output, error
-        except queue.Empty:
-            return False, '', '执行出现未知错误'
+                return self.pool.run(code, stdin_data=stdin_data, timeout=self.timeout)
+            except OSError as e:
+                print(f"预热解释器执行失败，改用新进程: {e}")
+        return run_code(code, stdin_data=stdin_data, timeout=self.timeout,
+                        memory_limit=self.memory_limit)
 
     def validate_code(self, code):
         """
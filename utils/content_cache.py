@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+题库/知识点缓存
+进程内缓存基本不变的 questions 和 knowledge_points 表，提供按ID、分类、题型的索引查询
+
+失效方式：
+1. 显式调用 content_cache.invalidate()（导入脚本写入数据后调用）
+2. 两张表上的触发器维护 content_version 版本号，缓存定期比对版本号，
+   其他进程（如单独运行的导入脚本）修改数据后自动重新加载
+
+缓存返回的题目/知识点对象在调用方之间共享，只读使用
+"""
+import time
+import threading
+from database.db_manager import db_manager
+from models.knowledge import KnowledgePoint
+from models.question import Question
+
+
+class _TableCache:
+    """单张表的缓存数据和索引"""
+
+    def __init__(self, name):
+        self.name = name
+        self.items = None       # 按原查询顺序排列的对象列表，None表示尚未加载
+        self.by_id = {}
+        self.groups = {}        # 索引名 -> {键: 对象列表}
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+
+
+class ContentCache:
+    """题库和知识点的进程内缓存"""
+
+    def __init__(self, check_interval=2.0):
+        """
+        初始化缓存
+        :param check_interval: 比对数据版本号的最小间隔（秒），0表示每次访问都比对
+        """
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._tables = {
+            'questions': _TableCache('questions'),
+            'knowledge_points': _TableCache('knowledge_points'),
+        }
+        self._last_check = {}
+
+    # ---------- 题目 ----------
+
+    def all_questions(self):
+        """全部题目（按分类、题型排序）"""
+        return list(self._table('questions').items)
+
+    def question(self, question_id):
+        """按ID获取题目，不存在时返回None"""
+        return self._table('questions').by_id.get(question_id)
+
+    def questions_by_category(self, category):
+        """某分类下的题目（按题型排序）"""
+        return list(self._table('questions').groups['category'].get(category, []))
+
+    def questions_by_type(self, q_type):
+        """某题型的题目（按ID排序）"""
+        return list(self._table('questions').groups['type'].get(q_type, []))
+
+    def question_categories(self):
+        """题库中出现过的全部分类"""
+        return set(self._table('questions').groups['category'])
+
+    # ---------- 知识点 ----------
+
+    def all_knowledge_points(self):
+        """全部知识点（按分类、顺序号排序）"""
+        return list(self._table('knowledge_points').items)
+
+    def knowledge_point(self, knowledge_id):
+        """按ID获取知识点，不存在时返回None"""
+        return self._table('knowledge_points').by_id.get(knowledge_id)
+
+    def knowledge_by_category(self, category):
+        """某分类下的知识点（按顺序号排序）"""
+        return list(self._table('knowledge_points').groups['category'].get(category, []))
+
+    # ---------- 失效与统计 ----------
+
+    def invalidate(self, table=None):
+        """
+        使缓存失效，下次访问时重新加载
+        :param table: 表名（'questions' 或 'knowledge_points'），None表示全部
+        """
+        with self._lock:
+            for name, cache in self._tables.items():
+                if table is None or name == table:
+                    cache.items = None
+                    cache.by_id = {}
+                    cache.groups = {}
+                    cache.version = None
+
+    def stats(self):
+        """
+        获取命中统计
+        :return: {表名: {'hits', 'misses', 'loads', 'size'}}
+        """
+        with self._lock:
+            return {
+                name: {
+                    'hits': cache.hits,
+                    'misses': cache.misses,
+                    'loads': cache.loads,
+                    'size': len(cache.items) if cache.items is not None else 0
+                }
+                for name, cache in self._tables.items()
+            }
+
+    def _table(self, name):
+        """返回已加载且未过期的表缓存"""
+        with self._lock:
+            cache = self._tables[name]
+            if cache.items is not None and self._is_stale(cache):
+                self.invalidate(name)
+
+            if cache.items is None:
+                cache.misses += 1
+                self._load(cache)
+            else:
+                cache.hits += 1
+            return cache
+
+    def _is_stale(self, cache):
+        """按间隔比对数据库中的版本号"""
+        now = time.monotonic()
+        if now - self._last_check.get(cache.name, 0) < self.check_interval:
+            return False
+        self._last_check[cache.name] = now
+        return self._read_version(cache.name) != cache.version
+
+    def _read_version(self, name):
+        """读取表的数据版本号"""
+        rows = db_manager.execute_query(
+            "SELECT version FROM content_version WHERE name = ?", (name,)
+        )
+        return rows[0]['version'] if rows else 0
+
+    def _load(self, cache):
+        """从数据库加载整张表并建立索引"""
+        cache.version = self._read_version(cache.name)
+        self._last_check[cache.name] = time.monotonic()
+
+        if cache.name == 'questions':
+            rows = db_manager.execute_query("SELECT * FROM questions ORDER BY category, type")
+            items = [Question.from_row(row) for row in rows]
+            cache.groups = {
+                'category': self._group(items, 'category'),
+                'type': self._group(sorted(items, key=lambda q: q.id), 'type'),
+            }
+        else:
+            rows = db_manager.execute_query("SELECT * FROM knowledge_points ORDER BY category, order_num")
+            items = [KnowledgePoint.from_row(row) for row in rows]
+            cache.groups = {'category': self._group(items, 'category')}
+
+        cache.by_id = {item.id: item for item in items}
+        cache.items = items
+        cache.loads += 1
+
+    @staticmethod
+    def _group(items, attr):
+        """按属性分组，保持原有顺序"""
+        groups = {}
+        for item in items:
+            groups.setdefault(getattr(item, attr), []).append(item)
+        return groups
+
+
+# 全局缓存实例
+content_cache = ContentCache()
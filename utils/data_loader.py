@@ -4,9 +4,10 @@
 用于加载和管理知识点、题目等数据
 """
 from database.db_manager import db_manager
-from models.knowledge import KnowledgePoint
+from utils.content_cache import content_cache
 from models.question import Question
 from models.record import LearningRecord, PracticeRecord, WrongQuestion
+from datetime import date, timedelta
 import json
 
 
@@ -19,17 +20,7 @@ class DataLoader:
         加载所有知识点
         :return: 知识点列表
         """
-        db_manager.connect()
-        query = "SELECT * FROM knowledge_points ORDER BY category, order_num"
-        results = db_manager.execute_query(query)
-        db_manager.disconnect()
-
-        knowledge_points = []
-        for row in results:
-            kp = KnowledgePoint.from_dict(dict(row))
-            knowledge_points.append(kp)
-
-        return knowledge_points
+        return content_cache.all_knowledge_points()
 
     @staticmethod
     def load_knowledge_by_category(category):
@@ -38,17 +29,7 @@ class DataLoader:
         :param category: 分类名称
         :return: 知识点列表
         """
-        db_manager.connect()
-        query = "SELECT * FROM knowledge_points WHERE category = ? ORDER BY order_num"
-        results = db_manager.execute_query(query, (category,))
-        db_manager.disconnect()
-
-        knowledge_points = []
-        for row in results:
-            kp = KnowledgePoint.from_dict(dict(row))
-            knowledge_points.append(kp)
-
-        return knowledge_points
+        return content_cache.knowledge_by_category(category)
 
     @staticmethod
     def load_knowledge_by_id(knowledge_id):
@@ -57,14 +38,7 @@ class DataLoader:
         :param knowledge_id: 知识点ID
         :return: 知识点对象
         """
-        db_manager.connect()
-        query = "SELECT * FROM knowledge_points WHERE id = ?"
-        results = db_manager.execute_query(query, (knowledge_id,))
-        db_manager.disconnect()
-
-        if results:
-            return KnowledgePoint.from_dict(dict(results[0]))
-        return None
+        return content_cache.knowledge_point(knowledge_id)
 
     @staticmethod
     def load_all_questions():
@@ -72,17 +46,7 @@ class DataLoader:
         加载所有题目
         :return: 题目列表
         """
-        db_manager.connect()
-        query = "SELECT * FROM questions ORDER BY category, type"
-        results = db_manager.execute_query(query)
-        db_manager.disconnect()
-
-        questions = []
-        for row in results:
-            q = Question.from_dict(dict(row))
-            questions.append(q)
-
-        return questions
+        return content_cache.all_questions()
 
     @staticmethod
     def load_questions_by_category(category):
@@ -91,17 +55,7 @@ class DataLoader:
         :param category: 分类名称
         :return: 题目列表
         """
-        db_manager.connect()
-        query = "SELECT * FROM questions WHERE category = ? ORDER BY type"
-        results = db_manager.execute_query(query, (category,))
-        db_manager.disconnect()
-
-        questions = []
-        for row in results:
-            q = Question.from_dict(dict(row))
-            questions.append(q)
-
-        return questions
+        return content_cache.questions_by_category(category)
 
     @staticmethod
     def load_questions_by_type(q_type):
@@ -110,17 +64,7 @@ class DataLoader:
         :param q_type: 题目类型
         :return: 题目列表
         """
-        db_manager.connect()
-        query = "SELECT * FROM questions WHERE type = ?"
-        results = db_manager.execute_query(query, (q_type,))
-        db_manager.disconnect()
-
-        questions = []
-        for row in results:
-            q = Question.from_dict(dict(row))
-            questions.append(q)
-
-        return questions
+        return content_cache.questions_by_type(q_type)
 
     @staticmethod
     def load_question_by_id(question_id):
@@ -129,14 +73,34 @@ class DataLoader:
         :param question_id: 题目ID
         :return: 题目对象
         """
-        db_manager.connect()
-        query = "SELECT * FROM questions WHERE id = ?"
-        results = db_manager.execute_query(query, (question_id,))
-        db_manager.disconnect()
+        return content_cache.question(question_id)
 
-        if results:
-            return Question.from_dict(dict(results[0]))
-        return None
+    @staticmethod
+    def load_question_categories():
+        """
+        获取题库中的全部分类
+        :return: 分类名称集合
+        """
+        return content_cache.question_categories()
+
+    @staticmethod
+    def load_questions_by_ids(question_ids):
+        """
+        按ID批量加载题目，结果顺序与传入的ID顺序一致
+        :param question_ids: 题目ID列表
+        :return: 题目列表（不存在的ID被忽略）
+        """
+        rows = {}
+        # 分批查询，避免超过SQLite参数数量上限
+        batch_size = 500
+        for start in range(0, len(question_ids), batch_size):
+            batch = question_ids[start:start + batch_size]
+            placeholders = ','.join('?' * len(batch))
+            query = f"SELECT * FROM questions WHERE id IN ({placeholders})"
+            for row in db_manager.execute_query(query, tuple(batch)):
+                rows[row['id']] = row
+
+        return [Question.from_row(rows[qid]) for qid in question_ids if qid in rows]
 
     @staticmethod
     def load_user_learning_records(user_id):
@@ -145,7 +109,6 @@ class DataLoader:
         :param user_id: 用户ID
         :return: 学习记录列表
         """
-        db_manager.connect()
         query = """
             SELECT lr.*, kp.title, kp.category
             FROM learning_records lr
@@ -154,7 +117,6 @@ class DataLoader:
             ORDER BY lr.last_study_at DESC
         """
         results = db_manager.execute_query(query, (user_id,))
-        db_manager.disconnect()
 
         records = []
         for row in results:
@@ -171,7 +133,6 @@ class DataLoader:
         :param limit: 限制数量
         :return: 练习记录列表
         """
-        db_manager.connect()
         if limit:
             query = """
                 SELECT pr.*, q.question, q.type, q.category
@@ -191,7 +152,6 @@ class DataLoader:
                 ORDER BY pr.submit_time DESC
             """
             results = db_manager.execute_query(query, (user_id,))
-        db_manager.disconnect()
 
         records = []
         for row in results:
@@ -206,7 +166,6 @@ class DataLoader:
         :param user_id: 用户ID
         :return: 错题列表
         """
-        db_manager.connect()
         query = """
             SELECT wq.*, q.question, q.type, q.answer, q.explanation, q.options, q.category
             FROM wrong_questions wq
@@ -215,7 +174,6 @@ class DataLoader:
             ORDER BY wq.last_wrong_at DESC
         """
         results = db_manager.execute_query(query, (user_id,))
-        db_manager.disconnect()
 
         wrong_questions = []
         for row in results:
@@ -224,40 +182,105 @@ class DataLoader:
         return wrong_questions
 
     @staticmethod
-    def get_user_statistics(user_id):
+    def count_wrong_questions_by_category(user_id):
         """
-        获取用户统计信息
+        按分类统计用户未掌握的错题数（题库中没有错题的分类计为0）
+        分类和计数都在SQL中汇总，不加载题目内容
         :param user_id: 用户ID
-        :return: 统计信息字典
+        :return: [(分类, 错题数)]，按错题数降序、分类名升序；题目已删除的错题分类为None
         """
-        db_manager.connect()
-
-        # 总学习时长
-        query = "SELECT SUM(study_time) as total_time FROM learning_records WHERE user_id = ?"
-        result = db_manager.execute_query(query, (user_id,))
-        total_study_time = dict(result[0])['total_time'] if result and result[0][0] else 0
-
-        # 完成的知识点数
-        query = "SELECT COUNT(*) as count FROM learning_records WHERE user_id = ? AND completed = 1"
-        result = db_manager.execute_query(query, (user_id,))
-        completed_knowledge = dict(result[0])['count'] if result else 0
-
-        # 总练习题数
-        query = "SELECT COUNT(*) as count FROM practice_records WHERE user_id = ?"
-        result = db_manager.execute_query(query, (user_id,))
-        total_questions = dict(result[0])['count'] if result else 0
+        query = """
+            SELECT category, SUM(wrong) AS wrong_count FROM (
+                SELECT category, 0 AS wrong FROM questions GROUP BY category
+                UNION ALL
+                SELECT q.category, 1 AS wrong
+                FROM wrong_questions wq
+                LEFT JOIN questions q ON wq.question_id = q.id
+                WHERE wq.user_id = ? AND wq.mastered = 0
+            )
+            GROUP BY category
+            ORDER BY wrong_count DESC, category
+        """
+        with db_manager.checkout() as conn:
+            return [(row[0], row[1]) for row in conn.execute(query, (user_id,))]
 
-        # 正确题数
-        query = "SELECT COUNT(*) as count FROM practice_records WHERE user_id = ? AND is_correct = 1"
-        result = db_manager.execute_query(query, (user_id,))
-        correct_questions = dict(result[0])['count'] if result else 0
+    @staticmethod
+    def load_wrong_question_summaries(user_id, category=None, preview_length=60):
+        """
+        加载错题列表摘要（只取题干开头，不含答案、解析、选项）
+        :param user_id: 用户ID
+        :param category: 只取指定分类，为None时不限
+        :param preview_length: 题干摘要长度，超出部分以“...”结尾
+        :return: 摘要字典列表（question_id、type、category、wrong_count、preview），按最近答错时间倒序
+        """
+        category_filter = '' if category is None else 'AND q.category = ?'
+        params = (preview_length + 1, user_id) + (() if category is None else (category,))
+        query = f"""
+            SELECT wq.question_id, wq.wrong_count, q.type, q.category, substr(q.question, 1, ?) AS preview
+            FROM wrong_questions wq
+            LEFT JOIN questions q ON wq.question_id = q.id
+            WHERE wq.user_id = ? AND wq.mastered = 0 {category_filter}
+            ORDER BY wq.last_wrong_at DESC
+        """
+        summaries = []
+        with db_manager.checkout() as conn:
+            for row in conn.execute(query, params):
+                summary = dict(row)
+                preview = summary['preview'] or ''
+                if len(preview) > preview_length:
+                    preview = preview[:preview_length] + '...'
+                summary['preview'] = preview
+                summaries.append(summary)
+        return summaries
 
-        # 错题数
-        query = "SELECT COUNT(*) as count FROM wrong_questions WHERE user_id = ? AND mastered = 0"
-        result = db_manager.execute_query(query, (user_id,))
-        wrong_questions_count = dict(result[0])['count'] if result else 0
+    @staticmethod
+    def load_wrong_question(user_id, question_id):
+        """
+        加载一道错题的完整内容（打开详情时调用）
+        :param user_id: 用户ID
+        :param question_id: 题目ID
+        :return: 与 load_user_wrong_questions 中单项相同的字典，不存在时返回None
+        """
+        query = """
+            SELECT wq.*, q.question, q.type, q.answer, q.explanation, q.options, q.category
+            FROM wrong_questions wq
+            LEFT JOIN questions q ON wq.question_id = q.id
+            WHERE wq.user_id = ? AND wq.question_id = ?
+        """
+        with db_manager.checkout() as conn:
+            row = conn.execute(query, (user_id, question_id)).fetchone()
+        return dict(row) if row else None
 
-        db_manager.disconnect()
+    @staticmethod
+    def get_user_statistics(user_id):
+        """
+        获取用户统计信息
+        :param user_id: 用户ID
+        :return: 统计信息字典
+        """
+        # 学习时长、完成数、练习数均来自分类汇总表
+        with db_manager.checkout() as conn:
+            row = conn.execute(
+                """
+                SELECT COALESCE(SUM(study_time), 0) as total_time,
+                       COALESCE(SUM(knowledge_completed), 0) as completed,
+                       COALESCE(SUM(practice_total), 0) as total,
+                       COALESCE(SUM(practice_correct), 0) as correct
+                FROM user_category_stats WHERE user_id = ?
+                """,
+                (user_id,)
+            ).fetchone()
+            total_study_time = row['total_time']
+            completed_knowledge = row['completed']
+            total_questions = row['total']
+            correct_questions = row['correct']
+
+            # 错题数
+            row = conn.execute(
+                "SELECT COUNT(*) as count FROM wrong_questions WHERE user_id = ? AND mastered = 0",
+                (user_id,)
+            ).fetchone()
+            wrong_questions_count = row['count'] if row else 0
 
         accuracy = (correct_questions / total_questions * 100) if total_questions > 0 else 0
 
@@ -269,3 +292,165 @@ class DataLoader:
             'wrong_questions_count': wrong_questions_count,
             'accuracy': round(accuracy, 2)
         }
+
+    @staticmethod
+    def get_practice_breakdown(user_id):
+        """
+        按分类和题型汇总用户练习情况（读取分类汇总表）
+        :param user_id: 用户ID
+        :return: {'categories': {分类: {'total', 'correct'}}, 'types': {题型: {'total', 'correct'}}}
+        """
+        query = """
+            SELECT category, q_type, practice_total as total, practice_correct as correct
+            FROM user_category_stats
+            WHERE user_id = ? AND practice_total > 0
+        """
+        results = db_manager.execute_query(query, (user_id,))
+
+        categories = {}
+        types = {}
+        for row in results:
+            for key, bucket in ((row['category'], categories), (row['q_type'], types)):
+                entry = bucket.setdefault(key, {'total': 0, 'correct': 0})
+                entry['total'] += row['total']
+                entry['correct'] += row['correct']
+
+        return {'categories': categories, 'types': types}
+
+    @staticmethod
+    def get_category_progress(user_id):
+        """
+        获取各分类的知识点进度和练习情况
+        :param user_id: 用户ID
+        :return: {分类: {'knowledge_total', 'knowledge_completed', 'study_time',
+                         'practice_total', 'practice_correct', 'exam_total', 'exam_correct'}}
+        """
+        progress = {}
+        with db_manager.checkout() as conn:
+            rows = conn.execute(
+                "SELECT category, COUNT(*) as count FROM knowledge_points GROUP BY category"
+            ).fetchall()
+            for row in rows:
+                progress[row['category']] = DataLoader._empty_progress(row['count'])
+
+            rows = conn.execute(
+                """
+                SELECT category,
+                       SUM(knowledge_completed) as knowledge_completed,
+                       SUM(study_time) as study_time,
+                       SUM(practice_total) as practice_total,
+                       SUM(practice_correct) as practice_correct,
+                       SUM(exam_total) as exam_total,
+                       SUM(exam_correct) as exam_correct
+                FROM user_category_stats
+                WHERE user_id = ?
+                GROUP BY category
+                """,
+                (user_id,)
+            ).fetchall()
+
+        for row in rows:
+            entry = progress.setdefault(row['category'], DataLoader._empty_progress(0))
+            for key in row.keys()[1:]:
+                entry[key] = row[key] or 0
+
+        return progress
+
+    @staticmethod
+    def _empty_progress(knowledge_total):
+        """分类进度的初始值"""
+        return {
+            'knowledge_total': knowledge_total,
+            'knowledge_completed': 0,
+            'study_time': 0,
+            'practice_total': 0,
+            'practice_correct': 0,
+            'exam_total': 0,
+            'exam_correct': 0
+        }
+
+    @staticmethod
+    def get_daily_statistics(user_id, days=7):
+        """
+        获取最近N天的每日学习统计（无记录的日期补0）
+        :param user_id: 用户ID
+        :param days: 天数（含今天）
+        :return: 按日期升序的统计字典列表
+        """
+        end = date.today()
+        start = end - timedelta(days=days - 1)
+        query = """
+            SELECT study_date, total_time, questions_completed, questions_correct, knowledge_learned,
+                   knowledge_time
+            FROM study_statistics
+            WHERE user_id = ? AND study_date BETWEEN ? AND ?
+        """
+        results = db_manager.execute_query(query, (user_id, start.isoformat(), end.isoformat()))
+        by_date = {row['study_date']: dict(row) for row in results}
+
+        series = []
+        for offset in range(days):
+            day = (start + timedelta(days=offset)).isoformat()
+            series.append(by_date.get(day, {
+                'study_date': day,
+                'total_time': 0,
+                'questions_completed': 0,
+                'questions_correct': 0,
+                'knowledge_learned': 0,
+                'knowledge_time': 0
+            }))
+        return series
+
+    @staticmethod
+    def get_today_statistics(user_id):
+        """
+        获取今日学习统计
+        :param user_id: 用户ID
+        :return: 统计字典（study_date, total_time, questions_completed, questions_correct, knowledge_learned,
+                 knowledge_time）
+        """
+        return DataLoader.get_daily_statistics(user_id, days=1)[0]
+
+    @staticmethod
+    def get_study_heatmap(user_id, days=365):
+        """
+        获取学习热力图数据
+        :param user_id: 用户ID
+        :param days: 天数（含今天）
+        :return: {日期字符串: 学习时长（秒）}，只包含有学习活动的日期
+        """
+        start = date.today() - timedelta(days=days - 1)
+        query = """
+            SELECT study_date, total_time FROM study_statistics
+            WHERE user_id = ? AND study_date >= ?
+              AND (total_time > 0 OR questions_completed > 0 OR knowledge_learned > 0)
+        """
+        results = db_manager.execute_query(query, (user_id, start.isoformat()))
+        return {row['study_date']: row['total_time'] for row in results}
+
+    @staticmethod
+    def get_study_streak(user_id):
+        """
+        获取连续学习天数
+        今天尚未学习时，截至昨天的连续天数仍计为当前连续天数
+        :param user_id: 用户ID
+        :return: {'current': 当前连续天数, 'longest': 最长连续天数}
+        """
+        query = """
+            SELECT study_date FROM study_statistics
+            WHERE user_id = ?
+              AND (total_time > 0 OR questions_completed > 0 OR knowledge_learned > 0)
+            ORDER BY study_date
+        """
+        results = db_manager.execute_query(query, (user_id,))
+        days = [date.fromisoformat(row['study_date']) for row in results]
+
+        longest = run = 0
+        previous = None
+        for day in days:
+            run = run + 1 if previous and (day - previous).days == 1 else 1
+            longest = max(longest, run)
+            previous = day
+
+        current = run if previous and (date.today() - previous).days <= 1 else 0
+        return {'current': current, 'longest': longest}
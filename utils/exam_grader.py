@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+考试判题
+先批改客观题（选择、判断、填空），再并行运行编程题测试点，
+全部判完后在一个写事务中保存答题详情、错题、汇总数据和考试记录，并删除答题草稿
+不依赖界面，由 ui/exam_widget.py 中的判题线程调用
+"""
+from collections import namedtuple
+from datetime import datetime
+from database.db_manager import db_manager
+from database import rollup, study_stats, exam_drafts, review_schedule
+from utils.judge import judge_submission
+
+# 单题判题结果
+GradedAnswer = namedtuple('GradedAnswer', [
+    'question_id', 'category', 'q_type', 'user_answer', 'is_correct', 'score',
+    'test_cases_passed', 'test_cases_total'
+])
+
+# 答题详情（编程题同时记录测试点通过数）
+INSERT_ANSWER = '''
+    INSERT INTO exam_answers
+    (exam_record_id, question_id, user_answer, is_correct, obtained_score,
+     test_cases_passed, test_cases_total)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+# 已在错题本中的题目累加错误次数并重新安排复习（立即到期），保留首次答错时间
+UPSERT_WRONG_QUESTION = '''
+    INSERT INTO wrong_questions
+    (user_id, question_id, wrong_count, mastered, source, first_wrong_at, last_wrong_at, due_at)
+    VALUES (?, ?, 1, 0, 'exam', ?, ?, ?)
+    ON CONFLICT (user_id, question_id) DO UPDATE SET
+        wrong_count = wrong_count + 1,
+        source = excluded.source,
+        last_wrong_at = excluded.last_wrong_at,''' + review_schedule.LAPSE_SET
+
+
+def grade_objective(question, user_answer):
+    """
+    批改客观题
+    :param question: 题目字典（含 id、category、type、answer、score）
+    :param user_answer: 用户答案
+    :return: GradedAnswer
+    """
+    correct_answer = question['answer']
+    if question['type'] == 'fill':
+        is_correct = user_answer.strip() == correct_answer.strip()
+    else:
+        is_correct = user_answer == correct_answer
+    return GradedAnswer(question['id'], question['category'], question['type'], user_answer,
+                        is_correct, question['score'] if is_correct else 0, 0, 0)
+
+
+class ExamGrader:
+    """一次考试提交的判题与保存"""
+
+    def __init__(self, user_id, exam_record_id, questions, answers, db=None):
+        """
+        :param user_id: 用户ID
+        :param exam_record_id: 考试记录ID
+        :param questions: 题目字典列表（按题号排序）
+        :param answers: {题目ID: 用户答案}，未作答的题目不计分也不记录
+        :param db: 数据库管理器，默认使用全局 db_manager
+        """
+        self.db = db or db_manager
+        self.user_id = user_id
+        self.exam_record_id = exam_record_id
+        self.questions = questions
+        self.answers = answers
+        self.graded = {}
+        # 编程题并行判题节省的时间（秒）
+        self.time_saved = 0.0
+
+    @property
+    def objective_questions(self):
+        """已作答的客观题"""
+        return [q for q in self.questions if q['id'] in self.answers and q['type'] != 'code']
+
+    @property
+    def coding_questions(self):
+        """已作答的编程题"""
+        return [q for q in self.questions if q['id'] in self.answers and q['type'] == 'code']
+
+    @property
+    def score(self):
+        """当前已判题目的总分"""
+        return sum(g.score for g in self.graded.values())
+
+    def grade_objectives(self, on_graded=None):
+        """
+        批改全部客观题
+        :param on_graded: 每判完一题调用 on_graded(GradedAnswer)
+        :return: 客观题得分
+        """
+        score = 0
+        for question in self.objective_questions:
+            graded = grade_objective(question, self.answers[question['id']])
+            self.graded[question['id']] = graded
+            score += graded.score
+            if on_graded is not None:
+                on_graded(graded)
+        return score
+
+    def grade_coding(self, on_graded=None, on_case=None):
+        """
+        逐题运行编程题测试点（每题的测试点并行运行）
+        :param on_graded: 每判完一题调用 on_graded(GradedAnswer)
+        :param on_case: 每完成一个测试点调用 on_case(题目ID, CaseResult)
+        :return: 编程题得分
+        """
+        score = 0
+        for question in self.coding_questions:
+            graded = self.grade_coding_question(question, self.answers[question['id']], on_case)
+            self.graded[question['id']] = graded
+            score += graded.score
+            if on_graded is not None:
+                on_graded(graded)
+        return score
+
+    def grade_coding_question(self, question, user_code, on_case=None):
+        """
+        编程题判题：有测试点时按测试点得分，否则与标准答案比对
+        题目来自试卷快照时直接使用快照中的测试点
+        :return: GradedAnswer
+        """
+        test_cases = question.get('test_cases')
+        if test_cases is None:
+            with self.db.checkout() as conn:
+                test_cases = [dict(row) for row in conn.execute(
+                    'SELECT * FROM test_cases WHERE question_id = ? ORDER BY order_num',
+                    (question['id'],)
+                )]
+
+        if not test_cases:
+            is_correct = user_code.strip() == question['answer'].strip()
+            return GradedAnswer(question['id'], question['category'], question['type'], user_code,
+                                is_correct, question['score'] if is_correct else 0, 0, 0)
+
+        on_result = None
+        if on_case is not None:
+            on_result = lambda case_result: on_case(question['id'], case_result)
+        report = judge_submission(user_code, test_cases, on_result=on_result)
+        self.time_saved += report.time_saved
+        return GradedAnswer(question['id'], question['category'], question['type'], user_code,
+                            report.score > 0, report.score, report.passed, report.total)
+
+    def save(self, time_spent):
+        """
+        在一个写事务中保存全部判题结果并完成考试记录
+        答题详情、错题和汇总数据先收集好，再分别用 executemany 批量写入
+        :param time_spent: 考试用时（分钟）
+        :return: 总分
+        """
+        graded = [self.graded[q['id']] for q in self.questions if q['id'] in self.graded]
+        total_score = sum(g.score for g in graded)
+        correct = sum(1 for g in graded if g.is_correct)
+
+        with self.db.transaction() as conn:
+            conn.executemany(INSERT_ANSWER, [
+                (self.exam_record_id, g.question_id, g.user_answer, g.is_correct, g.score,
+                 g.test_cases_passed, g.test_cases_total)
+                for g in graded
+            ])
+            # 答错的题目加入错题本（与练习写入一致，使用本地时间）
+            now = review_schedule.format_time(datetime.now())
+            conn.executemany(UPSERT_WRONG_QUESTION, [
+                (self.user_id, g.question_id, now, now, now) for g in graded if not g.is_correct
+            ])
+            rollup.record_exam_answers(conn, self.user_id,
+                                       ((g.category, g.q_type, g.is_correct) for g in graded))
+
+            conn.execute('''
+                UPDATE exam_records
+                SET end_time = CURRENT_TIMESTAMP,
+                    obtained_score = ?,
+                    status = 'completed',
+                    time_spent = ?
+                WHERE id = ?
+            ''', (total_score, time_spent, self.exam_record_id))
+            study_stats.record_activity(conn, self.user_id, study_time=time_spent * 60,
+                                        questions=len(graded), correct=correct)
+            # 交卷后草稿不再需要
+            exam_drafts.discard(conn, self.exam_record_id)
+        return total_score
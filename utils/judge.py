@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+编程题判题
+把一份提交的全部测试点分发到预热解释器池并行运行，
+按测试点的 time_limit（毫秒）和 memory_limit（MB）限制资源，每完成一个测试点立即回调上报结果
+提交只编译一次，解释器直接执行编译好的代码对象，每个测试点使用独立的标准输入/输出缓冲区
+"""
+import time
+import signal
+import marshal
+import atexit
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from config import EDITOR_CONFIG, JUDGE_CONFIG
+from utils.sandbox import describe_failure
+from utils.worker_pool import WorkerPool
+
+# 测试点默认时限（毫秒），与 test_cases.time_limit 的默认值一致
+DEFAULT_TIME_LIMIT = 1000
+
+# 单个测试点的结果
+# status: 'accepted' 通过 / 'wrong_answer' 答案错误 / 'time_limit' 超时 / 'runtime_error' 运行出错 / 'compile_error' 编译错误
+# elapsed: 代码在解释器中的运行时间（秒），不含进程通信开销
+CaseResult = namedtuple('CaseResult', [
+    'index', 'test_case_id', 'status', 'passed', 'score', 'output', 'message', 'elapsed'
+])
+
+
+class JudgeReport(namedtuple('JudgeReport', [
+        'results', 'passed', 'total', 'score', 'wall_time', 'case_time', 'compile_time'])):
+    """
+    整份提交的判题结果
+    results 按测试点顺序排列；wall_time 为实际耗时，case_time 为各测试点耗时之和（即串行运行所需时间），
+    compile_time 为唯一一次编译的耗时
+    """
+    __slots__ = ()
+
+    @property
+    def time_saved(self):
+        """并行运行节省的时间（秒）"""
+        return max(0.0, self.case_time - self.wall_time)
+
+
+# 每种内存上限对应一个解释器池（解释器启动时即设置内存上限，无法按任务调整）
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool(memory_limit):
+    """获取指定内存上限的判题解释器池"""
+    with _pools_lock:
+        pool = _pools.get(memory_limit)
+        if pool is None:
+            pool = WorkerPool(size=JUDGE_CONFIG['workers'], memory_limit=memory_limit)
+            _pools[memory_limit] = pool
+        return pool
+
+
+def close_pools():
+    """结束全部判题解释器"""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+atexit.register(close_pools)
+
+
+def compile_submission(code):
+    """
+    编译提交的代码
+    :param code: 代码字符串
+    :return: 序列化的代码对象（marshal.dumps 结果），解释器池中的进程可直接执行
+    :raises SyntaxError: 代码有语法错误
+    """
+    return marshal.dumps(compile(code, '<string>', 'exec'))
+
+
+def run_case(code, test_case, index=0, bytecode=None):
+    """
+    运行单个测试点
+    :param code: 提交的代码
+    :param test_case: 测试点（含 input_data、expected_output、score、time_limit、memory_limit）
+    :param index: 测试点序号
+    :param bytecode: compile_submission 的结果，提供时不再重复编译
+    :return: CaseResult
+    """
+    time_limit_ms = test_case.get('time_limit') or DEFAULT_TIME_LIMIT
+    time_limit = time_limit_ms / 1000
+    memory_limit = test_case.get('memory_limit') or EDITOR_CONFIG['memory_limit']
+    expected_output = (test_case.get('expected_output') or '').strip()
+
+    def result(status, output='', message='', elapsed=0.0):
+        passed = status == 'accepted'
+        return CaseResult(index, test_case.get('id'), status, passed,
+                          (test_case.get('score') or 0) if passed else 0, output, message, elapsed)
+
+    try:
+        run = _get_pool(memory_limit).run(
+            code, stdin_data=test_case.get('input_data') or '',
+            timeout=time_limit + JUDGE_CONFIG['time_grace'], bytecode=bytecode
+        )
+    except OSError as e:
+        return result('runtime_error', message=f'无法启动执行进程: {e}')
+
+    cpu_exceeded = run.status == 'killed' and run.returncode == -getattr(signal, 'SIGXCPU', 0)
+    if run.status == 'timeout' or cpu_exceeded or run.elapsed > time_limit:
+        return result('time_limit', run.stdout, f'运行超时（时限 {time_limit_ms} 毫秒）',
+                      max(run.elapsed, time_limit))
+    if run.status != 'ok':
+        return result('runtime_error', run.stdout, describe_failure(run, time_limit), run.elapsed)
+    if run.stdout.strip() != expected_output:
+        return result('wrong_answer', run.stdout, '输出与预期不符', run.elapsed)
+    return result('accepted', run.stdout, '', run.elapsed)
+
+
+def judge_submission(code, test_cases, on_result=None):
+    """
+    并行运行全部测试点
+    :param code: 提交的代码
+    :param test_cases: 测试点列表（按 order_num 排好序）
+    :param on_result: 每完成一个测试点调用一次 on_result(CaseResult)，在调用线程中执行
+    :return: JudgeReport
+    """
+    start = time.perf_counter()
+    results = [None] * len(test_cases)
+    try:
+        bytecode = compile_submission(code)
+    except (SyntaxError, ValueError) as e:
+        # 编译失败时所有测试点直接判为编译错误，不启动运行
+        if isinstance(e, SyntaxError):
+            message = f'SyntaxError: {e.msg}（第{e.lineno}行）'
+        else:
+            message = f'{type(e).__name__}: {str(e)}'
+        for index, test_case in enumerate(test_cases):
+            results[index] = CaseResult(index, test_case.get('id'), 'compile_error', False, 0, '', message, 0.0)
+            if on_result is not None:
+                on_result(results[index])
+        bytecode = None
+    compile_time = time.perf_counter() - start
+
+    if test_cases and bytecode is not None:
+        workers = min(JUDGE_CONFIG['workers'], len(test_cases))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(run_case, code, test_case, index, bytecode)
+                       for index, test_case in enumerate(test_cases)]
+            for future in as_completed(futures):
+                case_result = future.result()
+                results[case_result.index] = case_result
+                if on_result is not None:
+                    on_result(case_result)
+
+    return JudgeReport(
+        results=results,
+        passed=sum(1 for r in results if r.passed),
+        total=len(results),
+        score=sum(r.score for r in results),
+        wall_time=time.perf_counter() - start,
+        case_time=sum(r.elapsed for r in results),
+        compile_time=compile_time
+    )
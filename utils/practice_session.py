@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+练习会话
+只保存打乱顺序后的题目ID，题目内容按页加载，
+并在后台线程预取后续页面，内存占用和首题延迟与筛选结果的大小无关
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from config import PRACTICE_CONFIG
+from utils.data_loader import DataLoader
+from utils.question_sampler import QuestionSampler
+
+
+class PracticeSession:
+    """练习会话类"""
+
+    def __init__(self, question_ids, page_size=None, prefetch_pages=None, cache_pages=None):
+        """
+        初始化练习会话
+        :param question_ids: 已打乱顺序的题目ID列表
+        :param page_size: 每页题目数
+        :param prefetch_pages: 向后预取的页数
+        :param cache_pages: 内存中最多保留的页数
+        """
+        self.question_ids = list(question_ids)
+        self.page_size = page_size or PRACTICE_CONFIG['page_size']
+        self.prefetch_pages = PRACTICE_CONFIG['prefetch_pages'] if prefetch_pages is None else prefetch_pages
+        self.cache_pages = max(cache_pages or PRACTICE_CONFIG['cache_pages'], self.prefetch_pages + 1)
+
+        self._pages = OrderedDict()   # 页号 -> {题目ID: 题目对象}，按最近使用排序
+        self._pending = {}            # 页号 -> 预取任务
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @classmethod
+    def create(cls, category=None, q_type=None, exclude_done_by=None, **kwargs):
+        """
+        根据筛选条件创建会话（只查询并打乱题目ID）
+        :param category: 分类
+        :param q_type: 题目类型
+        :param exclude_done_by: 排除该用户做过的题目
+        :return: 练习会话对象
+        """
+        question_ids = QuestionSampler.sample_ids(category, q_type, exclude_done_by=exclude_done_by)
+        return cls(question_ids, **kwargs)
+
+    def __len__(self):
+        return len(self.question_ids)
+
+    def get(self, index):
+        """
+        获取指定位置的题目，并在后台预取后续页面
+        :param index: 题目在会话中的位置
+        :return: 题目对象（题目已被删除时返回None）
+        """
+        page_no = index // self.page_size
+        page = self._get_page(page_no)
+        self._schedule_prefetch(page_no)
+        return page.get(self.question_ids[index])
+
+    def close(self):
+        """结束会话，取消尚未执行的预取任务并释放缓存"""
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        with self._lock:
+            self._pages.clear()
+            self._pending.clear()
+
+    def _load_page(self, page_no):
+        """从数据库加载一页题目"""
+        start = page_no * self.page_size
+        questions = DataLoader.load_questions_by_ids(self.question_ids[start:start + self.page_size])
+        return {q.id: q for q in questions}
+
+    def _get_page(self, page_no):
+        """获取页面：优先使用缓存，其次等待预取结果，最后同步加载"""
+        with self._lock:
+            if page_no in self._pages:
+                self._pages.move_to_end(page_no)
+                return self._pages[page_no]
+            future = self._pending.get(page_no)
+
+        page = None
+        if future is not None:
+            try:
+                page = future.result()
+            except Exception as e:
+                print(f"预取题目失败: {e}")
+        if page is None:
+            page = self._load_page(page_no)
+
+        self._store_page(page_no, page, keep=page_no)
+        return page
+
+    def _store_page(self, page_no, page, keep):
+        """缓存页面，超出上限时淘汰最久未使用的页（当前页除外）"""
+        with self._lock:
+            self._pending.pop(page_no, None)
+            self._pages[page_no] = page
+            self._pages.move_to_end(page_no)
+            while len(self._pages) > self.cache_pages:
+                oldest = next(iter(self._pages))
+                if oldest == keep:
+                    self._pages.move_to_end(oldest)
+                    oldest = next(iter(self._pages))
+                del self._pages[oldest]
+
+    def _schedule_prefetch(self, page_no):
+        """在后台线程预取当前页之后的若干页"""
+        last_page = (len(self.question_ids) - 1) // self.page_size
+        for next_page in range(page_no + 1, min(page_no + self.prefetch_pages, last_page) + 1):
+            with self._lock:
+                if next_page in self._pages or next_page in self._pending:
+                    continue
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='practice-prefetch')
+                future = self._executor.submit(self._prefetch, next_page, page_no)
+                self._pending[next_page] = future
+
+    def _prefetch(self, page_no, current_page):
+        """预取任务（在后台线程中执行）"""
+        page = self._load_page(page_no)
+        self._store_page(page_no, page, keep=current_page)
+        return page
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+练习提交写后队列
+界面提交答案后立即显示结果，练习记录、错题本、汇总数据交给后台写线程：
+队列中的提交按时间间隔合并为一个事务批量写入，程序退出时写完剩余数据
+
+写入顺序与提交顺序一致：只有一个写线程，批次按入队顺序提交。
+数据库错误（如被锁）时整批保留，按逐次翻倍的间隔重试，关闭时在超时前持续重试；
+其他异常（数据或代码错误，重试无效）时逐条写入找出出错的提交，只丢弃该条并记入 lost。
+关闭时仍未写入的提交同样记入 lost 并输出提示，不会静默丢弃
+"""
+import time
+import queue
+import atexit
+import sqlite3
+import threading
+from collections import namedtuple
+from datetime import datetime
+from config import PRACTICE_CONFIG
+from database.db_manager import db_manager
+from database import rollup, study_stats, review_schedule
+
+# 写线程收到后立即写入（flush() 使用）
+_FLUSH = object()
+
+# 关闭时重试的起始间隔（秒）
+CLOSE_RETRY_INTERVAL = 0.1
+
+# 一次练习提交
+PracticeSubmission = namedtuple('PracticeSubmission', [
+    'user_id', 'question_id', 'category', 'q_type', 'user_answer', 'is_correct', 'time_spent', 'submit_time'
+])
+
+INSERT_RECORD = '''
+    INSERT INTO practice_records
+    (user_id, question_id, user_answer, is_correct, submit_time, time_spent)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+# 已在错题本中的题目累加错误次数并重新安排复习（立即到期），否则新增
+UPSERT_WRONG_QUESTION = '''
+    INSERT INTO wrong_questions
+    (user_id, question_id, wrong_count, mastered, first_wrong_at, last_wrong_at, due_at)
+    VALUES (?, ?, 1, 0, ?, ?, ?)
+    ON CONFLICT (user_id, question_id) DO UPDATE SET
+        wrong_count = wrong_count + 1,
+        last_wrong_at = excluded.last_wrong_at,''' + review_schedule.LAPSE_SET
+
+
+class PracticeWriter:
+    """练习提交写后队列"""
+
+    def __init__(self, db=None, flush_interval=None, max_batch=None):
+        """
+        :param db: 数据库管理器，默认使用全局 db_manager
+        :param flush_interval: 写入间隔（秒），默认 PRACTICE_CONFIG['flush_interval']
+        :param max_batch: 每个事务最多写入的提交数，默认 PRACTICE_CONFIG['flush_batch']
+        """
+        self.db = db or db_manager
+        self.flush_interval = flush_interval or PRACTICE_CONFIG['flush_interval']
+        self.max_batch = max_batch or PRACTICE_CONFIG['flush_batch']
+        self._queue = queue.Queue()
+        self._pending = []
+        # 已入队和已处理（写入或丢弃）的提交数，flush() 据此等待
+        self._submitted = 0
+        self._processed = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        # close() 时写线程重试的截止时间
+        self._close_deadline = None
+        # 未能保存的提交
+        self.lost = []
+        self._thread = threading.Thread(target=self._run, name='practice-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, user_id, question, user_answer, is_correct, time_spent=0, submit_time=None):
+        """
+        提交一次练习结果（立即返回）
+        :param user_id: 用户ID
+        :param question: 题目对象（需要 id、category、type）
+        :param user_answer: 用户答案
+        :param is_correct: 是否正确
+        :param time_spent: 用时（秒）
+        :param submit_time: 提交时间，默认当前时间
+        """
+        if self._closed:
+            raise RuntimeError('练习写入队列已关闭')
+        with self._cond:
+            self._submitted += 1
+        self._queue.put(PracticeSubmission(
+            user_id, question.id, question.category, question.type, str(user_answer),
+            bool(is_correct), int(time_spent or 0), submit_time or datetime.now()
+        ))
+
+    def flush(self, timeout=None):
+        """
+        等待此前提交的数据全部写入数据库
+        :param timeout: 最长等待时间（秒），None表示一直等待
+        :return: 是否全部处理完（写入失败被丢弃的见 lost）
+        """
+        with self._cond:
+            target = self._submitted
+            if self._processed >= target:
+                return True
+        if not self._thread.is_alive():
+            # 写线程已结束（已关闭），不再等待
+            return False
+        # 唤醒写线程立即写入，不等写入间隔
+        self._queue.put(_FLUSH)
+        with self._cond:
+            return self._cond.wait_for(lambda: self._processed >= target, timeout)
+
+    def close(self, timeout=10):
+        """
+        写入剩余数据并停止写线程（写入失败时在超时前持续重试）
+        :param timeout: 最长等待时间（秒）
+        :return: 是否全部写入
+        """
+        if not self._closed:
+            self._closed = True
+            self._close_deadline = time.monotonic() + timeout
+            self._queue.put(None)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            print(f"关闭练习写入队列超时，{len(self._pending)} 条练习记录可能未保存")
+            return False
+        return not self.lost
+
+    def _run(self):
+        """写线程：第一条待写提交入队后经过写入间隔、攒满一批或收到 flush 请求时写入"""
+        deadline = None
+        retry_interval = self.flush_interval
+        while True:
+            timeout = None if not self._pending else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = _FLUSH
+            stopping = item is None
+            if item is not None and item is not _FLUSH:
+                if not self._pending:
+                    deadline = time.monotonic() + self.flush_interval
+                self._pending.append(item)
+                if len(self._pending) < self.max_batch:
+                    continue
+
+            stopping = self._drain() or stopping
+            if stopping:
+                self._finish()
+                return
+            if self._write_pending():
+                retry_interval = self.flush_interval
+            else:
+                # 写入失败的提交保留在队首，重试间隔逐次翻倍
+                deadline = time.monotonic() + retry_interval
+                retry_interval = min(retry_interval * 2, PRACTICE_CONFIG['retry_max_interval'])
+
+    def _write_pending(self):
+        """
+        按批写入全部待写提交
+        :return: 是否全部写入（失败时剩余提交保留在待写列表）
+        """
+        while self._pending:
+            if not self._write(self._pending[:self.max_batch]):
+                return False
+        return True
+
+    def _finish(self):
+        """关闭时写入剩余提交：失败则在 close() 的截止时间前按逐次翻倍的间隔重试，仍失败的记入 lost"""
+        retry_interval = CLOSE_RETRY_INTERVAL
+        while not self._write_pending():
+            if time.monotonic() + retry_interval > self._close_deadline:
+                break
+            time.sleep(retry_interval)
+            retry_interval *= 2
+        if self._pending:
+            print(f"练习写入队列关闭时仍有 {len(self._pending)} 条练习记录未能保存")
+            self._discard(len(self._pending))
+
+    def _drain(self):
+        """
+        取出队列中已有的全部提交
+        :return: 是否收到了停止标记
+        """
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return False
+            if item is None:
+                return True
+            if item is not _FLUSH:
+                self._pending.append(item)
+
+    def _write(self, batch):
+        """
+        在一个事务中写入一批提交，成功后从待写列表移除
+        :param batch: 待写列表开头的一批提交
+        :return: 是否写入（数据库错误时返回False，整批保留等待重试）
+        """
+        try:
+            self._write_batch(batch)
+        except sqlite3.Error as e:
+            print(f"保存练习记录失败: {e}")
+            return False
+        except Exception as e:
+            # 数据或代码错误，重试无效：逐条写入找出出错的提交，只丢弃出错的那条
+            if len(batch) > 1:
+                return all(self._write([submission]) for submission in batch)
+            print(f"保存练习记录失败，已丢弃（题目 {batch[0].question_id}）: {e}")
+            self._discard(1)
+            return True
+
+        del self._pending[:len(batch)]
+        self._mark_processed(len(batch))
+        return True
+
+    def _discard(self, count):
+        """把待写列表开头的 count 条提交移入 lost"""
+        self.lost.extend(self._pending[:count])
+        del self._pending[:count]
+        self._mark_processed(count)
+
+    def _mark_processed(self, count):
+        with self._cond:
+            self._processed += count
+            self._cond.notify_all()
+
+    def _write_batch(self, batch):
+        """在一个事务中写入一批提交"""
+        with self.db.transaction() as conn:
+            conn.executemany(INSERT_RECORD, [
+                (s.user_id, s.question_id, s.user_answer, s.is_correct, s.submit_time, s.time_spent)
+                for s in batch
+            ])
+            conn.executemany(UPSERT_WRONG_QUESTION, [
+                (s.user_id, s.question_id) + (review_schedule.format_time(s.submit_time),) * 3
+                for s in batch if not s.is_correct
+            ])
+            for user_id in {s.user_id for s in batch}:
+                rows = [s for s in batch if s.user_id == user_id]
+                rollup.record_practice_answers(
+                    conn, user_id, ((s.category, s.q_type, s.is_correct) for s in rows)
+                )
+                study_stats.record_activity(conn, user_id,
+                                            study_time=sum(s.time_spent for s in rows),
+                                            questions=len(rows),
+                                            correct=sum(1 for s in rows if s.is_correct))
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_practice_writer():
+    """
+    获取全局练习写入队列（首次调用时启动写线程，程序退出时写完剩余数据）
+    :return: PracticeWriter
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = PracticeWriter()
+            atexit.register(_writer.close)
+        return _writer
+
+
+def flush_pending(timeout=5):
+    """
+    等待已提交的练习结果写入数据库（队列未启动时直接返回）
+    读取练习记录、错题本或统计数据前调用，保证读到最新结果
+    :param timeout: 最长等待时间（秒），数据库持续写入失败时不阻塞界面
+    """
+    if _writer is not None:
+        _writer.flush(timeout)
+
+
+def close_writer():
+    """写完剩余数据并停止写线程（程序退出时调用，队列未启动时直接返回）"""
+    if _writer is not None:
+        _writer.close()
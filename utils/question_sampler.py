@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+题目抽样器
+只通过索引读取符合条件的题目ID，在ID上随机抽样，
+再按需加载被抽中的题目，避免 ORDER BY RANDOM() 对整张题库排序和全量加载
+"""
+import random
+from database.db_manager import db_manager
+
+
+def _scan_ids(conn, query, params):
+    """执行只返回ID的查询，使用普通元组行，避免为每行创建 sqlite3.Row"""
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    return cursor.execute(query, params)
+
+
+class QuestionSampler:
+    """题目抽样器类"""
+
+    @staticmethod
+    def build_filter(category=None, q_type=None, exclude_done_by=None):
+        """
+        构建题目筛选条件
+        :param category: 分类（None 或 '全部' 表示不限）
+        :param q_type: 题目类型（None 表示不限）
+        :param exclude_done_by: 排除该用户做过的题目（用户ID，None表示不排除）
+        :return: (WHERE子句, 参数元组)
+        """
+        conditions = []
+        params = []
+
+        if category and category != '全部':
+            conditions.append("q.category = ?")
+            params.append(category)
+        if q_type:
+            conditions.append("q.type = ?")
+            params.append(q_type)
+        if exclude_done_by is not None:
+            # 逐个ID探测练习记录索引，代替 NOT IN 子查询物化整个已做集合
+            conditions.append(
+                "NOT EXISTS (SELECT 1 FROM practice_records pr "
+                "WHERE pr.user_id = ? AND pr.question_id = q.id)"
+            )
+            params.append(exclude_done_by)
+
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        return where, tuple(params)
+
+    @staticmethod
+    def candidate_ids(category=None, q_type=None, exclude_done_by=None):
+        """
+        获取符合条件的全部题目ID（只扫描索引，不读取题目内容）
+        :param category: 分类
+        :param q_type: 题目类型
+        :param exclude_done_by: 排除该用户做过的题目
+        :return: 题目ID列表
+        """
+        where, params = QuestionSampler.build_filter(category, q_type, exclude_done_by)
+        with db_manager.checkout() as conn:
+            rows = _scan_ids(conn, f"SELECT q.id FROM questions q{where}", params).fetchall()
+        return [row[0] for row in rows]
+
+    @staticmethod
+    def count(category=None, q_type=None, exclude_done_by=None):
+        """
+        统计符合条件的题目数量
+        :return: 题目数量
+        """
+        where, params = QuestionSampler.build_filter(category, q_type, exclude_done_by)
+        with db_manager.checkout() as conn:
+            row = conn.execute(f"SELECT COUNT(*) FROM questions q{where}", params).fetchone()
+        return row[0]
+
+    @staticmethod
+    def sample_ids(category=None, q_type=None, exclude_done_by=None, limit=None, rng=None):
+        """
+        随机抽取题目ID
+        :param category: 分类
+        :param q_type: 题目类型
+        :param exclude_done_by: 排除该用户做过的题目
+        :param limit: 抽取数量（None 表示全部候选题目随机排列）
+        :param rng: 随机数生成器（便于复现），默认使用 random 模块
+        :return: 随机顺序的题目ID列表
+        """
+        rng = rng or random
+        ids = QuestionSampler.candidate_ids(category, q_type, exclude_done_by)
+        if limit is None or limit >= len(ids):
+            rng.shuffle(ids)
+            return ids
+        return rng.sample(ids, limit)
+
+    @staticmethod
+    def reservoir_sample(iterable, k, rng=None):
+        """
+        蓄水池抽样：单次遍历、O(k) 内存地从未知长度的序列中等概率抽取k个元素
+        :param iterable: 可迭代对象（如数据库游标）
+        :param k: 抽取数量
+        :param rng: 随机数生成器
+        :return: 抽中的元素列表（随机顺序）
+        """
+        rng = rng or random
+        reservoir = []
+        for i, item in enumerate(iterable):
+            if i < k:
+                reservoir.append(item)
+            else:
+                j = rng.randrange(i + 1)
+                if j < k:
+                    reservoir[j] = item
+        rng.shuffle(reservoir)
+        return reservoir
+
+    @staticmethod
+    def stream_sample_ids(category=None, q_type=None, exclude_done_by=None, limit=10, rng=None):
+        """
+        以蓄水池抽样方式随机抽取题目ID（不在内存中保留全部候选ID）
+        :param limit: 抽取数量
+        :return: 题目ID列表
+        """
+        where, params = QuestionSampler.build_filter(category, q_type, exclude_done_by)
+        with db_manager.checkout() as conn:
+            cursor = _scan_ids(conn, f"SELECT q.id FROM questions q{where}", params)
+            return QuestionSampler.reservoir_sample((row[0] for row in cursor), limit, rng)
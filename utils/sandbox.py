@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+代码沙箱
+在独立的子进程中运行用户代码：超时强制结束整个进程组，
+限制CPU时间、内存和输出大小，标准输出/错误写入临时文件后读取
+"""
+import os
+import sys
+import time
+import shutil
+import signal
+import tempfile
+import subprocess
+from collections import namedtuple
+from config import EDITOR_CONFIG
+
+RUNNER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sandbox_runner.py')
+
+# 执行结果
+# status: 'ok' 正常结束 / 'error' 运行出错 / 'timeout' 超时 / 'killed' 被信号终止（如超出资源限制）
+SandboxResult = namedtuple('SandboxResult', ['status', 'stdout', 'stderr', 'returncode', 'elapsed'])
+
+
+def _read_limited(f, limit):
+    """读取临时文件内容，超出上限的部分截断"""
+    f.seek(0)
+    data = f.read(limit + 1) if limit else f.read()
+    text = data[:limit] if limit else data
+    text = text.decode('utf-8', errors='replace')
+    if limit and len(data) > limit:
+        text += '\n...（输出过长，已截断）'
+    return text
+
+
+def _kill(process):
+    """强制结束子进程及其创建的所有子进程"""
+    try:
+        if os.name == 'posix':
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError, OSError):
+        pass
+
+
+def run_code(code, stdin_data=None, timeout=None, memory_limit=None, max_output=None):
+    """
+    在子进程中运行代码
+    :param code: 代码字符串
+    :param stdin_data: 提供给程序的标准输入（字符串），None表示无输入
+    :param timeout: 墙钟超时时间（秒），默认 EDITOR_CONFIG['timeout']
+    :param memory_limit: 内存上限（MB），默认 EDITOR_CONFIG['memory_limit']
+    :param max_output: 输出上限（字节），默认 EDITOR_CONFIG['max_output']
+    :return: SandboxResult
+    """
+    timeout = timeout or EDITOR_CONFIG['timeout']
+    memory_limit = EDITOR_CONFIG['memory_limit'] if memory_limit is None else memory_limit
+    max_output = EDITOR_CONFIG['max_output'] if max_output is None else max_output
+
+    work_dir = tempfile.mkdtemp(prefix='pysandbox_')
+    code_path = os.path.join(work_dir, 'main.py')
+    with open(code_path, 'w', encoding='utf-8') as f:
+        f.write(code)
+
+    command = [
+        sys.executable, '-I', '-X', 'utf8', RUNNER_PATH, code_path,
+        '--memory', str(memory_limit or 0),
+        # CPU时间上限略大于墙钟超时，作为超时强杀之外的第二道保险
+        '--cpu', str(int(timeout) + 1),
+        '--output', str(max_output or 0),
+    ]
+    # 子进程只继承运行解释器所必需的环境变量
+    env = {'PYTHONIOENCODING': 'utf-8', 'PYTHONDONTWRITEBYTECODE': '1'}
+    for name in ('PATH', 'SYSTEMROOT', 'TEMP', 'TMP'):
+        if name in os.environ:
+            env[name] = os.environ[name]
+    popen_kwargs = {}
+    if os.name == 'posix':
+        popen_kwargs['start_new_session'] = True
+    else:
+        popen_kwargs['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP
+
+    start = time.perf_counter()
+    try:
+        with tempfile.TemporaryFile() as out_file, tempfile.TemporaryFile() as err_file:
+            process = subprocess.Popen(
+                command,
+                stdin=subprocess.PIPE if stdin_data is not None else subprocess.DEVNULL,
+                stdout=out_file, stderr=err_file,
+                cwd=work_dir, env=env, **popen_kwargs
+            )
+            timed_out = False
+            try:
+                process.communicate(
+                    input=stdin_data.encode('utf-8') if stdin_data is not None else None,
+                    timeout=timeout
+                )
+            except subprocess.TimeoutExpired:
+                timed_out = True
+                _kill(process)
+                process.wait()
+            elapsed = time.perf_counter() - start
+
+            stdout = _read_limited(out_file, max_output)
+            stderr = _read_limited(err_file, max_output)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    returncode = process.returncode
+    if timed_out:
+        status = 'timeout'
+    elif returncode < 0:
+        status = 'killed'
+    elif returncode != 0 or stderr:
+        status = 'error'
+    else:
+        status = 'ok'
+    return SandboxResult(status, stdout, stderr, returncode, elapsed)
+
+
+def describe_failure(result, timeout):
+    """
+    将异常结束的执行结果转换为错误提示
+    :param result: SandboxResult
+    :param timeout: 超时时间（秒）
+    :return: 错误信息
+    """
+    if result.status == 'timeout':
+        return f'代码执行超时（超过{timeout}秒）'
+    if result.status == 'killed':
+        signal_names = {
+            getattr(signal, 'SIGXCPU', None): 'CPU时间超出限制',
+            getattr(signal, 'SIGXFSZ', None): '输出超出限制',
+            getattr(signal, 'SIGKILL', None): '进程被强制结束（可能超出内存限制）',
+            getattr(signal, 'SIGSEGV', None): '进程崩溃（可能超出内存限制）',
+        }
+        reason = signal_names.get(-result.returncode, f'进程异常退出（信号 {-result.returncode}）')
+        return (result.stderr.strip() + '\n' + reason).strip()
+    return result.stderr.strip() or f'进程退出码 {result.returncode}'
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+沙箱子进程入口
+由 utils/sandbox.py 以独立解释器（python -I）启动，不导入项目中的任何模块
+
+用法: python -I sandbox_runner.py 代码文件 [--memory MB] [--cpu 秒] [--output 字节]
+"""
+import sys
+import errno
+
+
+def apply_limits(memory_mb, cpu_seconds, output_bytes):
+    """设置资源限制（仅POSIX系统支持，Windows上跳过）"""
+    try:
+        import resource
+    except ImportError:
+        return
+
+    def set_limit(name, value):
+        limit = getattr(resource, name, None)
+        if limit is None or not value:
+            return
+        try:
+            soft, hard = resource.getrlimit(limit)
+            if hard != resource.RLIM_INFINITY:
+                value = min(value, hard)
+            resource.setrlimit(limit, (value, hard))
+        except (ValueError, OSError):
+            pass
+
+    set_limit('RLIMIT_AS', memory_mb * 1024 * 1024 if memory_mb else 0)
+    set_limit('RLIMIT_CPU', cpu_seconds)
+    set_limit('RLIMIT_FSIZE', output_bytes)
+    set_limit('RLIMIT_CORE', 0)
+
+
+def parse_args(argv):
+    """解析命令行参数"""
+    options = {'--memory': 0, '--cpu': 0, '--output': 0}
+    path = argv[1]
+    i = 2
+    while i < len(argv) - 1:
+        if argv[i] in options:
+            options[argv[i]] = int(argv[i + 1])
+        i += 2
+    return path, options['--memory'], options['--cpu'], options['--output']
+
+
+def main():
+    path, memory_mb, cpu_seconds, output_bytes = parse_args(sys.argv)
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+
+    try:
+        code = compile(source, '<string>', 'exec')
+    except SyntaxError as e:
+        sys.stderr.write(f'SyntaxError: {e.msg}（第{e.lineno}行）\n')
+        return 1
+
+    apply_limits(memory_mb, cpu_seconds, output_bytes)
+
+    exec_globals = {'__name__': '__main__', '__builtins__': __builtins__}
+    try:
+        exec(code, exec_globals)
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        sys.stderr.write(f'{e.code}\n')
+        return 1
+    except MemoryError:
+        sys.stdout.flush()
+        sys.stderr.write('MemoryError: 内存使用超出限制\n')
+        return 1
+    except OSError as e:
+        if e.errno == errno.EFBIG:
+            sys.stderr.write('OutputLimitExceeded: 输出内容超出限制\n')
+        else:
+            sys.stderr.write(f'{type(e).__name__}: {str(e)}\n')
+        return 1
+    except Exception as e:
+        sys.stdout.flush()
+        sys.stderr.write(f'{type(e).__name__}: {str(e)}\n')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
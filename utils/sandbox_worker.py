@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+"""
+常驻沙箱解释器
+由 utils/worker_pool.py 以独立解释器（python -I）预先启动，预导入常用标准库，
+循环读取任务并在全新的命名空间中执行，不导入项目中的任何模块
+
+通信协议（每行一个JSON）：
+  任务: {"code": 代码, "stdin": 标准输入, "timeout": 秒, "max_output": 字节, "spool": 文件路径}
+        判题时以 "bytecode"（base64编码的marshal代码对象）代替 "code"，省去重复编译
+        标准输出同时逐次写入 spool 文件，任务超时被结束时由池读取已有的输出
+  结果: {"status": "ok"/"error", "stdout": ..., "stderr": ..., "elapsed": 秒, "recycle": 是否需要回收}
+        用户代码启动的线程在任务结束后仍在运行时要求回收，避免线程带入下一个任务
+启动完成后先输出一行 {"ready": true}
+
+用法: python -I sandbox_worker.py [--memory MB]
+"""
+import io
+import os
+import sys
+import json
+import time
+import base64
+import marshal
+import builtins
+import threading
+from collections import deque
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# 通信、计时、输出文件和线程统计用到的函数在启动时绑定，用户代码修改 json/time/os 等模块不影响协议
+_dumps = json.dumps
+_loads = json.loads
+_perf_counter = time.perf_counter
+_b64decode = base64.b64decode
+_marshal_loads = marshal.loads
+_os_write = os.write
+_os_close = os.close
+_sleep = time.sleep
+_deque = deque
+_Lock = threading.Lock
+_active_count = threading.active_count
+_listdir = os.listdir
+
+# 预导入常用标准库，任务中 import 时直接命中 sys.modules
+import math
+import random
+import re
+import string
+import itertools
+import functools
+import collections
+import heapq
+import bisect
+import datetime
+import decimal
+import fractions
+import statistics
+import copy
+import operator
+import typing
+
+PRELOADED = (math, random, re, string, itertools, functools, collections, heapq, bisect,
+             datetime, decimal, fractions, statistics, copy, operator, typing)
+
+# 每个任务结束后恢复这些模块的属性，防止用户代码修改模块影响后续任务
+RESTORED = (builtins, json, os, io, time) + PRELOADED
+
+
+class OutputLimitExceeded(Exception):
+    """输出超出上限"""
+
+
+class LimitedWriter(io.StringIO):
+    """有长度上限的输出缓冲区；提供 spool_fd 时输出另由 SpoolFlusher 定期写入该文件描述符"""
+
+    def __init__(self, limit, spool_fd=None):
+        super().__init__()
+        self.limit = limit
+        self.size = 0
+        self.spool_fd = spool_fd
+        # 待写入文件的输出（deque 的 append/popleft 线程安全，写入方不加锁）
+        self.spool_pending = _deque()
+        self.spool_lock = _Lock()
+
+    def write(self, s):
+        self.size += len(s)
+        if self.limit and self.size > self.limit:
+            raise OutputLimitExceeded('输出内容超出限制')
+        if self.spool_fd is not None:
+            self.spool_pending.append(s)
+        return super().write(s)
+
+    def flush_spool(self):
+        """把待写入的输出写入文件描述符"""
+        with self.spool_lock:
+            chunks = []
+            while True:
+                try:
+                    chunks.append(self.spool_pending.popleft())
+                except IndexError:
+                    break
+            if self.spool_fd is None or not chunks:
+                return
+            try:
+                _os_write(self.spool_fd, ''.join(chunks).encode('utf-8', 'replace'))
+            except (OSError, TypeError):
+                pass
+
+    def close_spool(self):
+        """写出剩余输出并关闭文件描述符"""
+        self.flush_spool()
+        with self.spool_lock:
+            if self.spool_fd is not None:
+                try:
+                    _os_close(self.spool_fd)
+                except OSError:
+                    pass
+                self.spool_fd = None
+
+
+class SpoolFlusher(threading.Thread):
+    """后台线程：每隔 interval 秒把当前任务的输出写入输出文件（任务超时被结束时池读取该文件）"""
+
+    def __init__(self, interval=0.05):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.writer = None
+
+    def run(self):
+        while True:
+            _sleep(self.interval)
+            writer = self.writer
+            if writer is not None:
+                writer.flush_spool()
+
+
+def open_spool(path):
+    """打开（清空）任务的输出文件，失败时返回None"""
+    if not path:
+        return None
+    try:
+        return os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    except OSError:
+        return None
+
+
+def set_memory_limit(memory_mb):
+    """设置进程内存上限（仅POSIX系统支持）"""
+    if resource is None:
+        return
+    try:
+        limit = memory_mb * 1024 * 1024
+        soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+        resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+    except (ValueError, OSError):
+        pass
+
+
+def set_cpu_budget(seconds):
+    """把CPU时间软上限设为“已用时间 + 本次预算”（超出时进程收到SIGXCPU被结束）"""
+    if resource is None:
+        return
+    try:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        used = usage.ru_utime + usage.ru_stime
+        soft, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        limit = int(used + seconds) + 1
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_CPU, (limit, hard))
+    except (ValueError, OSError):
+        pass
+
+
+def count_threads():
+    """
+    统计进程中的线程数
+    :return: (threading 登记的线程数, 系统线程数)；系统线程数读取 /proc，能发现 _thread 直接启动的线程，
+             无 /proc 的系统上为0
+    """
+    try:
+        tasks = len(_listdir('/proc/self/task'))
+    except OSError:
+        tasks = 0
+    return _active_count(), tasks
+
+
+def has_extra_threads(baseline):
+    """任务结束后是否还有用户代码启动的线程在运行（有则回收进程，线程无法单独结束）"""
+    active, tasks = count_threads()
+    if active > baseline[0]:
+        return True
+    if tasks > baseline[1]:
+        # 刚被 join 的线程可能尚未从 /proc 中消失，稍后再核对一次
+        _sleep(0.01)
+        return count_threads()[1] > baseline[1]
+    return False
+
+
+def snapshot_modules():
+    """记录需要恢复的模块属性"""
+    return [(vars(module), dict(vars(module))) for module in RESTORED]
+
+
+def restore_modules(snapshots):
+    """恢复被修改过的模块属性（内置函数总是先整体恢复，之后的检查才能安全使用它们）"""
+    attrs, saved = snapshots[0]
+    attrs.clear()
+    attrs.update(saved)
+    for attrs, saved in snapshots[1:]:
+        if len(attrs) != len(saved) or any(attrs.get(k) is not v for k, v in saved.items()):
+            attrs.clear()
+            attrs.update(saved)
+
+
+def run_job(job, baseline_modules, baseline_threads, snapshots, home_dir, flusher):
+    """在全新命名空间中执行一个任务，并恢复解释器状态"""
+    max_output = job.get('max_output') or 0
+    stdout = LimitedWriter(max_output, open_spool(job.get('spool')))
+    stderr = LimitedWriter(max_output)
+    flusher.writer = stdout
+    status = 'ok'
+    recycle = False
+
+    set_cpu_budget(job.get('timeout') or 5)
+    sys.stdin = io.StringIO(job.get('stdin') or '')
+    sys.stdout, sys.stderr = stdout, stderr
+    saved_path = list(sys.path)
+    saved_recursion = sys.getrecursionlimit()
+    # 每个任务使用独立的内置函数字典，避免修改内置函数影响后续任务
+    namespace = {'__name__': '__main__', '__builtins__': dict(vars(builtins))}
+
+    error = None
+    start = _perf_counter()
+    try:
+        if 'bytecode' in job:
+            code = _marshal_loads(_b64decode(job['bytecode']))
+        else:
+            code = compile(job['code'], '<string>', 'exec')
+        exec(code, namespace)
+    except BaseException as e:
+        error = e
+    elapsed = _perf_counter() - start
+    flusher.writer = None
+    stdout.close_spool()
+
+    # 恢复解释器状态：模块属性、标准流、工作目录、模块表、搜索路径
+    restore_modules(snapshots)
+    sys.stdin, sys.stdout, sys.stderr = sys.__stdin__, sys.__stdout__, sys.__stderr__
+    for name in set(sys.modules) - baseline_modules:
+        del sys.modules[name]
+    sys.path[:] = saved_path
+    sys.setrecursionlimit(saved_recursion)
+    try:
+        os.chdir(home_dir)
+    except OSError:
+        recycle = True
+    if has_extra_threads(baseline_threads):
+        recycle = True
+
+    if isinstance(error, SystemExit):
+        if error.code not in (None, 0):
+            status = 'error'
+            if not isinstance(error.code, int):
+                stderr.limit = 0
+                stderr.write(f'{error.code}\n')
+    elif error is not None:
+        status = 'error'
+        stderr.limit = 0
+        if isinstance(error, MemoryError):
+            recycle = True
+            stderr.write('MemoryError: 内存使用超出限制\n')
+        elif isinstance(error, OutputLimitExceeded):
+            stderr.write('OutputLimitExceeded: 输出内容超出限制\n')
+        else:
+            stderr.write(f'{type(error).__name__}: {str(error)}\n')
+
+    if status == 'ok' and stderr.getvalue():
+        status = 'error'
+    return {
+        'status': status,
+        'stdout': stdout.getvalue(),
+        'stderr': stderr.getvalue(),
+        'elapsed': elapsed,
+        'recycle': recycle,
+    }
+
+
+def main():
+    memory_mb = 0
+    if '--memory' in sys.argv:
+        memory_mb = int(sys.argv[sys.argv.index('--memory') + 1])
+
+    # 通信使用复制出的私有描述符，0/1/2 指向空设备，防止用户代码直接写文件描述符破坏协议
+    channel_in = os.fdopen(os.dup(0), 'r', encoding='utf-8')
+    channel_out = os.fdopen(os.dup(1), 'w', encoding='utf-8')
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+
+    if memory_mb:
+        set_memory_limit(memory_mb)
+
+    home_dir = os.getcwd()
+    baseline_modules = set(sys.modules)
+    snapshots = snapshot_modules()
+    flusher = SpoolFlusher()
+    flusher.start()
+    baseline_threads = count_threads()
+    channel_out.write(_dumps({'ready': True}) + '\n')
+    channel_out.flush()
+
+    for line in channel_in:
+        if not line.strip():
+            continue
+        result = run_job(_loads(line), baseline_modules, baseline_threads, snapshots, home_dir, flusher)
+        channel_out.write(_dumps(result, ensure_ascii=False) + '\n')
+        channel_out.flush()
+
+
+if __name__ == '__main__':
+    main()
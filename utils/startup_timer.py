@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+启动耗时记录
+记录启动过程中各阶段的时间点和耗时（相对计时起点，即本模块首次导入或 reset() 的时刻），
+用于输出启动耗时报告：主窗口创建、页面构建、首次绘制等
+
+track_imports() 开启后同时记录每个模块的导入耗时（与 python -X importtime 相同的口径：
+self 为模块自身代码的执行时间，cumulative 含其导入的子模块），finish() 时写入JSON报告
+"""
+import sys
+import json
+import time
+from contextlib import contextmanager
+
+
+class _TimedLoader:
+    """包装模块加载器，记录 exec_module 耗时；执行前把模块的 __loader__ 还原为原加载器"""
+
+    def __init__(self, loader, timer):
+        self._loader = loader
+        self._timer = timer
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+        with self._timer.import_scope(module.__name__):
+            self._loader.exec_module(module)
+
+
+class _ImportFinder:
+    """sys.meta_path 上的查找器：交给其余查找器查找，再用 _TimedLoader 包装找到的加载器"""
+
+    def __init__(self, timer):
+        self._timer = timer
+
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimedLoader(spec.loader, self._timer)
+                return spec
+        return None
+
+
+class StartupTimer:
+    """启动阶段计时器"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self, origin=None):
+        """
+        清空记录并重新设置计时起点
+        :param origin: 计时起点（time.perf_counter() 的值），默认当前时刻
+        """
+        self.origin = time.perf_counter() if origin is None else origin
+        # [(阶段, 距起点秒数, 耗时秒数或None)]，按发生顺序排列
+        self.events = []
+        # [(模块名, 自身耗时秒数, 累计耗时秒数, 嵌套深度)]，按导入完成顺序排列
+        self.imports = []
+        self._import_stack = []
+        # finish() 时写入的JSON报告路径，为None时不写
+        self.report_path = None
+        self.finished = False
+        # 参照阶段（如登录界面结束）：之后的阶段在报告中同时给出距该阶段的时间，
+        # 排除用户停留在登录界面的时间
+        self.anchor = None
+
+    def track_imports(self):
+        """开始记录之后导入的每个模块的耗时（已导入的模块不再记录）"""
+        if not any(isinstance(finder, _ImportFinder) for finder in sys.meta_path):
+            sys.meta_path.insert(0, _ImportFinder(self))
+
+    @contextmanager
+    def import_scope(self, module_name):
+        """记录一个模块的导入耗时（由 _TimedLoader 调用）"""
+        # 栈中每项：[开始时间, 子模块累计耗时]
+        frame = [time.perf_counter(), 0.0]
+        self._import_stack.append(frame)
+        try:
+            yield
+        finally:
+            self._import_stack.pop()
+            cumulative = time.perf_counter() - frame[0]
+            if self._import_stack:
+                self._import_stack[-1][1] += cumulative
+            self.imports.append((module_name, cumulative - frame[1], cumulative, len(self._import_stack)))
+
+    def mark(self, phase):
+        """
+        记录一个时间点
+        :param phase: 阶段名称
+        :return: 距起点的秒数
+        """
+        at = time.perf_counter() - self.origin
+        self.events.append((phase, at, None))
+        return at
+
+    @contextmanager
+    def measure(self, phase):
+        """
+        记录一段操作的耗时（结束时记录）
+        用法: with startup_timer.measure('构建页面'): ...
+        :param phase: 阶段名称
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.events.append((phase, end - self.origin, end - start))
+
+    def at(self, phase):
+        """
+        获取阶段第一次出现的时间点
+        :param phase: 阶段名称
+        :return: 距起点的秒数，未记录时返回None
+        """
+        for name, at, _ in self.events:
+            if name == phase:
+                return at
+        return None
+
+    def since_anchor(self, at):
+        """
+        时间点距参照阶段的秒数
+        :param at: 距起点的秒数
+        :return: 秒数，未设置参照阶段或时间点早于参照阶段时返回None
+        """
+        anchor_at = self.at(self.anchor) if self.anchor else None
+        if anchor_at is None or at < anchor_at:
+            return None
+        return at - anchor_at
+
+    def report(self):
+        """
+        生成启动耗时报告
+        :return: 多行文本，每行一个阶段：距起点时间、耗时，设置了参照阶段时另有距参照阶段的时间
+        """
+        lines = [f"{'阶段':<24}{'时间点(ms)':>12}{'耗时(ms)':>12}"
+                 + (f"{'距' + self.anchor + '(ms)':>16}" if self.anchor else '')]
+        for phase, at, duration in self.events:
+            spent = f'{duration * 1000:>12.1f}' if duration is not None else f"{'':>12}"
+            since = self.since_anchor(at)
+            relative = f'{since * 1000:>16.1f}' if since is not None else ''
+            lines.append(f'{phase:<24}{at * 1000:>12.1f}{spent}{relative}')
+        return '\n'.join(lines)
+
+    def to_dict(self, top=None):
+        """
+        导出记录
+        :param top: 模块导入耗时只保留累计耗时最大的前N个，None表示全部
+        :return: {'anchor': 参照阶段, 'phases': [...], 'imports': [...]}，时间单位为毫秒；
+            phases 中 at_ms 距进程启动，since_anchor_ms 距参照阶段（参照阶段之前的阶段为None）
+        """
+        imports = self.imports
+        if top is not None:
+            imports = sorted(imports, key=lambda item: -item[2])[:top]
+
+        def ms(seconds):
+            return None if seconds is None else round(seconds * 1000, 3)
+
+        return {
+            'anchor': self.anchor,
+            'phases': [
+                {'phase': phase, 'at_ms': ms(at), 'duration_ms': ms(duration),
+                 'since_anchor_ms': ms(self.since_anchor(at))}
+                for phase, at, duration in self.events
+            ],
+            'imports': [
+                {'module': name, 'self_ms': round(self_time * 1000, 3),
+                 'cumulative_ms': round(cumulative * 1000, 3), 'depth': depth}
+                for name, self_time, cumulative, depth in imports
+            ],
+        }
+
+    def finish(self):
+        """
+        启动完成：设置了 report_path 时写入JSON报告（只写一次）
+        :return: 报告路径，未写入时返回None
+        """
+        if self.finished or not self.report_path:
+            return None
+        self.finished = True
+        try:
+            with open(self.report_path, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            print(f"写入启动耗时报告失败: {e}")
+            return None
+        return self.report_path
+
+
+# 全局计时器
+startup_timer = StartupTimer()
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+预热解释器池
+预先启动若干常驻沙箱解释器（utils/sandbox_worker.py），运行代码时直接派发任务，
+省去每次冷启动解释器的开销；超时或崩溃时强制结束并在后台线程中补充新进程，执行N个任务后回收。
+任务的标准输出同时写入每个进程各自的输出文件，超时时保留结束前已输出的内容
+"""
+import os
+import sys
+import json
+import time
+import base64
+import queue
+import atexit
+import shutil
+import signal
+import tempfile
+import threading
+import subprocess
+from config import EDITOR_CONFIG
+from utils.sandbox import SandboxResult
+
+WORKER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sandbox_worker.py')
+
+# 等待新进程就绪的最长时间（秒）
+STARTUP_TIMEOUT = 10
+
+
+class _Worker:
+    """单个常驻解释器进程"""
+
+    def __init__(self, memory_limit):
+        self.home_dir = tempfile.mkdtemp(prefix='pyworker_')
+        # 输出文件放在工作目录之外，用户代码清理工作目录不影响读取
+        fd, self.spool_path = tempfile.mkstemp(prefix='pyworker_out_', suffix='.txt')
+        os.close(fd)
+        env = {'PYTHONIOENCODING': 'utf-8', 'PYTHONDONTWRITEBYTECODE': '1'}
+        for name in ('PATH', 'SYSTEMROOT', 'TEMP', 'TMP'):
+            if name in os.environ:
+                env[name] = os.environ[name]
+        popen_kwargs = {}
+        if os.name == 'posix':
+            popen_kwargs['start_new_session'] = True
+        else:
+            popen_kwargs['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP
+
+        self.process = subprocess.Popen(
+            [sys.executable, '-I', '-X', 'utf8', WORKER_PATH, '--memory', str(memory_limit or 0)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            cwd=self.home_dir, env=env, encoding='utf-8', **popen_kwargs
+        )
+        self.jobs = 0
+        self.ready = False
+        # 后台线程逐行读取结果，主线程按超时等待
+        self.responses = queue.Queue()
+        self.reader = threading.Thread(target=self._read, daemon=True)
+        self.reader.start()
+
+    def _read(self):
+        """读取进程输出，进程退出时放入None"""
+        try:
+            for line in self.process.stdout:
+                self.responses.put(line)
+        except (OSError, ValueError):
+            pass
+        self.responses.put(None)
+
+    def wait_ready(self, timeout):
+        """等待进程完成预导入"""
+        if not self.ready:
+            line = self.responses.get(timeout=timeout)
+            if line is None:
+                raise OSError('解释器进程启动失败')
+            self.ready = True
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def read_spool(self, limit):
+        """
+        读取当前任务已写出的标准输出（任务超时时使用）
+        :param limit: 最多读取的字符数，0表示不限
+        :return: 输出内容
+        """
+        try:
+            with open(self.spool_path, encoding='utf-8', errors='replace') as f:
+                return f.read(limit) if limit else f.read()
+        except OSError:
+            return ''
+
+    def kill(self):
+        """强制结束进程（含其创建的子进程）并清理工作目录"""
+        try:
+            if os.name == 'posix':
+                os.killpg(self.process.pid, signal.SIGKILL)
+            else:
+                self.process.kill()
+        except (ProcessLookupError, PermissionError, OSError):
+            pass
+        try:
+            self.process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            pass
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+        shutil.rmtree(self.home_dir, ignore_errors=True)
+        try:
+            os.remove(self.spool_path)
+        except OSError:
+            pass
+
+
+class WorkerPool:
+    """预热解释器池"""
+
+    def __init__(self, size=None, max_jobs=None, memory_limit=None, acquire_timeout=None):
+        """
+        初始化解释器池（立即启动全部进程）
+        :param size: 进程数量，默认 EDITOR_CONFIG['pool_size']
+        :param max_jobs: 每个进程执行多少个任务后回收，默认 EDITOR_CONFIG['worker_max_jobs']
+        :param memory_limit: 每个进程的内存上限（MB），默认 EDITOR_CONFIG['memory_limit']
+        :param acquire_timeout: 所有进程忙时最多等待多少秒，None表示一直等待（仅用于后台线程）
+        """
+        self.size = size or EDITOR_CONFIG['pool_size']
+        self.max_jobs = max_jobs or EDITOR_CONFIG['worker_max_jobs']
+        self.memory_limit = EDITOR_CONFIG['memory_limit'] if memory_limit is None else memory_limit
+        self.acquire_timeout = acquire_timeout
+        self._idle = queue.Queue()
+        self._closed = False
+        # 关闭与后台补位互斥，避免关闭后又放入新进程
+        self._lock = threading.Lock()
+        for _ in range(self.size):
+            self._idle.put(_Worker(self.memory_limit))
+
+    def run(self, code, stdin_data=None, timeout=None, max_output=None, bytecode=None):
+        """
+        在空闲进程中执行代码（所有进程忙时最多等待 acquire_timeout 秒，仍无空闲进程时抛出 OSError，
+        由调用方改用一次性沙箱）
+        :param code: 代码字符串
+        :param stdin_data: 标准输入内容
+        :param timeout: 超时时间（秒）
+        :param max_output: 输出上限（字符）
+        :param bytecode: 已编译的代码对象（marshal.dumps 结果），提供时进程直接执行，不再编译 code
+        :return: SandboxResult
+        """
+        if self._closed:
+            raise OSError('解释器池已关闭')
+        timeout = timeout or EDITOR_CONFIG['timeout']
+        max_output = EDITOR_CONFIG['max_output'] if max_output is None else max_output
+
+        try:
+            worker = self._idle.get(timeout=self.acquire_timeout)
+        except queue.Empty:
+            raise OSError('解释器池繁忙')
+        try:
+            if worker is None:
+                # 后台补充进程失败留下的空位，在此重新启动（失败时由调用方改用一次性沙箱）
+                worker = _Worker(self.memory_limit)
+            worker.wait_ready(STARTUP_TIMEOUT)
+            job = {'stdin': stdin_data or '', 'timeout': timeout, 'max_output': max_output,
+                   'spool': worker.spool_path}
+            if bytecode is not None:
+                job['bytecode'] = base64.b64encode(bytecode).decode('ascii')
+            else:
+                job['code'] = code
+            worker.process.stdin.write(json.dumps(job, ensure_ascii=False) + '\n')
+            worker.process.stdin.flush()
+            worker.jobs += 1
+            start = time.perf_counter()
+
+            try:
+                line = worker.responses.get(timeout=timeout)
+            except queue.Empty:
+                # 保留超时前已输出的内容
+                stdout = worker.read_spool(max_output)
+                worker.kill()
+                worker = None
+                return SandboxResult('timeout', stdout, '', None, timeout)
+
+            if line is None:
+                # 进程崩溃、自行退出或被资源限制结束
+                returncode = worker.process.wait()
+                worker.kill()
+                worker = None
+                status = 'killed' if returncode < 0 else 'error'
+                return SandboxResult(status, '', '', returncode, time.perf_counter() - start)
+
+            result = json.loads(line)
+            if result['recycle'] or worker.jobs >= self.max_jobs:
+                worker.kill()
+                worker = None
+            return SandboxResult(result['status'], result['stdout'], result['stderr'],
+                                 0 if result['status'] == 'ok' else 1, result['elapsed'])
+        except (OSError, ValueError, queue.Empty):
+            if worker is not None:
+                worker.kill()
+                worker = None
+            raise OSError('解释器进程无响应')
+        finally:
+            self._release(worker)
+
+    def _release(self, worker):
+        """归还进程；已结束的进程由后台线程启动的新进程补位，不占用调用方线程"""
+        if worker is not None and worker.alive():
+            self._put_idle(worker)
+            return
+        if worker is not None:
+            worker.kill()
+        if not self._closed:
+            threading.Thread(target=self._replenish, name='worker-replenish', daemon=True).start()
+
+    def _replenish(self):
+        """启动一个新进程放入空闲队列；启动失败时放入None占位，由下一个任务重试"""
+        try:
+            worker = _Worker(self.memory_limit)
+        except OSError as e:
+            print(f"启动解释器进程失败: {e}")
+            worker = None
+        self._put_idle(worker)
+
+    def _put_idle(self, worker):
+        """放入空闲队列；池已关闭时结束进程"""
+        with self._lock:
+            if not self._closed:
+                self._idle.put(worker)
+                return
+        if worker is not None:
+            worker.kill()
+
+    def close(self):
+        """结束全部进程"""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if worker is not None:
+                worker.kill()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool():
+    """
+    获取全局解释器池（首次调用时创建并预热）
+    :return: WorkerPool，EDITOR_CONFIG['pool_size'] 为0时返回None
+    """
+    global _pool
+    if not EDITOR_CONFIG['pool_size']:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            # 界面线程直接调用，不能无限等待空闲进程
+            _pool = WorkerPool(acquire_timeout=EDITOR_CONFIG['pool_wait'])
+            atexit.register(_pool.close)
+        return _pool